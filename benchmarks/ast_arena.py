@@ -0,0 +1,65 @@
+"""
+Benchmark of the array-backed AST arena
+
+Stores the AST of many declarations in an arena and compares it with the linked TreeNode objects: the size and
+time of pickling the AST, and the time of a pre-order walk that counts the nodes of every kind.
+
+Usage: python -m benchmarks.ast_arena [declarations]
+"""
+
+import pickle
+import sys
+import time
+from collections import Counter
+
+from benchmarks.node_memory import build_slotted
+from src.parser.AstArena import NODE_CLASSES, AstArena
+from src.parser.TreeNode import *
+
+
+def walk_tree(tree: TreeNode) -> Counter:
+    kinds = Counter()
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        kinds[node.__class__] += 1
+        stack.extend(reversed(node.children))
+    return kinds
+
+
+def walk_arena(arena: AstArena) -> Counter:
+    # Nodes are numbered in pre-order, the walk is a loop over the kind column
+    kinds = Counter(arena.kind)
+    return Counter({NODE_CLASSES[kind]: count for kind, count in kinds.items()})
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    declarations = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    tree = ProgNode(build_slotted(declarations))
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 10000))
+
+    arena, elapsed = timed(AstArena.from_tree, tree)
+    print(f"{len(arena)} nodes, from_tree {elapsed:.2f}s")
+
+    data, dump_tree = timed(pickle.dumps, tree)
+    _, load_tree = timed(pickle.loads, data)
+    print(
+        f"  pickled tree: {len(data) / 1024 / 1024:.1f} MB, dump {dump_tree:.2f}s, load {load_tree:.2f}s"
+    )
+    data, dump_arena = timed(AstArena.to_bytes, arena)
+    loaded, load_arena = timed(AstArena.from_buffer, data)
+    _, to_tree = timed(AstArena.to_tree, loaded)
+    print(
+        f"         arena: {len(data) / 1024 / 1024:.1f} MB, dump {dump_arena:.2f}s, load {load_arena:.2f}s, to_tree {to_tree:.2f}s"
+    )
+
+    tree_kinds, walk_tree_time = timed(walk_tree, tree)
+    arena_kinds, walk_arena_time = timed(walk_arena, arena)
+    assert tree_kinds == arena_kinds
+    print(f"pre-order walk: tree {walk_tree_time:.2f}s, arena {walk_arena_time:.2f}s")
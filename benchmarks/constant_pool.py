@@ -0,0 +1,44 @@
+"""
+Benchmark of the constant pool of the llvm converter on a program that calls printf a lot
+
+Converts a generated program in which every fifth line prints a variable and reports the conversion time, the size
+of the llvm code and of the object file, and how many printf strings got their own global and how many were merged.
+Without the pool every printf added a global and a bitcast instruction, the size of that code is estimated from the
+size of a global and a bitcast.
+
+Usage: python -m benchmarks.constant_pool [lines]
+"""
+
+import sys
+import time
+
+from benchmarks.incremental import generate_program
+from src.llvm_target.Backend import emit, parse_module
+from src.llvm_target.Converter import LlvmConverter
+from src.parser.FastParser import FastParser
+from src.parser.SymbolTable import SymbolTable
+
+if __name__ == "__main__":
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    source = "\n".join(generate_program(lines)) + "\n"
+    ast = FastParser.parse_source(source)
+    symbol_table = SymbolTable()
+    symbol_table.build_symbol_table(ast)
+    symbol_table.resolve(ast)
+
+    start = time.perf_counter()
+    converter = LlvmConverter(symbol_table, source)
+    converter.convert(ast)
+    llvm_code = converter.return_llvm_code()
+    elapsed = time.perf_counter() - start
+
+    pool = converter.pool
+    # A global like @.str140253870357376 = global [4 x i8] c"%d\0A\00" and a bitcast per merged string
+    unpooled = len(llvm_code) + pool.merged_strings * (
+        len('@.str140253870357376 = global [4 x i8] c"%d\\0A\\00"\n')
+        + len("  %fmt_str.1000 = bitcast [4 x i8]* @.str140253870357376 to i8*\n")
+    )
+    print(f"{lines} lines, converted in {elapsed * 1000:.0f} ms")
+    print(f"printf strings: {len(pool.strings)} globals, {pool.merged_strings} merged")
+    print(f"     llvm code: {len(llvm_code)} bytes, about {unpooled} without the pool")
+    print(f"   object file: {len(emit(parse_module(llvm_code), 'obj'))} bytes")
@@ -0,0 +1,68 @@
+"""
+Benchmark of the compiler passes on a deeply nested expression
+
+Builds the AST of `int b = a + a + ... + a;` with many terms. The left-recursive expr rule nests such a chain as
+deep as it is long, so every pass has to handle an AST of that depth. Reports the time of every pass.
+
+Usage: python -m benchmarks.deep_expression [terms]
+"""
+
+import sys
+import time
+
+from src.llvm_target.Converter import LlvmConverter
+from src.parser.ConstantFolder import ConstantFolder
+from src.parser.DotExporter import DotExporter
+from src.parser.Parser import Parser
+from src.parser.SemanticAnalyzer import SemanticAnalyzer
+from src.parser.SymbolTable import SymbolTable
+from src.parser.TreeNode import *
+
+
+def generate_program(terms: int) -> ProgNode:
+    chain = IdNode("a", line_nr=3)
+    for _ in range(terms - 1):
+        chain = PlusNode([chain, IdNode("a", line_nr=3)], line_nr=3)
+    return ProgNode(
+        [
+            MainNode(
+                [
+                    TypeNode("int", line_nr=1),
+                    NewVariableNode(
+                        [TypeNode("int"), IdNode("a", line_nr=2), IntNode("1")],
+                        line_nr=2,
+                    ),
+                    NewVariableNode(
+                        [TypeNode("int"), IdNode("b", line_nr=3), chain], line_nr=3
+                    ),
+                    ReturnNode([IdNode("b", line_nr=4)], line_nr=4),
+                ],
+                line_nr=1,
+            )
+        ],
+        line_nr=1,
+    )
+
+
+def timed(name: str, function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    print(f"{name:>22}: {time.perf_counter() - start:.3f}s")
+    return result
+
+
+if __name__ == "__main__":
+    terms = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    print(f"{terms} terms")
+    ast = generate_program(terms)
+    timed("convert_to_ast", Parser.convert_to_ast, ast)
+    symbol_table = SymbolTable()
+    timed("build_symbol_table", symbol_table.build_symbol_table, ast)
+    timed("resolve", symbol_table.resolve, ast)
+    timed("semantic analysis", SemanticAnalyzer.analyze, ast, symbol_table)
+    timed("dot export", DotExporter.to_dot, ast)
+    # Propagation only, folding would leave nothing of the chain to convert
+    folder = ConstantFolder(symbol_table, fold=False, propagate=True)
+    timed("constant propagation", folder.run, ast)
+    converter = LlvmConverter(symbol_table, "\n" * 4)
+    timed("llvm conversion", converter.convert, ast)
@@ -0,0 +1,71 @@
+"""
+Benchmark of emitting bitcode and object files in process compared to writing llvm code and running llc
+
+Compiles a generated program to llvm code once, then produces an object file by writing the .ll file and starting
+llc, and with the target machine in this process like --emit obj does. Also compares the size of the .ll and .bc
+outputs and the time llvm needs to load them again, which is what the rest of a toolchain pays for every file.
+
+Usage: python -m benchmarks.emit [lines]
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from llvmlite import binding
+
+from benchmarks.incremental import generate_program
+from src.llvm_target.Backend import emit, parse_module
+from src.main.Compiler import Compiler
+from src.main.Options import CompileOptions
+
+
+def timed(function, *args) -> tuple[object, float]:
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def run_llc(llvm_code: str, directory: str) -> None:
+    path = os.path.join(directory, "program.ll")
+    with open(path, "w") as f:
+        f.write(llvm_code)
+    subprocess.run(
+        [
+            "llc",
+            "-filetype=obj",
+            "-relocation-model=pic",
+            path,
+            "-o",
+            os.path.join(directory, "program.o"),
+        ],
+        check=True,
+    )
+
+
+if __name__ == "__main__":
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    source = "\n".join(generate_program(lines)) + "\n"
+    llvm_code = Compiler.compile_source(
+        source, CompileOptions(target_llvm="-", frontend="fast")
+    ).llvm_code
+    print(f"{lines} lines")
+
+    with tempfile.TemporaryDirectory() as directory:
+        try:
+            _, llc_time = timed(run_llc, llvm_code, directory)
+            print(f"  .ll + llc: {llc_time * 1000:.0f} ms")
+        except OSError:
+            print("  .ll + llc: llc not found")
+    obj, obj_time = timed(lambda: emit(parse_module(llvm_code), "obj"))
+    print(f"--emit obj: {obj_time * 1000:.0f} ms, {len(obj)} bytes")
+
+    bitcode = emit(parse_module(llvm_code), "bc")
+    print(f"   .ll size: {len(llvm_code.encode('utf-8'))} bytes")
+    print(f"   .bc size: {len(bitcode)} bytes")
+    _, ll_time = timed(binding.parse_assembly, llvm_code)
+    _, bc_time = timed(binding.parse_bitcode, bitcode)
+    print(f"   load .ll: {ll_time * 1000:.0f} ms")
+    print(f"   load .bc: {bc_time * 1000:.0f} ms")
@@ -0,0 +1,98 @@
+"""
+Benchmark of recompiling a large file after single-line edits
+
+Generates a program of 50000 lines and edits one line at a time at random places, like an editor that
+recompiles on every keystroke. Every version is parsed from scratch by the fast front end and by an
+IncrementalParser that keeps the statements of the previous version, and compiled to llvm with and without
+--incremental. The incremental compiler runs the symbol table, constant folding and llvm conversion again from the
+first changed statement, so the compile time depends on where the edit is: the edits are made at random places and
+in the last tenth of the file.
+
+Usage: python -m benchmarks.incremental [edits]
+"""
+
+import random
+import statistics
+import sys
+import time
+
+from src.main.Compiler import Compiler
+from src.main.IncrementalCompiler import IncrementalCompiler
+from src.main.Options import CompileOptions
+from src.parser.FastParser import FastParser
+from src.parser.IncrementalParser import IncrementalParser
+
+
+def generate_program(lines: int) -> list[str]:
+    # Only declarations with arithmetic and printf calls, which the llvm target can compile
+    program = ["int main() {", "    int x0 = 1;"]
+    i = 1
+    while len(program) < lines - 2:
+        if len(program) % 5 == 0:
+            program.append(f'    printf("%d", x{i - 1});')
+        else:
+            program.append(f"    int x{i} = x{i - 1} * 3 + {i % 7} - x{i // 2} / 2;")
+            i += 1
+    return program + ["    return 0;", "}"]
+
+
+def edit(lines: list[str], rng: random.Random, start: float = 0) -> list[str]:
+    # Change the value of a declaration in the body of main, after the given part of the file
+    lines = list(lines)
+    idx = rng.randrange(max(2, int(len(lines) * start)), len(lines) - 2)
+    while not lines[idx].startswith("    int "):
+        idx -= 1
+    name = lines[idx].split()[1]
+    lines[idx] = f"    int {name} = {name[:1]}0 + {rng.randrange(100)};"
+    return lines
+
+
+def timed(function, *args) -> float:
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    edits = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    rng = random.Random(0)
+    lines = generate_program(50000)
+    versions = [lines]
+    for _ in range(edits):
+        versions.append(edit(versions[-1], rng))
+    sources = ["\n".join(version) + "\n" for version in versions]
+    print(f"{len(lines)} lines, {edits} single-line edits, median per edit")
+
+    parser = IncrementalParser()
+    parser.parse(sources[0])
+    full = [timed(FastParser.parse_source, source) for source in sources[1:]]
+    incremental = [timed(parser.parse, source) for source in sources[1:]]
+    print(f"        full parse: {statistics.median(full) * 1000:.0f} ms")
+    print(
+        f" incremental parse: {statistics.median(incremental) * 1000:.0f} ms, "
+        f"{parser.reparsed} statements reparsed, {parser.reused} reused"
+    )
+
+    options = CompileOptions(target_llvm="-", frontend="fast")
+    incremental_options = CompileOptions(target_llvm="-", incremental=True)
+    full = [timed(Compiler.compile_source, source, options) for source in sources[1:3]]
+    print(f"      full compile: {statistics.median(full) * 1000:.0f} ms")
+    end_versions = [lines]
+    for _ in range(edits):
+        end_versions.append(edit(end_versions[-1], rng, 0.9))
+    for name, compiled_sources in (
+        ("random edit", sources),
+        ("   end edit", ["\n".join(version) + "\n" for version in end_versions]),
+    ):
+        compiler = IncrementalCompiler()
+        Compiler.compile_source(compiled_sources[0], incremental_options, compiler)
+        incremental, recompiled = [], []
+        for source in compiled_sources[1:]:
+            incremental.append(
+                timed(Compiler.compile_source, source, incremental_options, compiler)
+            )
+            recompiled.append(compiler.recompiled)
+        print(
+            f"incremental compile, {name}: {statistics.median(incremental) * 1000:.0f} ms, "
+            f"{statistics.median(recompiled):.0f} statements recompiled"
+        )
@@ -0,0 +1,58 @@
+"""
+Benchmark of running compiled test programs in process compared to running their llvm code with lli
+
+Compiles small generated programs to llvm code once, then runs every program by writing its .ll file and starting
+lli, and with the MCJIT engine in this process like --run does. Checks that both print the same output and
+reports the time per program, for --run split in the JIT compilation and the execution.
+
+Usage: python -m benchmarks.jit_run [programs]
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.incremental import generate_program
+from src.llvm_target.Backend import parse_module, run
+from src.main.Compiler import Compiler
+from src.main.Options import CompileOptions
+
+
+def run_lli(llvm_code: str, directory: str) -> tuple[int, str]:
+    path = os.path.join(directory, "program.ll")
+    with open(path, "w") as f:
+        f.write(llvm_code)
+    result = subprocess.run(["lli", path], capture_output=True, text=True)
+    return result.returncode, result.stdout
+
+
+if __name__ == "__main__":
+    programs = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    options = CompileOptions(target_llvm="-", frontend="fast")
+    llvm_codes = [
+        Compiler.compile_source(
+            "\n".join(generate_program(20 + i)) + "\n", options
+        ).llvm_code
+        for i in range(programs)
+    ]
+    print(f"{programs} programs")
+
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        lli_results = [run_lli(llvm_code, directory) for llvm_code in llvm_codes]
+        lli_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    jit_results = [run(parse_module(llvm_code)) for llvm_code in llvm_codes]
+    jit_total = time.perf_counter() - start
+
+    assert [(code, out) for code, out, _, _ in jit_results] == lli_results
+    jit_time = sum(result[2] for result in jit_results)
+    run_time = sum(result[3] for result in jit_results)
+    print(f"  lli: {lli_time / programs * 1000:.1f} ms per program")
+    print(
+        f"--run: {jit_total / programs * 1000:.1f} ms per program, "
+        f"jit {jit_time / programs * 1000:.1f} ms, run {run_time / programs * 1000:.2f} ms"
+    )
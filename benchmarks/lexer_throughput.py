@@ -0,0 +1,36 @@
+"""
+Benchmark of the lexer throughput in tokens per second
+
+Tokenizes a large generated program with the ANTLR lexer and with the fast lexer (`--lexer fast`), and parses it
+with both lexers to show the share of the lexer in the parse time.
+
+Usage: python -m benchmarks.lexer_throughput [statements]
+"""
+
+import sys
+import time
+
+from antlr4 import CommonTokenStream, InputStream
+
+from benchmarks.parse_throughput import generate_program
+from src.parser.Parser import LEXERS, Parser
+
+if __name__ == "__main__":
+    statements = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    source = generate_program(statements)
+    # Warm up the prediction DFA, the first parse of the process builds it
+    Parser.parse_source(source)
+    for lexer in LEXERS:
+        start = time.perf_counter()
+        stream = CommonTokenStream(LEXERS[lexer](InputStream(source)))
+        stream.fill()
+        lex_time = time.perf_counter() - start
+        tokens = len(stream.tokens)
+
+        start = time.perf_counter()
+        Parser.parse_source(source, lexer=lexer)
+        parse_time = time.perf_counter() - start
+        print(
+            f"{lexer:>5}: lex {lex_time:.2f}s, {tokens / lex_time:.0f} tokens/s, "
+            f"parse {parse_time:.2f}s"
+        )
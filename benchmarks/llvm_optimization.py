@@ -0,0 +1,55 @@
+"""
+Benchmark of the in-process llvm optimization
+
+Compiles a generated program to llvm code and optimizes it at every --opt-level, reports the time of verifying and
+optimizing the module and the amount of instructions left. Also compares asking llvm-config for the target triple,
+which the converter did for every compilation, to asking llvmlite.
+
+Usage: python -m benchmarks.llvm_optimization [lines]
+"""
+
+import subprocess
+import sys
+import time
+
+from llvmlite import binding
+
+from benchmarks.incremental import generate_program
+from src.llvm_target.Backend import (
+    OPT_LEVELS,
+    count_instructions,
+    optimize,
+    parse_module,
+)
+from src.main.Compiler import Compiler
+from src.main.Options import CompileOptions
+
+if __name__ == "__main__":
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    source = "\n".join(generate_program(lines)) + "\n"
+    # Without constant folding, so the optimizer has the constants to fold as well
+    llvm_code = Compiler.compile_source(
+        source,
+        CompileOptions(target_llvm="-", frontend="fast", no_const_folding=True),
+    ).llvm_code
+    print(f"{lines} lines")
+    for opt_level in OPT_LEVELS:
+        start = time.perf_counter()
+        module = parse_module(llvm_code)
+        before = count_instructions(module)
+        optimize(module, opt_level, ["mem2reg"] if opt_level == 0 else None)
+        elapsed = time.perf_counter() - start
+        print(
+            f"-O{opt_level}{' mem2reg' if opt_level == 0 else ''}: {elapsed:.2f}s, "
+            f"{before} -> {count_instructions(module)} instructions"
+        )
+
+    start = time.perf_counter()
+    try:
+        subprocess.check_output(["llvm-config", "--host-target"])
+        print(f"llvm-config triple: {(time.perf_counter() - start) * 1000:.1f} ms")
+    except (OSError, subprocess.CalledProcessError):
+        print("llvm-config triple: llvm-config not found")
+    start = time.perf_counter()
+    binding.get_default_triple()
+    print(f"llvmlite triple: {(time.perf_counter() - start) * 1000:.3f} ms")
@@ -0,0 +1,53 @@
+"""
+Benchmark of the register allocation of the MIPS code
+
+Converts a generated program to MIPS with all registers and without any registers, where every value is loaded from
+and stored to the stack around every instruction like a stack machine. Reports the conversion time, the amount of
+instructions, the spilled registers and the stack loads and stores.
+
+Usage: python -m benchmarks.mips_allocation [lines]
+"""
+
+import sys
+import time
+
+from benchmarks.incremental import generate_program
+from src.mips_target.MipsConverter import MipsConverter
+from src.mips_target.RegisterAllocator import (
+    FLOAT_REGISTERS,
+    INT_REGISTERS,
+    LinearScanAllocator,
+)
+from src.parser.FastParser import FastParser
+from src.parser.SymbolTable import SymbolTable
+
+if __name__ == "__main__":
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    source = "\n".join(generate_program(lines)) + "\n"
+    print(f"{lines} lines")
+    for name, int_registers, float_registers in (
+        ("registers", INT_REGISTERS, FLOAT_REGISTERS),
+        ("    stack", (), ()),
+    ):
+        ast = FastParser.parse_source(source)
+        symbol_table = SymbolTable()
+        symbol_table.build_symbol_table(ast)
+        symbol_table.resolve(ast)
+
+        start = time.perf_counter()
+        converter = MipsConverter(
+            symbol_table, source, LinearScanAllocator(int_registers, float_registers)
+        )
+        converter.convert(ast)
+        mips_code = converter.return_mips_code()
+        convert_time = time.perf_counter() - start
+
+        allocator = converter.allocator
+        instructions = sum(
+            not line.lstrip().startswith("#") and line.startswith("    ")
+            for line in mips_code.splitlines()
+        )
+        print(
+            f"{name}: convert {convert_time * 1000:.0f} ms, {instructions} instructions, "
+            f"{allocator.spilled} spilled registers, {allocator.loads} loads, {allocator.stores} stores"
+        )
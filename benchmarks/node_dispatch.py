@@ -0,0 +1,183 @@
+"""
+Benchmark of the dispatch on the kind of AST nodes
+
+Builds a large expression-heavy program, `int v = 0 + <expression>;` for many random expressions, and times the
+lookups that depend on the kind of a node: the llvm type of every node and the value of every literal. Both are timed
+with the kind tables of the compiler and with a reference that checks the classes one by one like the match
+statements that were used before. Also reports the time of constant folding the whole program.
+
+Usage: python -m benchmarks.node_dispatch [statements]
+"""
+
+import random
+import sys
+import time
+
+from llvmlite import ir
+
+from src.llvm_target.Converter import node_to_llvmtype
+from src.parser.ConstantFolder import ConstantFolder, literal_value
+from src.parser.SymbolTable import SymbolTable
+from src.parser.TreeNode import *
+from src.parser.Walker import preorder
+
+BINARY_NODES = [
+    PlusNode,
+    MinusNode,
+    MultNode,
+    DivNode,
+    ModNode,
+    LShiftNode,
+    RShiftNode,
+    EqualNode,
+    NeqNode,
+    LtNode,
+    GtNode,
+    LeqNode,
+    GeqNode,
+    AndNode,
+    OrNode,
+]
+
+
+def random_literal(rng: random.Random) -> TreeNode:
+    match rng.randrange(4):
+        case 0:
+            return IntNode(str(rng.randrange(1, 100)))
+        case 1:
+            return FloatNode(str(rng.randrange(1, 100) / 4))
+        case 2:
+            return CharNode(f"'{chr(rng.randrange(97, 123))}'")
+        case _:
+            return BoolNode(rng.choice(("true", "false")))
+
+
+def random_expression(rng: random.Random, depth: int) -> TreeNode:
+    if depth == 0:
+        return random_literal(rng)
+    operator = rng.choice(BINARY_NODES)
+    return operator(
+        [random_expression(rng, depth - 1), random_expression(rng, depth - 1)]
+    )
+
+
+def generate_program(statements: int) -> ProgNode:
+    rng = random.Random(0)
+    body = [TypeNode("int")]
+    for idx in range(statements):
+        body.append(
+            NewVariableNode(
+                [
+                    TypeNode("int"),
+                    IdNode(f"v{idx}"),
+                    # The declared type is the type of the leftmost operand
+                    PlusNode([IntNode("0"), random_expression(rng, 4)]),
+                ]
+            )
+        )
+    return ProgNode([MainNode(body)])
+
+
+def reference_llvmtype(node: TreeNode) -> ir.Type:
+    # The class checks of the match statement used before, without the nodes that need the symbol table
+    while True:
+        match node:
+            case PlusNode() | MultNode() | DivNode() | MinusNode() | PointerNode():
+                node = node.children[0]
+            case AssignNode():
+                node = node.children[1]
+            case _:
+                break
+
+    match node:
+        case IntNode():
+            return ir.IntType(32)
+        case FloatNode():
+            return ir.FloatType()
+        case StringNode():
+            return ir.ArrayType(ir.IntType(8), len(node.value))
+        case FloatPointerNode():
+            return ir.FloatType()
+        case IntPointerNode():
+            return ir.IntType(32)
+        case CharPointerNode():
+            return ir.IntType(8)
+        case BoolPointerNode():
+            return ir.IntType(1)
+        case LShiftNode():
+            return ir.IntType(32)
+        case RShiftNode():
+            return ir.IntType(32)
+        case EqualNode():
+            return ir.IntType(1)
+        case NeqNode():
+            return ir.IntType(1)
+        case GtNode():
+            return ir.IntType(1)
+        case LtNode():
+            return ir.IntType(1)
+        case GeqNode():
+            return ir.IntType(1)
+        case LeqNode():
+            return ir.IntType(1)
+        case AndNode():
+            return ir.IntType(1)
+        case OrNode():
+            return ir.IntType(1)
+        case NotNode():
+            return ir.IntType(1)
+        case ModNode():
+            return ir.IntType(32)
+        case CharNode():
+            return ir.IntType(8)
+        case BoolNode():
+            return ir.IntType(1)
+        case _:
+            raise Exception(f"Unknown type: {node}")
+
+
+def reference_literal_value(node: TreeNode) -> int | float | None:
+    match node:
+        case IntNode():
+            return int(node.value)
+        case FloatNode():
+            return float(node.value)
+        case CharNode():
+            return ord(node.value[1:-1])
+        case BoolNode():
+            return int(node.value == "true")
+    return None
+
+
+def timed(function, nodes: list[TreeNode]) -> float:
+    start = time.perf_counter()
+    for node in nodes:
+        function(node)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    statements = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    ast = generate_program(statements)
+    expressions = [
+        node
+        for node in preorder(ast)
+        if not isinstance(node, (ProgNode, MainNode, NewVariableNode, TypeNode, IdNode))
+    ]
+    print(f"{statements} statements, {len(expressions)} expression nodes")
+
+    symbol_table = SymbolTable()
+    kind_time = timed(lambda node: node_to_llvmtype(node, symbol_table), expressions)
+    reference_time = timed(reference_llvmtype, expressions)
+    print(f"  llvm type: match {reference_time:.3f}s, kind table {kind_time:.3f}s")
+
+    kind_time = timed(literal_value, expressions)
+    reference_time = timed(reference_literal_value, expressions)
+    print(f"    literal: match {reference_time:.3f}s, kind table {kind_time:.3f}s")
+
+    symbol_table.build_symbol_table(ast)
+    start = time.perf_counter()
+    rewritten = ConstantFolder(symbol_table).run(ast)
+    print(
+        f"    folding: {time.perf_counter() - start:.3f}s, {rewritten} nodes rewritten"
+    )
@@ -0,0 +1,111 @@
+"""
+Benchmark of the memory used per AST node
+
+Builds the AST of `int x<i> = x<i-1> * 2 + 3;` for many declarations, once with the slotted TreeNode classes and
+once with classes that keep their attributes in a per-instance __dict__ like the nodes did before. The memory is
+measured with tracemalloc and reported per node, the children lists are included.
+
+Usage: python -m benchmarks.node_memory [declarations]
+"""
+
+import sys
+import tracemalloc
+
+from src.parser.TreeNode import *
+
+
+class DictNode:
+    """
+    Node with a per-instance __dict__, the layout of TreeNode before it used __slots__
+    """
+
+    def __init__(self, value: str, line_nr: int = -1, children=None) -> None:
+        self.value = value
+        self.children = children if children is not None else []
+        self.line_nr = line_nr
+
+
+class DictIdNode(DictNode):
+    def __init__(self, value: str, line_nr: int = -1) -> None:
+        super().__init__(value, line_nr=line_nr)
+        self.entry = None
+
+
+def build_slotted(declarations: int) -> list[TreeNode]:
+    return [
+        NewVariableNode(
+            [
+                TypeNode("int", line_nr=i, column=0),
+                IdNode(f"x{i}", line_nr=i, column=4),
+                PlusNode(
+                    [
+                        MultNode(
+                            [
+                                IdNode(f"x{i - 1}", line_nr=i, column=10),
+                                IntNode("2", line_nr=i, column=15),
+                            ],
+                            line_nr=i,
+                            column=10,
+                        ),
+                        IntNode("3", line_nr=i, column=19),
+                    ],
+                    line_nr=i,
+                    column=10,
+                ),
+            ],
+            line_nr=i,
+            column=0,
+        )
+        for i in range(declarations)
+    ]
+
+
+def build_dict(declarations: int) -> list[DictNode]:
+    return [
+        DictNode(
+            "NewVar",
+            line_nr=i,
+            children=[
+                DictNode("int", line_nr=i),
+                DictIdNode(f"x{i}", line_nr=i),
+                DictNode(
+                    "+",
+                    line_nr=i,
+                    children=[
+                        DictNode(
+                            "*",
+                            line_nr=i,
+                            children=[
+                                DictIdNode(f"x{i - 1}", line_nr=i),
+                                DictNode("2", line_nr=i),
+                            ],
+                        ),
+                        DictNode("3", line_nr=i),
+                    ],
+                ),
+            ],
+        )
+        for i in range(declarations)
+    ]
+
+
+def measure(build, declarations: int) -> int:
+    tracemalloc.start()
+    nodes = build(declarations)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del nodes
+    return size
+
+
+if __name__ == "__main__":
+    declarations = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    nodes = declarations * 7
+    # The id names are allocated in both cases, measure them separately
+    names = measure(
+        lambda n: [name for i in range(n) for name in (f"x{i}", f"x{i - 1}")],
+        declarations,
+    )
+    for name, build in (("__dict__", build_dict), ("__slots__", build_slotted)):
+        size = measure(build, declarations) - names
+        print(f"{name:>9}: {size / nodes:.1f} bytes per node ({nodes} nodes)")
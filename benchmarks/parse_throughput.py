@@ -0,0 +1,78 @@
+"""
+Benchmark of the parse throughput in tokens per second
+
+Generates a large program with declarations, assignments, printf calls and arithmetic, comparison and logical
+expressions and parses it twice with every parse mode. The prediction DFA of the parser is built during the first parse and
+shared by all later parses in the process, so only the very first parse pays the warm-up. The time of building the AST
+with the hand-written front end (`--frontend fast`) is reported for comparison.
+
+Usage: python -m benchmarks.parse_throughput [statements]
+"""
+
+import random
+import sys
+import time
+
+from antlr4 import CommonTokenStream, InputStream
+
+from src.antlr_files.compilerLexer import compilerLexer
+from src.parser.FastParser import FastParser
+from src.parser.Parser import PARSE_MODES, Parser
+
+OPERATORS = ["+", "-", "*", "/", "%", "<", ">", "<=", ">=", "==", "!=", "&&", "||"]
+
+
+def expression(rng: random.Random, variables: int, depth: int) -> str:
+    if depth == 0 or rng.random() < 0.3:
+        if variables and rng.random() < 0.6:
+            return f"x{rng.randrange(variables)}"
+        return str(rng.randrange(1, 100))
+    left = expression(rng, variables, depth - 1)
+    right = expression(rng, variables, depth - 1)
+    if rng.random() < 0.2:
+        return f"({left} {rng.choice(OPERATORS)} {right})"
+    return f"{left} {rng.choice(OPERATORS)} {right}"
+
+
+def generate_program(statements: int) -> str:
+    rng = random.Random(0)
+    lines = ["int g = 1;", "int main() {", "    int x0 = 0;"]
+    for i in range(1, statements):
+        match i % 4:
+            case 0:
+                lines.append(f"    x{i - 1} = {expression(rng, i, 3)};")
+                lines.append(f"    int x{i} = x{i - 1};")
+            case 1:
+                lines.append(f'    printf("%d", {expression(rng, i, 2)});')
+                lines.append(f"    int x{i} = -{rng.randrange(100)};")
+            case _:
+                lines.append(f"    int x{i} = {expression(rng, i, 4)};")
+    lines.append("    return 0;")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def count_tokens(source: str) -> int:
+    stream = CommonTokenStream(compilerLexer(InputStream(source)))
+    stream.fill()
+    return len(stream.tokens)
+
+
+if __name__ == "__main__":
+    statements = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    source = generate_program(statements)
+    tokens = count_tokens(source)
+    print(f"{statements} statements, {tokens} tokens")
+    for parse_mode in PARSE_MODES:
+        for run in ("first", "second"):
+            start = time.perf_counter()
+            Parser.parse_source(source, parse_mode=parse_mode)
+            elapsed = time.perf_counter() - start
+            print(
+                f"{parse_mode:>4} {run:>6}: {elapsed:.2f}s, {tokens / elapsed:.0f} tokens/s"
+            )
+    print(f"{Parser.sll_parses} sll parses, {Parser.ll_fallbacks} fell back to ll")
+    start = time.perf_counter()
+    FastParser.parse_source(source)
+    elapsed = time.perf_counter() - start
+    print(f"fast frontend: {elapsed:.2f}s, {tokens / elapsed:.0f} tokens/s")
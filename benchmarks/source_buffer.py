@@ -0,0 +1,67 @@
+"""
+Benchmark of reading a large source file for the lexer and the line comments of the converter
+
+Writes a generated program to a file and reads it like the compiler did before, with an antlr4 FileStream for the
+lexer and a list of all lines for the converter, and with one memory-mapped SourceBuffer for both. Every line is
+looked up once, like the converter comments every statement. The time and the memory measured with tracemalloc
+are reported, the memory-mapped file itself is not allocated by python.
+
+Usage: python -m benchmarks.source_buffer [statements]
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from antlr4 import FileStream
+
+from benchmarks.parse_throughput import generate_program
+from src.parser.Parser import Parser
+from src.parser.SourceBuffer import SourceBuffer
+
+
+def read_separately(path: str) -> list:
+    input_stream = FileStream(path)
+    with open(path) as f:
+        lines = f.read().splitlines()
+    comments = [lines[line_nr - 1].strip() for line_nr in range(1, len(lines) + 1)]
+    return [input_stream, lines, comments]
+
+
+def read_buffer(path: str) -> list:
+    source = SourceBuffer.open(path)
+    input_stream = Parser.create_input_stream(source)
+    comments = [
+        source.line(line_nr).strip() for line_nr in range(1, source.line_count + 1)
+    ]
+    return [source, input_stream, comments]
+
+
+def measure(read, path: str) -> tuple[float, int]:
+    # Timed without tracemalloc, tracing every allocation slows down the many small allocations a lot
+    start = time.perf_counter()
+    read(path)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    result = read(path)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return elapsed, size
+
+
+if __name__ == "__main__":
+    statements = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "input.c")
+        with open(path, "w") as f:
+            f.write(generate_program(statements))
+        print(f"{statements} statements, {os.path.getsize(path) / 1024:.0f} KB")
+        for name, read in (
+            ("FileStream + lines", read_separately),
+            ("SourceBuffer", read_buffer),
+        ):
+            elapsed, size = measure(read, path)
+            print(f"{name:>18}: {elapsed:.2f}s, {size / 1024 / 1024:.1f} MB")
@@ -0,0 +1,49 @@
+"""
+Benchmark of generating locals as SSA values compared to allocas
+
+Converts a generated program to llvm code with and without --ssa and reports the conversion time, the size of the
+llvm code, the amount of instructions and the time of optimizing the module with mem2reg and at -O2.
+
+Usage: python -m benchmarks.ssa [lines]
+"""
+
+import sys
+import time
+
+from benchmarks.incremental import generate_program
+from src.llvm_target.Backend import count_instructions, optimize, parse_module
+from src.llvm_target.Converter import LlvmConverter
+from src.parser.FastParser import FastParser
+from src.parser.SymbolTable import SymbolTable
+
+if __name__ == "__main__":
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    source = "\n".join(generate_program(lines)) + "\n"
+    print(f"{lines} lines")
+    for ssa in (False, True):
+        # The converter stores its values in the symbol table, every conversion gets its own AST and table
+        ast = FastParser.parse_source(source)
+        symbol_table = SymbolTable()
+        symbol_table.build_symbol_table(ast)
+        symbol_table.resolve(ast)
+
+        start = time.perf_counter()
+        converter = LlvmConverter(symbol_table, source, ssa=ssa)
+        converter.convert(ast)
+        llvm_code = converter.return_llvm_code()
+        convert_time = time.perf_counter() - start
+
+        module = parse_module(llvm_code)
+        instructions = count_instructions(module)
+        start = time.perf_counter()
+        optimize(module, 0, ["mem2reg"])
+        mem2reg_time = time.perf_counter() - start
+        module = parse_module(llvm_code)
+        start = time.perf_counter()
+        optimize(module, 2)
+        o2_time = time.perf_counter() - start
+
+        print(
+            f"{'   ssa' if ssa else 'alloca'}: convert {convert_time * 1000:.0f} ms, {len(llvm_code)} bytes, "
+            f"{instructions} instructions, mem2reg {mem2reg_time * 1000:.0f} ms, -O2 {o2_time * 1000:.0f} ms"
+        )
@@ -0,0 +1,82 @@
+"""
+Benchmark of the startup time of the compiler
+
+Starts `python -m src.main` in a new process, so every run pays the full import cost, for `--help`, for a compile
+that only writes the symbol table and for a compile to LLVM. Reports the median wall time of every command and which
+of the heavy dependencies (antlr4, llvmlite, graphviz) the command imported, found with `python -X importtime`.
+
+Usage: python -m benchmarks.startup [runs]
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+SOURCE = """
+int x = 1;
+int main() {
+    int y = x + 2 * 3;
+    printf("%d", y);
+    return 0;
+}
+"""
+
+DEPENDENCIES = ("antlr4", "llvmlite", "graphviz")
+
+
+def imported_dependencies(args: list[str]) -> list[str]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "src.main", *args],
+        capture_output=True,
+        text=True,
+    )
+    # Every line of importtime is "import time: self | cumulative | module", nested modules are indented
+    modules = {line.rsplit("|", 1)[-1].strip() for line in result.stderr.splitlines()}
+    return [dependency for dependency in DEPENDENCIES if dependency in modules]
+
+
+def run(args: list[str], runs: int) -> float | None:
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-m", "src.main", *args], capture_output=True
+        )
+        times.append(time.perf_counter() - start)
+        if result.returncode != 0:
+            return None
+    return statistics.median(times)
+
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    with tempfile.TemporaryDirectory() as directory:
+        input_file = os.path.join(directory, "startup.c")
+        with open(input_file, "w") as f:
+            f.write(SOURCE)
+        commands = {
+            "--help": ["--help"],
+            "symbol table": [
+                "--input",
+                input_file,
+                "--render_symb",
+                os.path.join(directory, "startup"),
+            ],
+            "llvm": [
+                "--input",
+                input_file,
+                "--target_llvm",
+                os.path.join(directory, "startup.ll"),
+            ],
+        }
+        print(f"median of {runs} cold runs")
+        for name, args in commands.items():
+            elapsed = run(args, runs)
+            if elapsed is None:
+                print(f"{name:>12}: failed, is the parser generated? (bash build.sh)")
+                continue
+            dependencies = ", ".join(imported_dependencies(args)) or "none"
+            print(f"{name:>12}: {elapsed * 1000:.0f} ms, imports {dependencies}")
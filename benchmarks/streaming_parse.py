@@ -0,0 +1,42 @@
+"""
+Benchmark of the streaming parse mode on a large generated program
+
+Generates a program with many declarations and assignments in main and parses it once with the parse tree of the
+whole file and once statement by statement. Reports the time and the peak memory (tracemalloc) of both modes.
+
+Usage: python -m benchmarks.streaming_parse [statements]
+"""
+
+import sys
+import time
+import tracemalloc
+
+from src.parser.Parser import Parser
+
+
+def generate_program(statements: int) -> str:
+    lines = ["int g = 1;", "int main() {", "    int x0 = 0;"]
+    for i in range(1, statements):
+        lines.append(f"    int x{i} = x{i - 1} * 2 + (g - {i % 7}) / 3;")
+    lines.append("    return 0;")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def measure(source: str, streaming: bool) -> tuple[float, int]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    Parser.parse_source(source, streaming=streaming)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+if __name__ == "__main__":
+    statements = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    source = generate_program(statements)
+    print(f"{statements} statements, {len(source) / 1024:.0f} KB of source")
+    for name, streaming in (("parse tree", False), ("streaming", True)):
+        elapsed, peak = measure(source, streaming)
+        print(f"{name:>10}: {elapsed:.2f}s, peak memory {peak / 1024 / 1024:.1f} MB")
@@ -0,0 +1,116 @@
+"""
+Benchmark of the symbol table on a program with many declarations
+
+Builds the AST of a program with a global and a local declaration per variable, every local declaration reads
+the previous local. The symbol table is built and resolved and the program is converted to LLVM, once with the
+hashed scopes and once with scopes that scan a list like the old implementation did.
+
+Usage: python -m benchmarks.symbol_table [declarations]
+"""
+
+import sys
+import time
+
+from src.llvm_target.Converter import LlvmConverter
+from src.parser.SymbolTable import SymbolTable, Table
+from src.parser.TreeNode import *
+
+
+class ListScope(list):
+    """
+    Scope that looks entries up with a linear scan, the way Table did before it was backed by a dict
+    """
+
+    def __setitem__(self, name, entry) -> None:
+        self.append(entry)
+
+    def __getitem__(self, name):
+        entry = self.get(name)
+        if entry is None:
+            raise KeyError(name)
+        return entry
+
+    def get(self, name):
+        for entry in self:
+            if entry.name == name:
+                return entry
+        return None
+
+    def values(self):
+        return self
+
+
+def generate_program(declarations: int) -> ProgNode:
+    globals_ = [
+        NewVariableNode(
+            [TypeNode("int", line_nr=1), IdNode(f"g{i}", line_nr=1), IntNode(str(i))],
+            line_nr=1,
+        )
+        for i in range(declarations)
+    ]
+    locals_ = [
+        NewVariableNode(
+            [TypeNode("int", line_nr=1), IdNode("l0", line_nr=1), IntNode("0")],
+            line_nr=1,
+        )
+    ]
+    for i in range(1, declarations):
+        locals_.append(
+            NewVariableNode(
+                [
+                    TypeNode("int", line_nr=1),
+                    IdNode(f"l{i}", line_nr=1),
+                    PlusNode([IdNode(f"l{i - 1}"), IntNode(str(i))], line_nr=1),
+                ],
+                line_nr=1,
+            )
+        )
+    main = MainNode(
+        [TypeNode("int", line_nr=1)]
+        + locals_
+        + [ReturnNode([IdNode(f"l{declarations - 1}")], line_nr=1)],
+        line_nr=1,
+    )
+    return ProgNode(globals_ + [main], line_nr=1)
+
+
+def run(declarations: int, linear: bool) -> tuple[float, float]:
+    ast = generate_program(declarations)
+
+    symbol_table = SymbolTable()
+    if linear:
+        symbol_table.tables[0].table = ListScope()
+        original_init = Table.__init__
+
+        def init(self, parent_id: int = -1) -> None:
+            original_init(self, parent_id)
+            self.table = ListScope()
+
+        Table.__init__ = init
+
+    try:
+        start = time.perf_counter()
+        symbol_table.build_symbol_table(ast)
+        symbol_table.resolve(ast)
+        build_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        converter = LlvmConverter(symbol_table, "int main() {\n}\n")
+        converter.convert(ast)
+        convert_time = time.perf_counter() - start
+    finally:
+        if linear:
+            Table.__init__ = original_init
+
+    return build_time, convert_time
+
+
+if __name__ == "__main__":
+    declarations = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+
+    print(f"{declarations} global and {declarations} local declarations")
+    for name, linear in (("list scan", True), ("hashed", False)):
+        build_time, convert_time = run(declarations, linear)
+        print(
+            f"{name:>10}: build and resolve {build_time:8.3f}s, convert {convert_time:8.3f}s"
+        )
@@ -0,0 +1,18 @@
+# generate the ANTLR lexer, parser and visitor from compiler.g4 and byte-compile the compiler
+# the ANTLR tool is pinned to the version of antlr4-python3-runtime in requirements.txt, the generated code only
+# runs on the runtime of the same version
+set -e
+ANTLR_VERSION=4.13.1
+ANTLR_JAR=antlr-$ANTLR_VERSION-complete.jar
+
+if [ ! -f "$ANTLR_JAR" ]; then
+    echo "Downloading $ANTLR_JAR"
+    curl -sSfLO https://www.antlr.org/download/$ANTLR_JAR
+fi
+
+echo "Generating src/antlr_files from compiler.g4"
+java -jar $ANTLR_JAR -Dlanguage=Python3 -visitor -no-listener -Xexact-output-dir -o src/antlr_files compiler.g4
+
+# byte-compile ahead of time, so the first run doesn't have to compile the large generated parser
+echo "Byte-compiling src"
+python -m compileall -q src
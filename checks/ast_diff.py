@@ -0,0 +1,84 @@
+"""
+Structural check of the fast front end against the ANTLR front end
+
+Parses every input file with Parser (ANTLR) and with FastParser and compares the ASTs node by node: the class,
+value, line, column and pointer depth of every node and the order of the children. Prints the path to the first
+difference of every file that differs, files that both front ends reject are reported with both errors. Exits with
+1 if any file differs.
+
+Usage: python -m checks.ast_diff [inputs...]
+Inputs are files, directories or glob patterns like --input, the default is the input directory.
+"""
+
+import sys
+
+from src.main.Options import expand_inputs
+from src.parser.FastParser import FastParser
+from src.parser.Parser import Parser
+from src.parser.SourceBuffer import SourceBuffer
+from src.parser.TreeNode import TreeNode
+
+
+def describe(node: TreeNode) -> tuple:
+    return (
+        node.__class__.__name__,
+        node.value,
+        node.line_nr,
+        node.column,
+        getattr(node, "depth", None),
+        len(node.children),
+    )
+
+
+def first_difference(expected: TreeNode, actual: TreeNode) -> str | None:
+    """
+    Compare two ASTs with an explicit stack
+    :param expected: The AST of the ANTLR front end
+    :param actual: The AST of the fast front end
+    :return: str | None : The path to the first node that differs and both nodes, None if the ASTs are the same
+    """
+    stack: list[tuple[TreeNode, TreeNode, str]] = [(expected, actual, "")]
+    while stack:
+        expected_node, actual_node, path = stack.pop()
+        path = f"{path}/{expected_node.__class__.__name__}"
+        if describe(expected_node) != describe(actual_node):
+            return (
+                f"{path}: antlr {describe(expected_node)}, fast {describe(actual_node)}"
+            )
+        stack.extend(
+            (expected_child, actual_child, f"{path}[{idx}]")
+            for idx, (expected_child, actual_child) in reversed(
+                list(enumerate(zip(expected_node.children, actual_node.children)))
+            )
+        )
+    return None
+
+
+def parse(function, source: SourceBuffer) -> tuple[TreeNode | None, str | None]:
+    try:
+        return function(source), None
+    except Exception as e:
+        return None, str(e) or e.__class__.__name__
+
+
+if __name__ == "__main__":
+    input_files = expand_inputs(sys.argv[1:] or ["input"])
+    different = 0
+    for input_file in input_files:
+        # Read like the compiler reads its input
+        with SourceBuffer.open(input_file) as source:
+            antlr_ast, antlr_error = parse(Parser.parse_source, source)
+            fast_ast, fast_error = parse(FastParser.parse_source, source)
+        if antlr_ast is None or fast_ast is None:
+            if antlr_ast is not None or fast_ast is not None:
+                different += 1
+            print(
+                f"{input_file}: antlr error {antlr_error!r}, fast error {fast_error!r}"
+            )
+            continue
+        difference = first_difference(antlr_ast, fast_ast)
+        if difference is not None:
+            different += 1
+            print(f"{input_file}: {difference}")
+    print(f"{len(input_files) - different}/{len(input_files)} files have the same AST")
+    sys.exit(1 if different else 0)
@@ -0,0 +1,186 @@
+"""
+Differential check of --incremental against compiling the whole source
+
+Generates random programs and edits them one line at a time: lines are changed, inserted and removed at random
+places, some edits take the address of a variable that was kept in a register, empty main or make a statement
+invalid. Every version is compiled by one IncrementalCompiler and from scratch with the fast front end, with
+constant folding and propagation, without them and with --ssa. The llvm code, the symbol table, the stats and the
+errors have to be the same. Prints every version that differs and exits with 1 if any differs.
+
+Usage: python -m checks.incremental_diff [programs] [edits]
+"""
+
+import random
+import sys
+
+from src.main.Compiler import Compiler
+from src.main.IncrementalCompiler import IncrementalCompiler
+from src.main.Options import CompileOptions
+
+OPTIONS: dict[str, dict] = {
+    "default": {},
+    "ssa": {"ssa": True},
+    "no folding": {"no_const_folding": True},
+    "no propagation": {"no_const_propagation": True},
+    "nothing": {"no_const_folding": True, "no_const_propagation": True},
+}
+
+
+def expression(rng: random.Random, names: list[str]) -> str:
+    if not names:
+        return str(rng.randrange(10))
+    left, right = rng.choice(names), rng.choice(names)
+    return rng.choice(
+        (
+            f"{left} + {rng.randrange(10)}",
+            f"{left} * {right} - {rng.randrange(1, 5)}",
+            f"{rng.randrange(10)} + {rng.randrange(10)} * {left}",
+            f"({left} - {right}) / {rng.randrange(1, 5)}",
+            left,
+        )
+    )
+
+
+def statement(rng: random.Random, names: list[str], pointers: list[str], idx: int):
+    """
+    Returns a random statement of main that only uses the variables declared before it
+    :param rng: The random generator
+    :param names: The int variables declared before the statement
+    :param pointers: The int pointers declared before the statement
+    :param idx: A number to make the declared name unique
+    :return: tuple[str, str | None, str | None] : The statement, the declared int and the declared pointer
+    """
+    choice = rng.randrange(10)
+    if choice < 3 or not names:
+        return f"int v{idx} = {expression(rng, names)};", f"v{idx}", None
+    if choice == 3:
+        return f"const int c{idx} = {expression(rng, names)};", f"c{idx}", None
+    if choice == 4:
+        return f"int* p{idx} = &{rng.choice(names)};", None, f"p{idx}"
+    if choice == 5 and pointers:
+        return f"*{rng.choice(pointers)} = {expression(rng, names)};", None, None
+    if choice == 6:
+        return f'printf("%d\\n", {rng.choice(names)});', None, None
+    if choice == 7:
+        return f"// comment {idx}", None, None
+    if choice == 8:
+        return f"float f{idx} = {rng.randrange(10)}.5 * 2.0;", None, None
+    target = rng.choice(names)
+    if target.startswith("c"):
+        return f'printf("value %d\\n", {target});', None, None
+    return f"{target} = {expression(rng, names)};", None, None
+
+
+def program(rng: random.Random, body: list[str]) -> str:
+    lines = ["int g0 = 3;", "const int g1 = 4;", "int main() {"]
+    lines += [f"    {line}" for line in body]
+    lines += ["}"]
+    # A declaration after main is declared in main, but can hide a global of the same name
+    lines += rng.choice(
+        ([], [], ["int after = 5;"], ["int g0 = 5;", "int after = g0;"])
+    )
+    return "\n".join(lines) + "\n"
+
+
+def generate_body(rng: random.Random, size: int, start: int = 0) -> list[str]:
+    names, pointers, body = ["g0", "g1"], [], []
+    for idx in range(start, start + size):
+        line, name, pointer = statement(rng, names, pointers, idx)
+        body.append(line)
+        if name is not None:
+            names.append(name)
+        if pointer is not None:
+            pointers.append(pointer)
+    return body
+
+
+def declared_before(body: list[str], idx: int) -> tuple[list[str], list[str]]:
+    names, pointers = ["g0", "g1"], []
+    for line in body[:idx]:
+        if line.startswith(("int v", "const int c")):
+            names.append(
+                line.split()[-3] if line.startswith("const") else line.split()[1]
+            )
+        elif line.startswith("int* p"):
+            pointers.append(line.split()[1])
+    return names, pointers
+
+
+def edit(rng: random.Random, body: list[str], counter: int) -> list[str]:
+    body = list(body)
+    choice = rng.randrange(12)
+    idx = rng.randrange(len(body) + 1)
+    names, pointers = declared_before(body, idx)
+    if choice == 0 and body:
+        # Can remove a declaration that is used later, both compilations have to fail the same way
+        del body[min(idx, len(body) - 1)]
+    elif choice == 1:
+        body.insert(idx, statement(rng, names, pointers, counter)[0])
+    elif choice == 2 and names:
+        # Takes the address of a variable that can be declared in a register before it
+        body.insert(idx, f"int* q{counter} = &{rng.choice(names)};")
+    elif choice == 3:
+        body = [] if rng.randrange(2) else generate_body(rng, 3, counter)
+    elif choice == 4:
+        pass
+    elif body:
+        idx = min(idx, len(body) - 1)
+        names, pointers = declared_before(body, idx)
+        body[idx] = statement(rng, names, pointers, counter)[0]
+    return body
+
+
+def compile_source(compile, source: str) -> tuple:
+    try:
+        output = compile(source)
+    except Exception as e:
+        return None, None, None, str(e) or e.__class__.__name__
+    stats = {
+        name: value
+        for name, value in output.stats.items()
+        if not name.startswith("incremental")
+    }
+    return output.llvm_code, output.symbol_table, stats, None
+
+
+if __name__ == "__main__":
+    programs = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    edits = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+    differences = 0
+    for name, extra in OPTIONS.items():
+        options = CompileOptions(
+            target_llvm="-", render_symb="-", frontend="fast", **extra
+        )
+        incremental_options = CompileOptions(
+            target_llvm="-", render_symb="-", incremental=True, **extra
+        )
+        for seed in range(programs):
+            rng = random.Random(seed)
+            body = generate_body(rng, rng.randrange(1, 30))
+            compiler = IncrementalCompiler()
+            for counter in range(1000, 1000 + edits):
+                source = program(random.Random(counter % 5), body)
+                expected = compile_source(
+                    lambda source: Compiler.compile_source(source, options), source
+                )
+                actual = compile_source(
+                    lambda source: Compiler.compile_source(
+                        source, incremental_options, compiler
+                    ),
+                    source,
+                )
+                if expected != actual:
+                    differences += 1
+                    print(f"{name}, program {seed}, edit {counter - 1000}:")
+                    print(source)
+                    for part, expected_part, actual_part in zip(
+                        ("llvm code", "symbol table", "stats", "error"),
+                        expected,
+                        actual,
+                    ):
+                        if expected_part != actual_part:
+                            print(f"{part}:\n{expected_part}\n---\n{actual_part}")
+                body = edit(rng, body, counter)
+        print(f"{name}: {programs} programs, {edits} edits")
+    print(f"{differences} differences")
+    sys.exit(1 if differences else 0)
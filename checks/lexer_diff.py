@@ -0,0 +1,76 @@
+"""
+Differential check of the fast lexer against the ANTLR lexer
+
+Tokenizes every input file with compilerLexer and with FastLexer and compares the token streams: the type, text,
+start and stop index, line and column of every token and the token recognition errors. Prints the first difference
+of every file that differs and exits with 1 if any file differs.
+
+Usage: python -m checks.lexer_diff [inputs...]
+Inputs are files, directories or glob patterns like --input, the default is the input directory.
+"""
+
+import sys
+
+from antlr4 import CommonTokenStream
+from antlr4.error.ErrorListener import ErrorListener
+
+from src.main.Options import expand_inputs
+from src.parser.Parser import LEXERS, Parser
+from src.parser.SourceBuffer import SourceBuffer
+
+
+class RecordingErrorListener(ErrorListener):
+    def __init__(self) -> None:
+        self.errors: list[tuple] = []
+
+    def syntaxError(self, recognizer, offendingSymbol, line, column, msg, e) -> None:
+        self.errors.append((line, column, msg))
+
+
+def tokenize(input_file: str, lexer: str) -> tuple[list[tuple], list[tuple]]:
+    """
+    Tokenize a file with one of the lexers
+    The file is read into a SourceBuffer like the compiler reads it, so the lexers see the same input stream.
+    :param input_file: Path of the C file
+    :param lexer: "antlr" or "fast"
+    :return: tuple[list[tuple], list[tuple]] : The tokens and the token recognition errors
+    """
+    with SourceBuffer.open(input_file) as source:
+        token_source = LEXERS[lexer](Parser.create_input_stream(source))
+        listener = RecordingErrorListener()
+        token_source.removeErrorListeners()
+        token_source.addErrorListener(listener)
+        stream = CommonTokenStream(token_source)
+        stream.fill()
+        tokens = [
+            (token.type, token.text, token.start, token.stop, token.line, token.column)
+            for token in stream.tokens
+        ]
+    return tokens, listener.errors
+
+
+def first_difference(expected: list[tuple], actual: list[tuple]) -> str | None:
+    for idx, (expected_item, actual_item) in enumerate(zip(expected, actual)):
+        if expected_item != actual_item:
+            return f"#{idx}: antlr {expected_item}, fast {actual_item}"
+    if len(expected) != len(actual):
+        return f"antlr has {len(expected)}, fast has {len(actual)}"
+    return None
+
+
+if __name__ == "__main__":
+    input_files = expand_inputs(sys.argv[1:] or ["input"])
+    different = 0
+    for input_file in input_files:
+        antlr_tokens, antlr_errors = tokenize(input_file, "antlr")
+        fast_tokens, fast_errors = tokenize(input_file, "fast")
+        for what, difference in (
+            ("token", first_difference(antlr_tokens, fast_tokens)),
+            ("error", first_difference(antlr_errors, fast_errors)),
+        ):
+            if difference is not None:
+                different += 1
+                print(f"{input_file}: {what} {difference}")
+                break
+    print(f"{len(input_files) - different}/{len(input_files)} files lex the same")
+    sys.exit(1 if different else 0)
@@ -12,6 +12,7 @@ stat:
 	| main
 	| newVariable SEMI
     | assignment SEMI
+    | returnStat SEMI
     | LINE_COMMENT
     | COMMENT
     | typedef;
@@ -19,33 +20,32 @@ stat:
 typedef: TYPEDEF TYPE typedefname SEMI;
 typedefname: ID | TYPE;
 
-expr:
-	expr ('*') expr
-	| expr ('/') expr
-	| expr '%' expr
-	| expr ('+' | '-') expr
-	| ('!' | '-' | '+') expr
-	| expr ('<' | '>') expr
-	| expr '||' expr
-	| expr '==' expr
-	| expr ('<=' | '>=' | '!=') expr
-	| literal
+returnStat: RETURN expr;
+
+// One rule per precedence level of C, from the lowest to the highest precedence. Every level only refers to the
+// next one, so the parser can predict every alternative with a few tokens of lookahead (SLL) and a chain of
+// operators is a loop instead of a nested left-recursive rule.
+expr: logicalAnd ('||' logicalAnd)*;
+logicalAnd: bitwiseOr ('&&' bitwiseOr)*;
+bitwiseOr: bitwiseXor (BITOR bitwiseXor)*;
+bitwiseXor: bitwiseAnd (BITXOR bitwiseAnd)*;
+bitwiseAnd: equality (AMPERSAND equality)*;
+equality: relational (('==' | '!=') relational)*;
+relational: shift (('<' | '>' | '<=' | '>=') shift)*;
+shift: additive ((LSHIFT | RSHIFT) additive)*;
+additive: multiplicative (('+' | '-') multiplicative)*;
+multiplicative: unary (('*' | '/' | '%') unary)*;
+unary: ('!' | '-' | '+' | BITNOT) unary | primary;
+
+primary:
+	literal
 	| printf
 	| pointer
-	| RETURN expr
 	| address
-	| variable
-	| LPAREN expr RPAREN
 	| unaryminusminus
 	| unaryplusplus
-	| expr '&&' expr
-	| expr LSHIFT expr
-	| expr RSHIFT expr
-	| expr AMPERSAND expr
-	| expr BITOR expr
-	| expr BITXOR expr
-	| expr BITNOT expr;
-
+	| variable
+	| LPAREN expr RPAREN;
 
 unaryplusplus: PLUSPLUS variable
     | variable PLUSPLUS;
@@ -62,16 +62,13 @@ main: TYPE 'main' LPAREN RPAREN LBRACKET stat* RBRACKET;
 newVariable:
 	CONST* (TYPE | ID) ('(' TYPE ')')? variable
 	| CONST* (TYPE | ID) variable '=' ('(' TYPE ')')? expr
-	| CONST* (TYPE | ID) pointer '=' address
-	| CONST* (TYPE | ID) pointer '=' expr;
+	| CONST* (TYPE | ID) pointer '=' expr; // an address is an expr
 
 pointer: POINTER+ variable;
 
 address: AMPERSAND ID;
 
-assignment:
-	ID '=' ('(' TYPE ')')? expr
-	| expr '=' ('(' TYPE ')')? expr;
+assignment: (ID | pointer) '=' ('(' TYPE ')')? expr;
 
 TYPE: 'int' | 'float' | 'char' | 'string' | 'bool' | 'void';
 
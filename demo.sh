@@ -1,10 +1,5 @@
 
-
-
-
-# run src.main for every file in input
+# compile every file in input in one batch, the outputs are stored per file in output
 mkdir -p output
-for file in input/*.c; do
-    echo "Running src.main on $file"
-    python -m src.main --input $file --render_ast output/$(basename $file).ast --target_llvm output/$(basename $file).ll 2> output/$(basename $file).log
-done
\ No newline at end of file
+echo "Running src.main on input"
+python -m src.main --input input --render_ast output --target_llvm output 2> output/batch.log
@@ -0,0 +1,205 @@
+import ctypes
+import os
+import signal
+import struct
+import sys
+import tempfile
+import time
+from typing import Callable
+
+import llvmlite.binding as llvm
+
+OPT_LEVELS = (0, 1, 2, 3)
+
+# Passes that can be run before the pipeline of the optimization level, by the name opt gives them
+PASSES: dict[str, Callable[[llvm.ModulePassManager], None]] = {
+    # llvmlite has no pass that only promotes allocas, SROA promotes them to registers like mem2reg does
+    "mem2reg": llvm.ModulePassManager.add_sroa_pass,
+    "sroa": llvm.ModulePassManager.add_sroa_pass,
+    "instcombine": llvm.ModulePassManager.add_instruction_combining_pass,
+    "reassociate": llvm.ModulePassManager.add_reassociate_expressions_pass,
+    "gvn": llvm.ModulePassManager.add_gvn_pass,
+    "sccp": llvm.ModulePassManager.add_sccp_pass,
+    "dce": llvm.ModulePassManager.add_dead_code_elimination_pass,
+    "adce": llvm.ModulePassManager.add_aggressive_dead_code_elimination_pass,
+    "dse": llvm.ModulePassManager.add_dead_store_elimination_pass,
+    "simplifycfg": llvm.ModulePassManager.add_cfg_simplification_pass,
+    "globaldce": llvm.ModulePassManager.add_global_dce_pass,
+    "constmerge": llvm.ModulePassManager.add_constant_merge_pass,
+}
+
+_initialized: bool = False
+
+
+def initialize() -> None:
+    # LLVM and the native target are initialized once per process
+    global _initialized
+    if not _initialized:
+        llvm.initialize()
+        llvm.initialize_native_target()
+        llvm.initialize_native_asmprinter()
+        _initialized = True
+
+
+def target_machine(opt_level: int = 0, reloc: str = "default") -> llvm.TargetMachine:
+    """
+    Returns the target machine of the host
+    :param opt_level: The optimization level of the code generation
+    :param reloc: The relocation model, pic for code that is linked into executables
+    :return: llvm.TargetMachine : The target machine
+    """
+    initialize()
+    return llvm.Target.from_default_triple().create_target_machine(
+        opt=opt_level, reloc=reloc
+    )
+
+
+def parse_module(llvm_code: str) -> llvm.ModuleRef:
+    """
+    Parse and verify llvm code
+    :param llvm_code: The llvm code of a module
+    :return: llvm.ModuleRef : The module, a RuntimeError is raised if the code is not valid
+    """
+    initialize()
+    module = llvm.parse_assembly(llvm_code)
+    module.verify()
+    return module
+
+
+def optimize(
+    module: llvm.ModuleRef, opt_level: int, passes: list[str] | None = None
+) -> None:
+    """
+    Optimize a module in place
+    The passes are run first, followed by the standard pipeline of the optimization level. Level 0 only runs the
+    passes.
+    :param module: The module to optimize
+    :param opt_level: The optimization level, 0 to 3
+    :param passes: Names of passes from PASSES
+    :return: None
+    """
+    machine = target_machine(opt_level)
+    module.triple = machine.triple
+    module.data_layout = str(machine.target_data)
+
+    pass_manager = llvm.create_module_pass_manager()
+    machine.add_analysis_passes(pass_manager)
+    for name in passes or ():
+        if name not in PASSES:
+            raise ValueError(
+                f"Unknown llvm pass: {name}, known passes are {', '.join(PASSES)}"
+            )
+        PASSES[name](pass_manager)
+    if opt_level > 0:
+        builder = llvm.create_pass_manager_builder()
+        builder.opt_level = opt_level
+        builder.populate(pass_manager)
+    pass_manager.run(module)
+
+
+def emit(module: llvm.ModuleRef, kind: str, opt_level: int = 0) -> str | bytes:
+    """
+    Generate the output of a module in one of the formats of --emit
+    Native code is generated by the target machine of the host, like llc does.
+    :param module: The module to emit
+    :param kind: The format, ll, bc, asm or obj
+    :param opt_level: The optimization level of the code generation
+    :return: str | bytes : Text for ll and asm, bytes for bc and obj
+    """
+    if kind == "ll":
+        return str(module)
+    # gcc links position independent executables by default
+    machine = target_machine(opt_level, "pic")
+    module.triple = machine.triple
+    module.data_layout = str(machine.target_data)
+    if kind == "bc":
+        return module.as_bitcode()
+    if kind == "asm":
+        return machine.emit_assembly(module)
+    if kind == "obj":
+        return machine.emit_object(module)
+    raise ValueError(
+        f"Unknown output format: {kind}, known formats are ll, bc, asm and obj"
+    )
+
+
+def count_instructions(module: llvm.ModuleRef) -> int:
+    return sum(
+        1
+        for function in module.functions
+        for block in function.blocks
+        for _ in block.instructions
+    )
+
+
+# Return value of main and the time it ran in seconds, as the child sends them to the compiler
+RESULT_FORMAT = "=id"
+
+
+def call_captured(function: Callable[[], int]) -> tuple[int, str, float]:
+    """
+    Call a function in a forked child process and capture what it writes to the stdout file descriptor, also from C
+    code like printf
+    A program that crashes only kills the child, the crash is raised as a RuntimeError in the compiler.
+    :param function: The function to call
+    :return: tuple[int, str, float] : The return value, the output and the time of the call
+    """
+    libc = ctypes.CDLL(None)
+    # Buffered output would be written by both processes
+    sys.stdout.flush()
+    sys.stderr.flush()
+    libc.fflush(None)
+    read_fd, write_fd = os.pipe()
+    # A file instead of a pipe, a program that writes more than the pipe buffer would block
+    with tempfile.TemporaryFile() as f:
+        pid = os.fork()
+        if pid == 0:
+            exit_code = 1
+            try:
+                os.close(read_fd)
+                os.dup2(f.fileno(), 1)
+                start = time.perf_counter()
+                result = function()
+                run_time = time.perf_counter() - start
+                # printf buffers the output in the C library
+                libc.fflush(None)
+                os.write(write_fd, struct.pack(RESULT_FORMAT, result, run_time))
+                exit_code = 0
+            finally:
+                # The child must not run the cleanup of the compiler
+                os._exit(exit_code)
+
+        os.close(write_fd)
+        with os.fdopen(read_fd, "rb") as pipe:
+            message = pipe.read()
+        _, status = os.waitpid(pid, 0)
+        if os.WIFSIGNALED(status):
+            raise RuntimeError(
+                f"program was killed by signal {signal.Signals(os.WTERMSIG(status)).name}"
+            )
+        if len(message) != struct.calcsize(RESULT_FORMAT):
+            raise RuntimeError(
+                f"program exited with status {os.WEXITSTATUS(status)} before main returned"
+            )
+        result, run_time = struct.unpack(RESULT_FORMAT, message)
+        f.seek(0)
+        return result, f.read().decode("utf-8", errors="replace"), run_time
+
+
+def run(module: llvm.ModuleRef) -> tuple[int, str, float, float]:
+    """
+    Compile a module with the MCJIT execution engine and call its main function in a child process
+    The engine takes ownership of the module.
+    :param module: The module with a main function
+    :return: tuple[int, str, float, float] : The return code of main, its output, the time to compile and to run it
+    """
+    start = time.perf_counter()
+    engine = llvm.create_mcjit_compiler(module, target_machine())
+    engine.finalize_object()
+    engine.run_static_constructors()
+    main = ctypes.CFUNCTYPE(ctypes.c_int)(engine.get_function_address("main"))
+    jit_time = time.perf_counter() - start
+
+    return_code, stdout, run_time = call_captured(main)
+    engine.run_static_destructors()
+    return return_code, stdout, jit_time, run_time
@@ -0,0 +1,85 @@
+import math
+
+from llvmlite import ir
+
+# llvmlite already returns the same object for every IntType of a width and for FloatType, these are shared by all
+# modules
+INT: ir.IntType = ir.IntType(32)
+FLOAT: ir.FloatType = ir.FloatType()
+CHAR: ir.IntType = ir.IntType(8)
+BOOL: ir.IntType = ir.IntType(1)
+CHAR_POINTER: ir.PointerType = CHAR.as_pointer()
+
+
+class ConstantPool:
+    """
+    Interns the types, constants and string literals of one module
+    Every literal of a value gets the same ir.Constant, and every string literal of a value gets one private
+    unnamed_addr global, instead of a new object or global per node.
+    """
+
+    def __init__(self, module: ir.Module) -> None:
+        self.module: ir.Module = module
+        self.array_types: dict[int, ir.ArrayType] = {}
+        self.ints: dict[int, ir.Constant] = {}
+        self.floats: dict[tuple[float, float], ir.Constant] = {}
+        self.chars: dict[int, ir.Constant] = {}
+        self.bools: dict[int, ir.Constant] = {}
+        # Pointer to the first character of the global of every string literal
+        self.strings: dict[bytes, ir.Constant] = {}
+        # Amount of string literals that reused the global of an earlier literal
+        self.merged_strings: int = 0
+
+    def array_type(self, length: int) -> ir.ArrayType:
+        array_type = self.array_types.get(length)
+        if array_type is None:
+            array_type = self.array_types[length] = ir.ArrayType(CHAR, length)
+        return array_type
+
+    def int_constant(self, value: int) -> ir.Constant:
+        constant = self.ints.get(value)
+        if constant is None:
+            constant = self.ints[value] = ir.Constant(INT, value)
+        return constant
+
+    def float_constant(self, value: float) -> ir.Constant:
+        # 0.0 and -0.0 are equal but different constants
+        key = (value, math.copysign(1.0, value))
+        constant = self.floats.get(key)
+        if constant is None:
+            constant = self.floats[key] = ir.Constant(FLOAT, value)
+        return constant
+
+    def char_constant(self, value: int) -> ir.Constant:
+        constant = self.chars.get(value)
+        if constant is None:
+            constant = self.chars[value] = ir.Constant(CHAR, value)
+        return constant
+
+    def bool_constant(self, value: int) -> ir.Constant:
+        constant = self.bools.get(value)
+        if constant is None:
+            constant = self.bools[value] = ir.Constant(BOOL, value)
+        return constant
+
+    def string(self, value: bytes) -> ir.Constant:
+        """
+        Returns a pointer to a constant global with a string, a global is only added for the first use of a string
+        :param value: The bytes of the string, including the terminating null character
+        :return: ir.Constant : The global bitcast to i8*
+        """
+        pointer = self.strings.get(value)
+        if pointer is not None:
+            self.merged_strings += 1
+            return pointer
+        array_type = self.array_type(len(value))
+        string = ir.GlobalVariable(
+            self.module, array_type, name=self.module.get_unique_name(".str")
+        )
+        # Only the contents of the string matter, llvm can merge it with equal strings of other modules too
+        string.linkage = "private"
+        string.unnamed_addr = True
+        string.global_constant = True
+        string.initializer = ir.Constant(array_type, bytearray(value))
+        pointer = self.strings[value] = string.bitcast(CHAR_POINTER)
+        return pointer
@@ -1,7 +1,90 @@
 from llvmlite import ir, binding
-from src.parser.SymbolTable import SymbolTable, SymbolTableEntryType
-import subprocess
+from src.llvm_target.ConstantPool import ConstantPool
+from src.llvm_target.JournaledNameScope import JournaledNameScope
+from src.llvm_target.SsaBuilder import SsaBuilder, SsaVariable
+from src.parser.SourceBuffer import SourceBuffer
+from src.parser.SymbolTable import SymbolTable, SymbolTableEntry, SymbolTableEntryType
+from typing import Callable
 from src.parser.TreeNode import *
+from src.parser.Walker import SKIP_CHILDREN, walk
+
+
+ENTRY_LLVM_TYPES: dict[SymbolTableEntryType, ir.Type] = {
+    SymbolTableEntryType.Int: ir.IntType(32),
+    SymbolTableEntryType.Float: ir.FloatType(),
+    SymbolTableEntryType.String: ir.ArrayType(ir.IntType(8), 0),
+    SymbolTableEntryType.Bool: ir.IntType(1),
+    SymbolTableEntryType.Char: ir.IntType(8),
+}
+
+TYPE_LLVM_TYPES: dict[str, ir.Type] = {
+    "int": ir.IntType(32),
+    "float": ir.FloatType(),
+    "char": ir.IntType(8),
+    "bool": ir.IntType(1),
+}
+
+# Kinds of nodes that always have the same type, pointers have the type they point to
+KIND_LLVM_TYPES: dict[NodeKind, ir.Type] = {
+    NodeKind.Int: ir.IntType(32),
+    NodeKind.Float: ir.FloatType(),
+    NodeKind.FloatPointer: ir.FloatType(),
+    NodeKind.IntPointer: ir.IntType(32),
+    NodeKind.CharPointer: ir.IntType(8),
+    NodeKind.BoolPointer: ir.IntType(1),
+    NodeKind.LShift: ir.IntType(32),
+    NodeKind.RShift: ir.IntType(32),
+    NodeKind.Equal: ir.IntType(1),
+    NodeKind.Neq: ir.IntType(1),
+    NodeKind.Gt: ir.IntType(1),
+    NodeKind.Lt: ir.IntType(1),
+    NodeKind.Geq: ir.IntType(1),
+    NodeKind.Leq: ir.IntType(1),
+    NodeKind.And: ir.IntType(1),
+    NodeKind.Or: ir.IntType(1),
+    NodeKind.Not: ir.IntType(1),
+    NodeKind.Mod: ir.IntType(32),
+    NodeKind.Char: ir.IntType(8),
+    NodeKind.Bool: ir.IntType(1),
+}
+
+# Kinds of nodes that have the type of one of their children, with the index of that child
+OPERAND_TYPE_KINDS: dict[NodeKind, int] = {
+    NodeKind.Plus: 0,
+    NodeKind.Mult: 0,
+    NodeKind.Div: 0,
+    NodeKind.Minus: 0,
+    NodeKind.Pointer: 0,  # dereference!
+    NodeKind.Assign: 1,
+}
+
+
+def entry_to_llvmtype(node: TreeNode, symbol_table: SymbolTable) -> ir.Type:
+    symbol_table_type = symbol_table.lookup(node).type
+    llvm_type = ENTRY_LLVM_TYPES.get(symbol_table_type)
+    if llvm_type is None:
+        raise Exception(f"Unknown type: {symbol_table_type}")
+    return llvm_type
+
+
+def convert_to_llvmtype(node: ConvertNode) -> ir.Type:
+    llvm_type = TYPE_LLVM_TYPES.get(node.children[0].value)
+    if llvm_type is None:
+        raise ValueError(f"Invalid type: {node.children[0].value}")
+    return llvm_type
+
+
+# Kinds of nodes of which the type depends on the node
+KIND_LLVM_TYPE_HANDLERS: dict[NodeKind, Callable[[TreeNode, SymbolTable], ir.Type]] = {
+    NodeKind.String: lambda node, symbol_table: ir.ArrayType(
+        ir.IntType(8), len(node.value)
+    ),
+    NodeKind.Address: lambda node, symbol_table: entry_to_llvmtype(
+        node.children[0], symbol_table
+    ),
+    NodeKind.Id: entry_to_llvmtype,
+    NodeKind.Convert: lambda node, symbol_table: convert_to_llvmtype(node),
+}
 
 
 def node_to_llvmtype(node: TreeNode, symbol_table: SymbolTable) -> ir.Type:
@@ -11,136 +94,65 @@ def node_to_llvmtype(node: TreeNode, symbol_table: SymbolTable) -> ir.Type:
     :param symbol_table: symbol table of the compiler
     :return: ir.Type : The type of the TreeNode
     """
-    match node:
-        case IntNode():
-            return ir.IntType(32)
-        case FloatNode():
-            return ir.FloatType()
-        case StringNode():
-            return ir.ArrayType(ir.IntType(8), len(node.value))
-        case PlusNode():
-            return node_to_llvmtype(node.children[0], symbol_table)
-        case MultNode():
-            return node_to_llvmtype(node.children[0], symbol_table)
-        case DivNode():
-            return node_to_llvmtype(node.children[0], symbol_table)
-        case MinusNode():
-            return node_to_llvmtype(node.children[0], symbol_table)
-        case AddressNode():
-            child = node.children[0]
-            symbol_table_type = symbol_table.find_entry(child.value).type
-            match symbol_table_type:
-                case SymbolTableEntryType.Int:
-                    return ir.IntType(32)
-                case SymbolTableEntryType.Float:
-                    return ir.FloatType()
-                case SymbolTableEntryType.String:
-                    return ir.ArrayType(ir.IntType(8), 0)
-                case SymbolTableEntryType.Bool:
-                    return ir.IntType(1)
-                case SymbolTableEntryType.Char:
-                    return ir.IntType(8)
-                case _:
-                    raise Exception(f"Unknown type: {symbol_table_type}")
-        case PointerNode():
-            # dereference!
-            return node_to_llvmtype(node.children[0], symbol_table)
-        case FloatPointerNode():
-            type = ir.FloatType().as_pointer()
-            for _ in range(node.depth - 1):
-                type = type.as_pointer()
-            return ir.FloatType()
-        case IntPointerNode():
-            type = ir.IntType(32).as_pointer()
-            for _ in range(node.depth - 1):
-                type = type.as_pointer()
-            return ir.IntType(32)
-        case CharPointerNode():
-            type = ir.IntType(8).as_pointer()
-            for _ in range(node.depth - 1):
-                type = type.as_pointer()
-            return ir.IntType(8)
-        case BoolPointerNode():
-            type = ir.IntType(1).as_pointer()
-            for _ in range(node.depth - 1):
-                type = type.as_pointer()
-            return ir.IntType(1)
-        case LShiftNode():
-            return ir.IntType(32)
-        case AssignNode():
-            return node_to_llvmtype(node.children[1], symbol_table)
-        case RShiftNode():
-            return ir.IntType(32)
-        case EqualNode():
-            return ir.IntType(1)
-        case NeqNode():
-            return ir.IntType(1)
-        case GtNode():
-            return ir.IntType(1)
-        case LtNode():
-            return ir.IntType(1)
-        case GeqNode():
-            return ir.IntType(1)
-        case LeqNode():
-            return ir.IntType(1)
-        case AndNode():
-            return ir.IntType(1)
-        case OrNode():
-            return ir.IntType(1)
-        case NotNode():
-            return ir.IntType(1)
-        case ModNode():
-            return ir.IntType(32)
-        case CharNode():
-            return ir.IntType(8)
-        case IdNode():
-            symbol_table_type = symbol_table.find_entry(node.value).type
-            match symbol_table_type:
-                case SymbolTableEntryType.Int:
-                    return ir.IntType(32)
-                case SymbolTableEntryType.Float:
-                    return ir.FloatType()
-                case SymbolTableEntryType.String:
-                    return ir.ArrayType(ir.IntType(8), 0)
-                case SymbolTableEntryType.Bool:
-                    return ir.IntType(1)
-                case SymbolTableEntryType.Char:
-                    return ir.IntType(8)
-                case _:
-                    raise Exception(f"Unknown type: {symbol_table_type}")
-        case ConvertNode():
-            match node.children[0].value:
-                case "int":
-                    return ir.IntType(32)
-                case "float":
-                    return ir.FloatType()
-                case "char":
-                    return ir.IntType(8)
-                case "bool":
-                    return ir.IntType(1)
-                case _:
-                    raise ValueError(f"Invalid type: {node.children[0].value}")
-        case _:
-            raise Exception(f"Unknown type: {node}")
+    # Follow the operands that decide the type with a loop, a long chain of additions nests as deep as it is long
+    operand_idx = OPERAND_TYPE_KINDS.get(node.kind)
+    while operand_idx is not None:
+        node = node.children[operand_idx]
+        operand_idx = OPERAND_TYPE_KINDS.get(node.kind)
+
+    llvm_type = KIND_LLVM_TYPES.get(node.kind)
+    if llvm_type is not None:
+        return llvm_type
+    handler = KIND_LLVM_TYPE_HANDLERS.get(node.kind)
+    if handler is not None:
+        return handler(node, symbol_table)
+    raise Exception(f"Unknown type: {node}")
+
+
+# Operators that convert all their children as loaded operands, left to right
+OPERATOR_KINDS: set[NodeKind] = {
+    NodeKind.Plus,
+    NodeKind.Minus,
+    NodeKind.Mult,
+    NodeKind.Div,
+    NodeKind.Mod,
+    NodeKind.LShift,
+    NodeKind.RShift,
+    NodeKind.Equal,
+    NodeKind.Gt,
+    NodeKind.Lt,
+    NodeKind.Geq,
+    NodeKind.Leq,
+    NodeKind.And,
+    NodeKind.Or,
+    NodeKind.Not,
+}
 
 
 class LlvmConverter:
-    def __init__(self, symbol_table: SymbolTable, input_file_path: str):
+    def __init__(
+        self,
+        symbol_table: SymbolTable,
+        source: str | SourceBuffer,
+        ssa: bool = False,
+        checkpoints: bool = False,
+    ):
         self.blocks = []
         self.builders = []
 
-        # Get the target triple using llvm-config
-        try:
-            target_triple = (
-                subprocess.check_output(["llvm-config", "--host-target"])
-                .decode()
-                .strip()
-            )
-        except:
-            target_triple = ""
         self.module = ir.Module("module")
-        self.module.triple = target_triple
-        self.input_file_lines = open(input_file_path).readlines()
+        # With checkpoints the names and stores are recorded, so the module can be rolled back, see rollback
+        self.checkpoints: bool = checkpoints
+        if checkpoints:
+            self.module.scope = JournaledNameScope(self.module.scope)
+        # The triple of the host llvmlite was built for, without starting llvm-config for every compilation
+        self.module.triple = binding.get_default_triple()
+        # Literals and printf strings of the module are created once and shared
+        self.pool: ConstantPool = ConstantPool(self.module)
+        # The source lines are sliced from the buffer when they are commented
+        if not isinstance(source, SourceBuffer):
+            source = SourceBuffer.from_string(source)
+        self.source: SourceBuffer = source
 
         self.commented_lines = {}
 
@@ -149,6 +161,21 @@ class LlvmConverter:
         printf = ir.Function(self.module, printf_ty, name="printf")
 
         self.symbol_table = symbol_table
+        # Converted operands of the operator that is being converted, see evaluate_operands
+        self.operands: dict[TreeNode, ir.Value] = {}
+        # Keep locals of which the address is never taken in registers instead of allocas, see convert
+        self.ssa: bool = ssa
+        self.address_taken: set[SymbolTableEntry] = set()
+        self.ssa_locals: int = 0
+        self.handlers: dict[type, Callable[[TreeNode], object]] = {
+            MainNode: self.convert_main,
+            AssignNode: self.convert_assignment,
+            NewVariableNode: self.convert_new_variable,
+            PrintfNode: self.convert_printf,
+            CommentNode: self.convert_comment,
+            ReturnNode: self.convert_return,
+            TreeNode: self.add_statement_comment,
+        }
 
     def add_statement_comment(self, node: TreeNode) -> None:
         if node.line_nr is None:
@@ -161,7 +188,7 @@ class LlvmConverter:
         except:
             return
         # get line from input file
-        line = self.input_file_lines[node.line_nr - 1].strip()
+        line = self.source.line(node.line_nr).strip()
         builder.comment(f"Line {node.line_nr}: {line}")
 
     def store_value(self, value: TreeNode, llvm_var: ir.Value, depth: int = 0) -> None:
@@ -177,15 +204,11 @@ class LlvmConverter:
             case IntNode():
                 pointer_depth = llvm_var.type.intrinsic_name.count("p0")
                 if pointer_depth <= 1:
-                    builder.store(
-                        ir.Constant(ir.IntType(32), int(value.value)), llvm_var
-                    )
+                    builder.store(self.pool.int_constant(int(value.value)), llvm_var)
                 else:
-                    builder.gep(
-                        llvm_var, [ir.Constant(ir.IntType(32), int(value.value))]
-                    )
+                    builder.gep(llvm_var, [self.pool.int_constant(int(value.value))])
             case FloatNode():
-                builder.store(ir.Constant(ir.FloatType(), float(value.value)), llvm_var)
+                builder.store(self.pool.float_constant(float(value.value)), llvm_var)
             case StringNode():
                 builder.store(
                     ir.Constant(
@@ -199,24 +222,26 @@ class LlvmConverter:
                     # escape character e.g. '\\n'
                     value.value = value.value.encode("utf-8").decode("unicode_escape")
 
+                builder.store(self.pool.char_constant(ord(value.value[1:-1])), llvm_var)
+            case BoolNode():
                 builder.store(
-                    ir.Constant(ir.IntType(8), ord(value.value[1:-1])), llvm_var
+                    self.pool.bool_constant(int(value.value == "true")), llvm_var
                 )
             case IdNode():
                 if depth != 0:
                     # find variable depth
                     variable_depth = llvm_var.type.intrinsic_name.count("p0")
                     # find value depth
-                    value_depth = self.symbol_table.find_entry(
-                        value.value
+                    value_depth = self.symbol_table.lookup(
+                        value
                     ).llvm_var.type.intrinsic_name.count("p0")
-                    var = self.symbol_table.find_entry(value.value).llvm_var
+                    var = self.symbol_table.lookup(value).llvm_var
                     for _ in range(variable_depth - value_depth + 1):
                         var = builder.load(var)
                     builder.store(var, llvm_var)
                     return
                 builder.store(
-                    builder.load(self.symbol_table.find_entry(value.value).llvm_var),
+                    builder.load(self.symbol_table.lookup(value).llvm_var),
                     llvm_var,
                 )
             case AddressNode():
@@ -224,7 +249,7 @@ class LlvmConverter:
                 # check for pointer depth
                 pointer_depth = depth
 
-                symbol_table_entry = self.symbol_table.find_entry(child.value)
+                symbol_table_entry = self.symbol_table.lookup(child)
                 symbol_table_llvm_var = symbol_table_entry.llvm_var
                 var = symbol_table_llvm_var
                 builder.store(var, llvm_var)
@@ -239,7 +264,7 @@ class LlvmConverter:
             case EqualNode():
                 left = self.node_to_llvm(value.children[0])
                 right = self.node_to_llvm(value.children[1])
-                type = self.symbol_table.find_entry(value.children[0].value).type
+                type = self.symbol_table.lookup(value.children[0]).type
                 if type == SymbolTableEntryType.Int:
                     builder.store(builder.icmp_signed("==", left, right), llvm_var)
                 elif type == SymbolTableEntryType.Float:
@@ -260,12 +285,10 @@ class LlvmConverter:
                 left = self.node_to_llvm(value.children[0])
                 right = self.node_to_llvm(value.children[1])
                 try:
-                    type = self.symbol_table.find_entry(value.children[0].value).type
+                    type = self.symbol_table.lookup(value.children[0]).type
                 except:
                     # address node
-                    address_to = self.symbol_table.find_entry(
-                        value.children[0].children[0].value
-                    )
+                    address_to = self.symbol_table.lookup(value.children[0].children[0])
                     addres_to_llvm_var = address_to.llvm_var
 
                     builder.store(
@@ -284,7 +307,7 @@ class LlvmConverter:
             case GtNode():
                 left = self.node_to_llvm(value.children[0])
                 right = self.node_to_llvm(value.children[1])
-                type = self.symbol_table.find_entry(value.children[0].value).type
+                type = self.symbol_table.lookup(value.children[0]).type
                 if type == SymbolTableEntryType.Int:
                     builder.store(builder.icmp_signed(">", left, right), llvm_var)
                 elif type == SymbolTableEntryType.Float:
@@ -296,7 +319,7 @@ class LlvmConverter:
             case LtNode():
                 left = self.node_to_llvm(value.children[0])
                 right = self.node_to_llvm(value.children[1])
-                type = self.symbol_table.find_entry(value.children[0].value).type
+                type = self.symbol_table.lookup(value.children[0]).type
                 if type == SymbolTableEntryType.Int:
                     builder.store(builder.icmp_signed("<", left, right), llvm_var)
                 elif type == SymbolTableEntryType.Float:
@@ -309,7 +332,7 @@ class LlvmConverter:
             case GeqNode():
                 left = self.node_to_llvm(value.children[0])
                 right = self.node_to_llvm(value.children[1])
-                type = self.symbol_table.find_entry(value.children[0].value).type
+                type = self.symbol_table.lookup(value.children[0]).type
                 if type == SymbolTableEntryType.Int:
                     builder.store(builder.icmp_signed(">=", left, right), llvm_var)
                 elif type == SymbolTableEntryType.Float:
@@ -322,7 +345,7 @@ class LlvmConverter:
             case LeqNode():
                 left = self.node_to_llvm(value.children[0])
                 right = self.node_to_llvm(value.children[1])
-                type = self.symbol_table.find_entry(value.children[0].value).type
+                type = self.symbol_table.lookup(value.children[0]).type
                 if type == SymbolTableEntryType.Int:
                     builder.store(builder.icmp_signed("<=", left, right), llvm_var)
                 elif type == SymbolTableEntryType.Float:
@@ -349,9 +372,7 @@ class LlvmConverter:
             case PointerNode():
                 # dereference
                 pointer_depth = value.depth
-                pointer_loc = self.symbol_table.find_entry(
-                    value.children[0].value
-                ).llvm_var
+                pointer_loc = self.symbol_table.lookup(value.children[0]).llvm_var
                 pointee = builder.load(pointer_loc)
                 for _ in range(pointer_depth - 1):
                     pointee = builder.load(pointee)
@@ -367,9 +388,7 @@ class LlvmConverter:
                 from_type = None
                 match value.children[1]:
                     case IdNode():
-                        from_type = self.symbol_table.find_entry(
-                            value.children[1].value
-                        ).type
+                        from_type = self.symbol_table.lookup(value.children[1]).type
                         match from_type:
                             case SymbolTableEntryType.Int:
                                 from_type = ir.IntType(32)
@@ -524,24 +543,68 @@ class LlvmConverter:
         :param node: Treenode to convert
         :return: ir.Value : The converted node
         """
+        if load and node.kind in OPERATOR_KINDS:
+            try:
+                self.evaluate_operands(node)
+                return self.llvm_value(node, load)
+            except:
+                # don't let operands of a failed conversion be used by the next one
+                self.operands.clear()
+                raise
+        return self.llvm_value(node, load)
+
+    def evaluate_operands(self, node: TreeNode) -> None:
+        """
+        Convert the operands of an operator bottom up with an explicit stack
+        The values are kept in self.operands, converting an operator then only looks up the values of its operands
+        instead of converting them recursively, so the depth of an expression doesn't matter. The operands are
+        converted in the same order as a recursive conversion would, left to right and operands before operators.
+        :param node: The operator
+        :return: None
+        """
+        stack: list[tuple[TreeNode, bool]] = [
+            (child, False) for child in reversed(node.children)
+        ]
+        while stack:
+            child, finished = stack.pop()
+            if not finished and child.kind in OPERATOR_KINDS:
+                stack.append((child, True))
+                stack.extend((operand, False) for operand in reversed(child.children))
+                continue
+            self.operands[child] = self.llvm_value(child)
+
+    def operand(self, node: TreeNode) -> ir.Value:
+        """
+        Returns the value of an operand, converted by evaluate_operands or converted now
+        :param node: The operand
+        :return: ir.Value : The converted operand
+        """
+        value = self.operands.pop(node, None)
+        if value is None:
+            return self.node_to_llvm(node)
+        return value
+
+    def llvm_value(self, node: TreeNode, load: bool = True) -> ir.Value:
+        """
+        Convert one TreeNode to a llvmlite ir.Value, the operands of operators are converted with operand()
+        :param node: Treenode to convert
+        :param load: Load the value of an id instead of returning its address
+        :return: ir.Value : The converted node
+        """
         builder = self.builders[-1]
         match node:
             case IntNode():
-                return ir.Constant(ir.IntType(32), int(node.value))
+                return self.pool.int_constant(int(node.value))
             case FloatNode():
-                return ir.Constant(ir.FloatType(), float(node.value))
+                return self.pool.float_constant(float(node.value))
             case IdNode():
                 if load:
-                    return builder.load(
-                        self.symbol_table.find_entry(node.value).llvm_var
-                    )
-                return self.symbol_table.find_entry(node.value).llvm_var
+                    return builder.load(self.symbol_table.lookup(node).llvm_var)
+                return self.symbol_table.lookup(node).llvm_var
             case PointerNode():
                 # dereference, check pointer depth!
                 pointer_depth = node.depth
-                pointer_loc = self.symbol_table.find_entry(
-                    node.children[0].value
-                ).llvm_var
+                pointer_loc = self.symbol_table.lookup(node.children[0]).llvm_var
                 pointee = builder.load(pointer_loc)
                 for _ in range(pointer_depth - 1):
                     pointee = builder.load(pointee)
@@ -555,21 +618,21 @@ class LlvmConverter:
             case MinusNode():
                 return self.subtraction(node)
             case ModNode():
-                left = self.node_to_llvm(node.children[0])
-                right = self.node_to_llvm(node.children[1])
+                left = self.operand(node.children[0])
+                right = self.operand(node.children[1])
                 return builder.srem(left, right)
             case LShiftNode():
-                left = self.node_to_llvm(node.children[0])
-                right = self.node_to_llvm(node.children[1])
+                left = self.operand(node.children[0])
+                right = self.operand(node.children[1])
                 return builder.shl(left, right)
             case RShiftNode():
-                left = self.node_to_llvm(node.children[0])
-                right = self.node_to_llvm(node.children[1])
+                left = self.operand(node.children[0])
+                right = self.operand(node.children[1])
                 return builder.ashr(left, right)
             case EqualNode():
-                left = self.node_to_llvm(node.children[0])
-                right = self.node_to_llvm(node.children[1])
-                type = self.symbol_table.find_entry(node.children[0].value).type
+                left = self.operand(node.children[0])
+                right = self.operand(node.children[1])
+                type = self.symbol_table.lookup(node.children[0]).type
                 if type == SymbolTableEntryType.Int:
                     return builder.icmp_signed("==", left, right)
                 elif type == SymbolTableEntryType.Float:
@@ -577,9 +640,9 @@ class LlvmConverter:
                 else:
                     raise Exception(f"Unknown type: {type}")
             case GtNode():
-                left = self.node_to_llvm(node.children[0])
-                right = self.node_to_llvm(node.children[1])
-                type = self.symbol_table.find_entry(node.children[0].value).type
+                left = self.operand(node.children[0])
+                right = self.operand(node.children[1])
+                type = self.symbol_table.lookup(node.children[0]).type
                 if type == SymbolTableEntryType.Int:
                     return builder.icmp_signed(">", left, right)
                 elif type == SymbolTableEntryType.Float:
@@ -587,9 +650,9 @@ class LlvmConverter:
                 else:
                     raise Exception(f"Unknown type: {type}")
             case LtNode():
-                left = self.node_to_llvm(node.children[0])
-                right = self.node_to_llvm(node.children[1])
-                type = self.symbol_table.find_entry(node.children[0].value).type
+                left = self.operand(node.children[0])
+                right = self.operand(node.children[1])
+                type = self.symbol_table.lookup(node.children[0]).type
                 if type == SymbolTableEntryType.Int:
                     return builder.icmp_signed("<", left, right)
                 elif type == SymbolTableEntryType.Float:
@@ -597,9 +660,9 @@ class LlvmConverter:
                 else:
                     raise Exception(f"Unknown type: {type}")
             case GeqNode():
-                left = self.node_to_llvm(node.children[0])
-                right = self.node_to_llvm(node.children[1])
-                type = self.symbol_table.find_entry(node.children[0].value).type
+                left = self.operand(node.children[0])
+                right = self.operand(node.children[1])
+                type = self.symbol_table.lookup(node.children[0]).type
                 if type == SymbolTableEntryType.Int:
                     return builder.icmp_signed(">=", left, right)
                 elif type == SymbolTableEntryType.Float:
@@ -607,9 +670,9 @@ class LlvmConverter:
                 else:
                     raise Exception(f"Unknown type: {type}")
             case LeqNode():
-                left = self.node_to_llvm(node.children[0])
-                right = self.node_to_llvm(node.children[1])
-                type = self.symbol_table.find_entry(node.children[0].value).type
+                left = self.operand(node.children[0])
+                right = self.operand(node.children[1])
+                type = self.symbol_table.lookup(node.children[0]).type
                 if type == SymbolTableEntryType.Int:
                     return builder.icmp_signed("<=", left, right)
                 elif type == SymbolTableEntryType.Float:
@@ -617,21 +680,23 @@ class LlvmConverter:
                 else:
                     raise Exception(f"Unknown type: {type}")
             case AndNode():
-                left = self.node_to_llvm(node.children[0])
-                right = self.node_to_llvm(node.children[1])
+                left = self.operand(node.children[0])
+                right = self.operand(node.children[1])
                 return builder.and_(left, right)
             case OrNode():
-                left = self.node_to_llvm(node.children[0])
-                right = self.node_to_llvm(node.children[1])
+                left = self.operand(node.children[0])
+                right = self.operand(node.children[1])
                 return builder.or_(left, right)
             case NotNode():
-                child = self.node_to_llvm(node.children[0])
+                child = self.operand(node.children[0])
                 return builder.not_(child)
             case CharNode():
-                return ir.Constant(ir.IntType(8), ord(node.value[1:-1]))
+                return self.pool.char_constant(ord(node.value[1:-1]))
+            case BoolNode():
+                return self.pool.bool_constant(int(node.value == "true"))
             case AddressNode():
                 child = node.children[0]
-                symbol_table_entry = self.symbol_table.find_entry(child.value)
+                symbol_table_entry = self.symbol_table.lookup(child)
                 return symbol_table_entry.llvm_var
             case AssignNode():
                 left = node.children[0]
@@ -653,8 +718,8 @@ class LlvmConverter:
         left = node.children[0]
         right = node.children[1]
 
-        left_llvm = self.node_to_llvm(left)
-        right_llvm = self.node_to_llvm(right)
+        left_llvm = self.operand(left)
+        right_llvm = self.operand(right)
 
         if left_llvm.type.intrinsic_name.count("p0") != 0:
             var = builder.gep(left_llvm, [right_llvm])
@@ -681,8 +746,8 @@ class LlvmConverter:
         left = node.children[0]
         right = node.children[1]
 
-        left_llvm = self.node_to_llvm(left)
-        right_llvm = self.node_to_llvm(right)
+        left_llvm = self.operand(left)
+        right_llvm = self.operand(right)
 
         if (
             left_llvm.type.intrinsic_name == "f32"
@@ -704,8 +769,8 @@ class LlvmConverter:
         left = node.children[0]
         right = node.children[1]
 
-        left_llvm = self.node_to_llvm(left)
-        right_llvm = self.node_to_llvm(right)
+        left_llvm = self.operand(left)
+        right_llvm = self.operand(right)
 
         if (
             left_llvm.type.intrinsic_name == "f32"
@@ -728,15 +793,17 @@ class LlvmConverter:
         left = node.children[0]
         right = node.children[1]
 
-        left_llvm = self.node_to_llvm(left)
+        left_llvm = self.operand(left)
 
         # check for pointers
         if left_llvm.type.intrinsic_name.count("p0") != 0:
+            # the offset is negated, drop the value converted before
+            self.operands.pop(right, None)
             right.value = str(-int(right.value))
             right_llvm = self.node_to_llvm(right)
             var = builder.gep(left_llvm, [right_llvm])
             return var
-        right_llvm = self.node_to_llvm(right)
+        right_llvm = self.operand(right)
 
         if (
             left_llvm.type.intrinsic_name == "f32"
@@ -756,210 +823,303 @@ class LlvmConverter:
         :param node: The root of the AST
         :return: None
         """
-        match node:
-            case MainNode():
-                function = ir.Function(
-                    self.module, ir.FunctionType(ir.IntType(32), []), "main"
+        if self.ssa:
+            # Variables used with & need an address, all other scalar locals get an SsaVariable
+            self.address_taken = self.taken_addresses(node)
+        self.convert_statement(node)
+        self.finish()
+
+    def taken_addresses(self, node: TreeNode) -> set[SymbolTableEntry]:
+        """
+        Returns the entries of the variables of which an AST takes the address with &
+        :param node: The root of the AST, or a statement
+        :return: set[SymbolTableEntry] : The entries
+        """
+        taken = set()
+        walk(
+            node,
+            enter={
+                AddressNode: lambda address: taken.add(
+                    self.symbol_table.lookup(address.children[0])
                 )
-                self.blocks.append(function.append_basic_block("main"))
-                self.builders.append(ir.IRBuilder(self.blocks[-1]))
+            },
+        )
+        return taken
 
-            case AssignNode():
-                if node.converted:
-                    return
-                if isinstance(node.children[0], PointerNode):
-                    # dereference pointer
-                    pointer_depth = node.children[0].depth
-                    pointee = self.symbol_table.find_entry(
-                        node.children[0].children[0].value
-                    ).llvm_var
-                    for _ in range(pointer_depth - 1):
-                        pointee = self.builders[-1].load(pointee)
-                    assignee = self.builders[-1].load(pointee)
-                else:
-                    assignee = self.symbol_table.find_entry(
-                        node.children[0].value
-                    ).llvm_var
-                value = node.children[1]
-
-                # make sure we dont do assignment twice when doing something like int a = number++;
-                node.converted = True
-                if isinstance(value, AssignNode):
-                    value.converted = True
-
-                self.store_value(value, assignee)
-
-            case NewVariableNode():
-                const_var: bool = len(node.children) == 4
-                pointer_depth = 0
-                if const_var:
-                    if isinstance(
-                        node.children[2],
-                        (
-                            IntPointerNode,
-                            FloatPointerNode,
-                            CharPointerNode,
-                            BoolPointerNode,
-                        ),
-                    ):
-                        # take pointer depth in accoun
-                        var_node = node.children[2]
-                        pointer_depth = var_node.depth
-                        var_name = var_node.children[0].value
-                    else:
-                        var_name = node.children[2].value
-                else:
-                    if isinstance(
-                        node.children[1],
-                        (
-                            IntPointerNode,
-                            FloatPointerNode,
-                            CharPointerNode,
-                            BoolPointerNode,
-                        ),
-                    ):
-                        var_node = node.children[1]
-                        pointer_depth = var_node.depth
-                        var_name = var_node.children[0].value
-                    else:
-                        var_name = node.children[1].value
+    def convert_statement(self, node: TreeNode) -> None:
+        """
+        Convert a statement after the statements before it, with ssa address_taken has to be set first
+        :param node: The statement, or the root of the AST
+        :return: None
+        """
+        walk(node, enter=self.handlers)
 
-                try:
-                    builder = self.builders[-1]
-                except:
-                    # global variable
-                    var = ir.GlobalVariable(
-                        self.module,
-                        node_to_llvmtype(node.children[2], self.symbol_table),
-                        var_name,
+    def finish(self) -> None:
+        """
+        End main after the last statement is converted
+        :return: None
+        """
+        # Like in C, main returns 0 when it reaches its end without a return
+        for builder in self.builders:
+            if not builder.block.is_terminated:
+                builder.ret(self.pool.int_constant(0))
+
+    def checkpoint(self) -> tuple:
+        """
+        Returns the state of the module after the statements converted so far, only with checkpoints
+        The module only grows while statements are converted, so the lengths of its lists and dicts are enough to
+        roll it back.
+        :return: tuple : The checkpoint, for rollback
+        """
+        block = None
+        if self.blocks:
+            block = (
+                len(self.blocks[-1].instructions),
+                self.blocks[-1].terminator,
+                len(self.blocks[-1].scope.journal),
+                len(self.builders[-1].journal),
+            )
+        return (
+            len(self.module.globals),
+            len(self.module.scope.journal),
+            len(self.pool.strings),
+            self.pool.merged_strings,
+            len(self.commented_lines),
+            self.ssa_locals,
+            len(self.blocks),
+            block,
+        )
+
+    def rollback(self, checkpoint: tuple) -> None:
+        """
+        Remove everything converted after a checkpoint, converting the same statements again gives the same module
+        :param checkpoint: A checkpoint of this converter
+        :return: None
+        """
+        (
+            globals_size,
+            scope_mark,
+            strings,
+            self.pool.merged_strings,
+            commented_lines,
+            self.ssa_locals,
+            blocks,
+            block,
+        ) = checkpoint
+        # The variables of the removed statements disappear with the removed builders and the entries of the
+        # symbol table that is rolled back with the converter
+        del self.blocks[blocks:]
+        del self.builders[blocks:]
+        if block is not None:
+            instructions, terminator, block_mark, ssa_mark = block
+            self.blocks[-1].scope.rollback(block_mark)
+            del self.blocks[-1].instructions[instructions:]
+            self.blocks[-1].terminator = terminator
+            self.builders[-1].rollback(ssa_mark)
+            self.builders[-1].position_at_end(self.blocks[-1])
+        while len(self.module.globals) > globals_size:
+            self.module.globals.popitem()
+        self.module.scope.rollback(scope_mark)
+        while len(self.pool.strings) > strings:
+            self.pool.strings.popitem()
+        while len(self.commented_lines) > commented_lines:
+            self.commented_lines.popitem()
+
+    def convert_main(self, node: MainNode) -> object:
+        function = ir.Function(self.module, ir.FunctionType(ir.IntType(32), []), "main")
+        if self.checkpoints:
+            # Before the block is added, the block shares the scope of its function
+            function.scope = JournaledNameScope(function.scope)
+        self.blocks.append(function.append_basic_block("main"))
+        self.builders.append(SsaBuilder(self.blocks[-1]))
+        if self.checkpoints:
+            self.builders[-1].journal = []
+        self.add_statement_comment(node)
+
+    def convert_assignment(self, node: AssignNode) -> object:
+        if node.converted:
+            return SKIP_CHILDREN
+        if isinstance(node.children[0], PointerNode):
+            # dereference pointer
+            pointer_depth = node.children[0].depth
+            pointee = self.symbol_table.lookup(node.children[0].children[0]).llvm_var
+            for _ in range(pointer_depth - 1):
+                pointee = self.builders[-1].load(pointee)
+            assignee = self.builders[-1].load(pointee)
+        else:
+            assignee = self.symbol_table.lookup(node.children[0]).llvm_var
+        value = node.children[1]
+
+        # make sure we dont do assignment twice when doing something like int a = number++;
+        node.converted = True
+        if isinstance(value, AssignNode):
+            value.converted = True
+
+        self.store_value(value, assignee)
+        self.add_statement_comment(node)
+
+    def convert_new_variable(self, node: NewVariableNode) -> object:
+        const_var: bool = len(node.children) == 4
+        pointer_depth = 0
+        if const_var:
+            if isinstance(
+                node.children[2],
+                (
+                    IntPointerNode,
+                    FloatPointerNode,
+                    CharPointerNode,
+                    BoolPointerNode,
+                ),
+            ):
+                # take pointer depth in accoun
+                var_node = node.children[2]
+                pointer_depth = var_node.depth
+                var_id = var_node.children[0]
+            else:
+                var_id = node.children[2]
+        else:
+            if isinstance(
+                node.children[1],
+                (
+                    IntPointerNode,
+                    FloatPointerNode,
+                    CharPointerNode,
+                    BoolPointerNode,
+                ),
+            ):
+                var_node = node.children[1]
+                pointer_depth = var_node.depth
+                var_id = var_node.children[0]
+            else:
+                var_id = node.children[1]
+        var_name = var_id.value
+
+        try:
+            builder = self.builders[-1]
+        except:
+            # global variable
+            var = ir.GlobalVariable(
+                self.module,
+                node_to_llvmtype(node.children[2], self.symbol_table),
+                var_name,
+            )
+            value_ast = node.children[3] if const_var else node.children[2]
+            match value_ast:
+                case IntNode():
+                    value = self.pool.int_constant(int(value_ast.value))
+                case FloatNode():
+                    value = self.pool.float_constant(float(value_ast.value))
+                case CharNode():
+                    value = ir.Constant(
+                        ir.ArrayType(ir.IntType(8), 1),
+                        bytearray(value_ast.value.encode("utf-8")),
                     )
-                    value_ast = node.children[3] if const_var else node.children[2]
-                    match value_ast:
-                        case IntNode():
-                            value = ir.Constant(ir.IntType(32), int(value_ast.value))
-                        case FloatNode():
-                            value = ir.Constant(ir.FloatType(), float(value_ast.value))
-                        case CharNode():
-                            value = ir.Constant(
-                                ir.ArrayType(ir.IntType(8), 1),
-                                bytearray(value_ast.value.encode("utf-8")),
-                            )
-                        case _:
-                            raise Exception("Converter.py:433")
-                    var.initializer = value
-                    return
+                case BoolNode():
+                    value = self.pool.bool_constant(int(value_ast.value == "true"))
+                case _:
+                    raise Exception("Converter.py:433")
+            var.initializer = value
+            self.symbol_table.lookup(var_id).llvm_var = var
+            return SKIP_CHILDREN
 
-                symbol_table_entry = self.symbol_table.find_entry(var_name)
-                var_type = node_to_llvmtype(node.children[2], self.symbol_table)
+        symbol_table_entry = self.symbol_table.lookup(var_id)
+        var_type = node_to_llvmtype(node.children[2], self.symbol_table)
 
-                for _ in range(pointer_depth):
-                    var_type = var_type.as_pointer()
+        for _ in range(pointer_depth):
+            var_type = var_type.as_pointer()
 
-                var = builder.alloca(var_type, name=var_name)
+        if (
+            self.ssa
+            and pointer_depth == 0
+            and symbol_table_entry not in self.address_taken
+        ):
+            var = SsaVariable(var_type, var_name)
+        else:
+            var = builder.alloca(var_type, name=var_name)
 
-                symbol_table_entry.llvm_var = var
-                value = node.children[3] if const_var else node.children[2]
+        symbol_table_entry.llvm_var = var
+        value = node.children[3] if const_var else node.children[2]
 
-                # check if value is a pointer
-                try:
-                    self.store_value(value, var, depth=pointer_depth)
-                except:
-                    # and with integers
-                    var = builder.alloca(ir.IntType(32), name=var_name)
-                    symbol_table_entry.llvm_var = var
-                    self.store_value(value, var, depth=pointer_depth)
-
-            case PrintfNode():
-                builder = self.builders[-1]
-                printf_str = node.children[0].value[1:-1]
-                printf_str = printf_str.replace("\\n", "\x0A")
-                printf_str += "\00"
-
-                fmt_str = ir.GlobalVariable(
-                    self.module,
-                    ir.ArrayType(ir.IntType(8), len(printf_str)),
-                    name=f".str{id(node)}",
-                )
+        # check if value is a pointer
+        try:
+            self.store_value(value, var, depth=pointer_depth)
+        except:
+            # and with integers
+            var = builder.alloca(ir.IntType(32), name=var_name)
+            symbol_table_entry.llvm_var = var
+            self.store_value(value, var, depth=pointer_depth)
+        if isinstance(var, SsaVariable):
+            self.ssa_locals += 1
+        self.add_statement_comment(node)
 
-                fmt_str.initializer = ir.Constant(
-                    ir.ArrayType(ir.IntType(8), len(printf_str)),
-                    bytearray(printf_str.encode("utf-8")),
-                )
+    def convert_printf(self, node: PrintfNode) -> object:
+        builder = self.builders[-1]
+        printf_str = node.children[0].value[1:-1]
+        printf_str = printf_str.replace("\\n", "\x0A")
+        printf_str += "\00"
 
-                fmt_str_pointer = builder.bitcast(
-                    fmt_str, ir.PointerType(ir.IntType(8), 0), name="fmt_str"
-                )
+        # Every printf with the same format string uses the same global
+        fmt_str_pointer = self.pool.string(printf_str.encode("utf-8"))
 
-                vars = [child for child in node.children[1:]]
-                llvm_vars = []
-                for var in vars:
-                    llvm_vars.append(self.node_to_llvm(var))
+        vars = [child for child in node.children[1:]]
+        llvm_vars = []
+        for var in vars:
+            llvm_vars.append(self.node_to_llvm(var))
 
-                args = [fmt_str_pointer] + llvm_vars
+        args = [fmt_str_pointer] + llvm_vars
 
-                builder.call(
-                    self.module.get_global("printf"),
-                    args,
-                )
+        builder.call(
+            self.module.get_global("printf"),
+            args,
+        )
+        self.add_statement_comment(node)
 
-            case CommentNode():
-                comment_value = node.value[2:]
-                # split comment into multiple lines
-                comment_lines = comment_value.split("\n")
-                try:
-                    builder = self.builders[-1]
-                except:
-                    return
-                for comment_line in comment_lines:
-                    if comment_line.strip() == "*/" or comment_line == "":
-                        continue
-                    builder.comment(comment_line)
-
-            case ReturnNode():
-                builder = self.builders[-1]
-
-                match node.children[0]:
-                    case IntNode():
-                        builder.ret(
-                            ir.Constant(ir.IntType(32), int(node.children[0].value))
-                        )
-                    case FloatNode():
-                        builder.ret(
-                            ir.Constant(ir.FloatType(), float(node.children[0].value))
-                        )
-                    case StringNode():
-                        builder.ret(
-                            ir.Constant(
-                                ir.ArrayType(
-                                    ir.IntType(8), len(node.children[0].value)
-                                ),
-                                bytearray(node.children[0].value.encode("utf-8")),
-                            )
-                        )
-                    case IdNode():
-                        builder.ret(
-                            builder.load(
-                                self.symbol_table.find_entry(
-                                    node.children[0].value
-                                ).llvm_var
-                            )
-                        )
-                    case PlusNode():
-                        builder.ret(self.addition(node.children[0]))
-                    case MultNode():
-                        builder.ret(self.multiplication(node.children[0]))
-                    case DivNode():
-                        builder.ret(self.division(node.children[0]))
-                    case MinusNode():
-                        builder.ret(self.subtraction(node.children[0]))
-                    case _:
-                        raise Exception(
-                            f"Unknown type at Generation of return: {node.children[0]}"
-                        )
+    def convert_comment(self, node: CommentNode) -> object:
+        comment_value = node.value[2:]
+        # split comment into multiple lines
+        comment_lines = comment_value.split("\n")
+        try:
+            builder = self.builders[-1]
+        except:
+            return SKIP_CHILDREN
+        for comment_line in comment_lines:
+            if comment_line.strip() == "*/" or comment_line == "":
+                continue
+            builder.comment(comment_line)
         self.add_statement_comment(node)
 
-        for child in node.children:
-            self.convert(child)
+    def convert_return(self, node: ReturnNode) -> object:
+        builder = self.builders[-1]
+
+        match node.children[0]:
+            case IntNode():
+                builder.ret(self.pool.int_constant(int(node.children[0].value)))
+            case FloatNode():
+                builder.ret(self.pool.float_constant(float(node.children[0].value)))
+            case StringNode():
+                builder.ret(
+                    ir.Constant(
+                        ir.ArrayType(ir.IntType(8), len(node.children[0].value)),
+                        bytearray(node.children[0].value.encode("utf-8")),
+                    )
+                )
+            case IdNode():
+                builder.ret(
+                    builder.load(self.symbol_table.lookup(node.children[0]).llvm_var)
+                )
+            case PlusNode():
+                builder.ret(self.addition(node.children[0]))
+            case MultNode():
+                builder.ret(self.multiplication(node.children[0]))
+            case DivNode():
+                builder.ret(self.division(node.children[0]))
+            case MinusNode():
+                builder.ret(self.subtraction(node.children[0]))
+            case _:
+                raise Exception(
+                    f"Unknown type at Generation of return: {node.children[0]}"
+                )
+        self.add_statement_comment(node)
 
     def return_llvm_code(self) -> str:
         """
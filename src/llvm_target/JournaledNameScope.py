@@ -0,0 +1,47 @@
+from llvmlite.ir._utils import NameScope
+
+
+class JournaledNameScope(NameScope):
+    """
+    NameScope that records the names it registers and the counters it increments
+    Rolling the scope back to a mark makes the names registered after it available again, so values that are
+    created again after a rollback get the same names as in a module that never had the removed values.
+    """
+
+    def __init__(self, scope: NameScope | None = None) -> None:
+        """
+        :param scope: Scope with the names that are already registered, the new scope replaces it
+        """
+        super().__init__()
+        if scope is not None:
+            self._useset = set(scope._useset)
+            self._basenamemap = scope._basenamemap.copy()
+        # A registered name, or a (base name, old counter) tuple for a counter of deduplicate
+        self.journal: list[str | tuple[str, int | None]] = []
+
+    def register(self, name: str, deduplicate: bool = False) -> str:
+        name = super().register(name, deduplicate)
+        self.journal.append(name)
+        return name
+
+    def deduplicate(self, name: str) -> str:
+        counter = self._basenamemap.get(name)
+        unique = super().deduplicate(name)
+        if unique != name:
+            self.journal.append((name, counter))
+        return unique
+
+    def rollback(self, mark: int) -> None:
+        """
+        Undo the names and counters recorded after a mark
+        :param mark: Length of the journal at the mark
+        :return: None
+        """
+        while len(self.journal) > mark:
+            entry = self.journal.pop()
+            if isinstance(entry, str):
+                self._useset.discard(entry)
+            elif entry[1] is None:
+                del self._basenamemap[entry[0]]
+            else:
+                self._basenamemap[entry[0]] = entry[1]
@@ -0,0 +1,60 @@
+from llvmlite import ir
+
+
+class SsaVariable:
+    """
+    A local variable that is kept in a register instead of an alloca
+    It has the type an alloca of the variable would have, so the converter can use it wherever it uses the address of
+    a variable. Loads and stores of an SsaBuilder read and replace its current value.
+    """
+
+    __slots__ = ("type", "name", "value")
+
+    def __init__(self, value_type: ir.Type, name: str) -> None:
+        self.type: ir.PointerType = value_type.as_pointer()
+        self.name: str = name
+        # Reading the variable before it is assigned reads an undefined value, like a load of a fresh alloca
+        self.value: ir.Value = ir.Constant(value_type, ir.Undefined)
+
+
+class SsaBuilder(ir.IRBuilder):
+    """
+    IRBuilder that doesn't emit loads and stores of SsaVariables
+    The converter only emits straight-line code in a single block, so the last value stored in a variable is its value
+    at every later point of the block and no phi nodes are needed.
+    """
+
+    def __init__(self, block: ir.Block | None = None) -> None:
+        super().__init__(block)
+        # Variables and the values the stores replaced, see rollback, None if stores are not recorded
+        self.journal: list[tuple[SsaVariable, ir.Value]] | None = None
+
+    def rollback(self, mark: int) -> None:
+        """
+        Give the variables back the values they had before the stores recorded after a mark
+        :param mark: Length of the journal at the mark
+        :return: None
+        """
+        while len(self.journal) > mark:
+            variable, value = self.journal.pop()
+            variable.value = value
+
+    def load(self, ptr: ir.Value, name: str = "", align: int | None = None) -> ir.Value:
+        if isinstance(ptr, SsaVariable):
+            return ptr.value
+        return super().load(ptr, name, align)
+
+    def store(
+        self, value: ir.Value, ptr: ir.Value, align: int | None = None
+    ) -> ir.StoreInstr | None:
+        if isinstance(ptr, SsaVariable):
+            # The same check as a store, the converter falls back to an i32 alloca on a TypeError
+            if ptr.type.pointee != value.type:
+                raise TypeError(
+                    f"cannot store {value.type} to {ptr.type}: mismatching types"
+                )
+            if self.journal is not None:
+                self.journal.append((ptr, ptr.value))
+            ptr.value = value
+            return None
+        return super().store(value, ptr, align)
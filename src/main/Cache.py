@@ -0,0 +1,187 @@
+import hashlib
+import json
+import os
+
+from src.main.Options import CompileOptions, CompileOutput
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GRAMMAR_FILE = os.path.join(os.path.dirname(SRC_DIR), "compiler.g4")
+
+_versions: tuple[str, str] | None = None
+# Estimated size in bytes of the entries of every cache directory this process used, see CompilationCache.evict
+_sizes: dict[str, int] = {}
+
+
+def versions() -> tuple[str, str]:
+    """
+    Returns the grammar and compiler version used in the cache keys
+    The versions are hashes of the grammar file and of all python files of the compiler, so every change to the
+    compiler invalidates the cache
+    :return: tuple[str, str] : The grammar version and the compiler version
+    """
+    global _versions
+    if _versions is None:
+        grammar = hashlib.sha256()
+        if os.path.exists(GRAMMAR_FILE):
+            with open(GRAMMAR_FILE, "rb") as f:
+                grammar.update(f.read())
+
+        compiler = hashlib.sha256()
+        for directory, directories, files in os.walk(SRC_DIR):
+            directories.sort()
+            for file in sorted(files):
+                if not file.endswith(".py"):
+                    continue
+                path = os.path.join(directory, file)
+                compiler.update(os.path.relpath(path, SRC_DIR).encode("utf-8"))
+                with open(path, "rb") as f:
+                    compiler.update(f.read())
+
+        _versions = (grammar.hexdigest(), compiler.hexdigest())
+    return _versions
+
+
+class CompilationCache:
+    """
+    Content-addressed on-disk cache of compile outputs
+    Every entry is a JSON file named after the hash of the source, the grammar and compiler version and the
+    options that change the output. Entries are evicted least recently used first once the cache grows larger
+    than max_size bytes.
+    """
+
+    def __init__(self, cache_dir: str, max_size: int) -> None:
+        self.cache_dir: str = cache_dir
+        self.max_size: int = max_size
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, source: bytes, options: CompileOptions) -> str:
+        grammar_version, compiler_version = versions()
+        key = hashlib.sha256()
+        key.update(source)
+        key.update(grammar_version.encode("utf-8"))
+        key.update(compiler_version.encode("utf-8"))
+        key.update(
+            f"{bool(options.no_const_folding)}:{bool(options.no_const_propagation)}".encode(
+                "utf-8"
+            )
+        )
+        key.update(
+            f"{options.opt_level}:{options.passes}:{options.emit}:{options.ssa}".encode(
+                "utf-8"
+            )
+        )
+        return key.hexdigest()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + ".json")
+
+    def load(self, key: str, options: CompileOptions) -> CompileOutput | None:
+        """
+        Look up the outputs of a compilation
+        :param key: Cache key of the compilation
+        :param options: The compile options, all requested outputs have to be in the entry
+        :return: CompileOutput | None : The cached outputs, None on a cache miss
+        """
+        path = self.path(key)
+        try:
+            with open(path) as f:
+                output = CompileOutput.from_dict(json.load(f))
+        except (OSError, ValueError):
+            return None
+
+        if (
+            (options.render_ast and output.ast is None)
+            or (options.render_symb and output.symbol_table is None)
+            or (options.target_llvm and not output.has_llvm(options))
+            or (options.target_mips and output.mips_code is None)
+        ):
+            return None
+
+        # Mark the entry as recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        # The statistics of the compilation that stored the entry don't describe this one
+        output.stats = {"cache: hit": 1}
+        return output
+
+    def store(self, key: str, output: CompileOutput) -> None:
+        """
+        Store the outputs of a compilation, outputs already in the entry are kept
+        The statistics are not stored, a cache hit doesn't repeat the work they count.
+        :param key: Cache key of the compilation
+        :param output: The outputs to store
+        :return: None
+        """
+        path = self.path(key)
+        entry = output.to_dict()
+        del entry["stats"]
+        old_size = 0
+        try:
+            with open(path) as f:
+                data = f.read()
+            old_size = len(data)
+            for name, value in json.loads(data).items():
+                if name != "stats" and entry.get(name) is None:
+                    entry[name] = value
+        except (OSError, ValueError):
+            pass
+
+        # Write to a temporary file first, so concurrent compilers never read half written entries
+        data = json.dumps(entry)
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, "w") as f:
+            f.write(data)
+        os.replace(temporary_path, path)
+
+        cache_dir = os.path.abspath(self.cache_dir)
+        if cache_dir not in _sizes:
+            _sizes[cache_dir] = self.size()
+        else:
+            _sizes[cache_dir] += len(data) - old_size
+        if _sizes[cache_dir] > self.max_size:
+            _sizes[cache_dir] = self.evict()
+
+    def entries(self) -> list[tuple[float, int, str]]:
+        """
+        Returns the entries in the cache directory
+        :return: list[tuple[float, int, str]] : The modification time, the size and the path of every entry
+        """
+        entries = []
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if not entry.name.endswith(".json"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def size(self) -> int:
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self) -> int:
+        """
+        Remove the least recently used entries until the cache is no larger than max_size
+        Only runs once the estimated size crosses max_size. The estimate is the size of the cache when this process
+        stored its first entry plus what it stored since, entries of other processes are counted by the next evict.
+        :return: int : The size of the cache after the eviction
+        """
+        entries = self.entries()
+        size = sum(entry_size for _, entry_size, _ in entries)
+        if size <= self.max_size:
+            return size
+
+        entries.sort()
+        for _, entry_size, path in entries:
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            size -= entry_size
+            if size <= self.max_size:
+                break
+        return size
@@ -0,0 +1,106 @@
+import json
+import os
+import socket
+from typing import BinaryIO
+
+from src.main.Options import CompileOptions, CompileOutput, CompileResult, input_root
+
+# The client only imports the standard library and the option classes, so connecting to a running
+# compile server doesn't pay for importing antlr4, llvmlite or graphviz
+
+
+def write_message(file: BinaryIO, message: dict) -> None:
+    """
+    Write one message of the compile server protocol, messages are JSON objects on a single line
+    :param file: Binary file of the socket to write to
+    :param message: The message to send
+    :return: None
+    """
+    file.write(json.dumps(message).encode("utf-8") + b"\n")
+    file.flush()
+
+
+def read_message(file: BinaryIO) -> dict | None:
+    """
+    Read one message of the compile server protocol
+    :param file: Binary file of the socket to read from
+    :return: dict | None : The message, None if the connection was closed
+    """
+    line = file.readline()
+    if not line:
+        return None
+    return json.loads(line)
+
+
+class CompileClient:
+    def __init__(self, socket_path: str) -> None:
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.socket.connect(socket_path)
+        self.rfile: BinaryIO = self.socket.makefile("rb")
+        self.wfile: BinaryIO = self.socket.makefile("wb")
+
+    def close(self) -> None:
+        self.rfile.close()
+        self.wfile.close()
+        self.socket.close()
+
+    def compile_source(
+        self, source: str, options: CompileOptions, input_file: str | None = None
+    ) -> CompileOutput:
+        """
+        Let the server compile C source code
+        :param source: The C source code
+        :param options: The compile options
+        :param input_file: Absolute path of the source, with options.incremental the server compares the source to
+        the last version of this file it compiled
+        :return: CompileOutput : The requested outputs
+        """
+        write_message(
+            self.wfile,
+            {"source": source, "options": options.to_dict(), "input_file": input_file},
+        )
+        response = read_message(self.rfile)
+        if response is None:
+            raise Exception("Compile server closed the connection")
+        if response["error"] is not None:
+            raise Exception(response["error"])
+        return CompileOutput.from_dict(response["output"])
+
+    def compile(self, input_file: str, options: CompileOptions) -> CompileOutput:
+        """
+        Let the server compile a single input file, the outputs are written by the client
+        :param input_file: Path of the C file to compile
+        :param options: The compile options
+        :return: CompileOutput : The outputs that were written
+        """
+        with open(input_file) as f:
+            source = f.read()
+        # The server can't resolve a path relative to the working directory of the client
+        output = self.compile_source(source, options, os.path.abspath(input_file))
+        output.write(options, input_file)
+        return output
+
+    def compile_batch(
+        self, input_files: list[str], options: CompileOptions
+    ) -> list[CompileResult]:
+        """
+        Let the server compile many files, one request after the other over the same connection
+        :param input_files: Paths of the C files to compile
+        :param options: The batch options, output options are directories
+        :return: list[CompileResult] : The results in the same order as the input files
+        """
+        root = input_root(input_files)
+        for directory in options.output_directories(input_files, root):
+            os.makedirs(directory, exist_ok=True)
+
+        results = []
+        for input_file in input_files:
+            try:
+                self.compile(input_file, options.for_input(input_file, root))
+            except Exception as e:
+                results.append(
+                    CompileResult(input_file, str(e) or e.__class__.__name__)
+                )
+                continue
+            results.append(CompileResult(input_file))
+        return results
@@ -0,0 +1,292 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import repeat
+from typing import TYPE_CHECKING
+
+from src.parser.ConstantFolder import ConstantFolder
+from src.parser.SourceBuffer import SourceBuffer
+from src.parser.SymbolTable import *
+from src.parser.SemanticAnalyzer import *
+from src.main.Cache import CompilationCache
+from src.main.Options import (
+    CompileOptions,
+    CompileOutput,
+    CompileResult,
+    input_root,
+)
+
+if TYPE_CHECKING:
+    # The parsers import antlr4, they are imported when a file is parsed
+    from src.main.IncrementalCompiler import IncrementalCompiler
+
+
+class Compiler:
+    def __init__(self) -> None:
+        pass
+
+    @staticmethod
+    def compile(input_file: str, options: CompileOptions) -> CompileOutput:
+        """
+        Compile a single input file and write all requested outputs
+        :param input_file: Path of the C file to compile
+        :param options: The compile options
+        :return: CompileOutput : The outputs that were written
+        """
+        # The file is mapped once, the lexer and the line comments of the converter read from the same buffer
+        with SourceBuffer.open(input_file) as source:
+            output = Compiler.compile_source(source, options)
+        output.write(options, input_file)
+        return output
+
+    @staticmethod
+    def compile_source(
+        source: str | SourceBuffer,
+        options: CompileOptions,
+        incremental: "IncrementalCompiler | None" = None,
+    ) -> CompileOutput:
+        """
+        Compile C source code, the outputs are returned instead of written
+        :param source: The C source code or a buffer with the source
+        :param options: The compile options, only used to check which outputs are requested
+        :param incremental: Compiler with the statements of the previous version of the source, used with
+        options.incremental
+        :return: CompileOutput : The requested outputs
+        """
+        if not isinstance(source, SourceBuffer):
+            source = SourceBuffer.from_string(source)
+
+        cache = None
+        # The output of a run is not cached, the program runs on every compilation
+        if options.cache_dir and not options.run:
+            cache = CompilationCache(options.cache_dir, options.cache_size)
+            key = cache.key(source.data, options)
+            output = cache.load(key, options)
+            if output is not None:
+                return output
+
+        output = CompileOutput()
+
+        # Imported after the cache lookup, a cache hit doesn't need antlr4
+        from src.parser.Parser import Parser
+
+        converter = None
+        if options.incremental:
+            # Parse, symbol table, constant folding and llvm code of the statements from the first changed one
+            from src.main.IncrementalCompiler import IncrementalCompiler
+
+            if incremental is None:
+                incremental = IncrementalCompiler()
+            ast, symbol_table, converter = incremental.compile(source, options)
+            output.stats["incremental: reparsed statements"] = (
+                incremental.parser.reparsed
+            )
+            output.stats["incremental: reused statements"] = incremental.parser.reused
+            output.stats["incremental: recompiled statements"] = incremental.recompiled
+            if incremental.folder is not None:
+                output.stats["constant folding: rewritten nodes"] = (
+                    incremental.folder.rewritten
+                )
+        else:
+            # Generate AST
+            if options.frontend == "fast":
+                from src.parser.FastParser import FastParser
+
+                ast = FastParser.parse_source(source)
+            else:
+                ll_fallbacks = Parser.ll_fallbacks
+                ast = Parser.parse_source(
+                    source,
+                    streaming=options.stream,
+                    parse_mode=options.parse_mode,
+                    lexer=options.lexer,
+                )
+                output.stats["parser: ll fallbacks"] = (
+                    Parser.ll_fallbacks - ll_fallbacks
+                )
+            # Generate symbol table
+            symbol_table: SymbolTable = SymbolTable()
+            symbol_table.build_symbol_table(ast)
+            symbol_table.resolve(ast)
+            # Constant folding and propagation
+            if not options.no_const_folding or not options.no_const_propagation:
+                folder = ConstantFolder(
+                    symbol_table,
+                    fold=not options.no_const_folding,
+                    propagate=not options.no_const_propagation,
+                )
+                output.stats["constant folding: rewritten nodes"] = folder.run(ast)
+        # Analyze semantic
+        """
+        semantic_errors, warnings = SemanticAnalyzer.analyze(ast, symbol_table)
+        for error in semantic_errors:
+            print(error)
+        for warning in warnings:
+            print(warning)
+        if semantic_errors:
+            quit(-1)
+        """
+
+        # The stages of the outputs are imported when they are requested, so graphviz and llvmlite are not loaded
+        # by compilations that don't need them
+        if options.render_ast:
+            from src.parser.DotExporter import DotExporter
+
+            output.ast = DotExporter.to_dot(ast)
+
+        if options.render_symb:
+            output.symbol_table = str(symbol_table)
+
+        if options.target_llvm or options.run:
+            # Generate llvm target
+            if converter is None:
+                from src.llvm_target.Converter import LlvmConverter
+
+                converter = LlvmConverter(symbol_table, source, ssa=options.ssa)
+                converter.convert(ast)
+            output.llvm_code = converter.return_llvm_code()
+            if options.ssa:
+                output.stats["llvm: ssa locals"] = converter.ssa_locals
+            output.stats["llvm: string globals"] = len(converter.pool.strings)
+            output.stats["llvm: merged strings"] = converter.pool.merged_strings
+
+            if (
+                options.opt_level is not None
+                or options.passes
+                or options.run
+                or options.emit != "ll"
+            ):
+                # Verify, optimize, emit and run the module in process instead of running opt, llc and lli
+                # afterwards
+                from src.llvm_target.Backend import (
+                    count_instructions,
+                    emit,
+                    optimize,
+                    parse_module,
+                    run,
+                )
+
+                module = parse_module(output.llvm_code)
+                if options.opt_level is not None or options.passes:
+                    output.stats["llvm: instructions"] = count_instructions(module)
+                    optimize(module, options.opt_level or 0, options.passes)
+                    output.stats["llvm: optimized instructions"] = count_instructions(
+                        module
+                    )
+                if options.target_llvm:
+                    # Emitted before the run, the execution engine takes ownership of the module
+                    code = emit(module, options.emit, options.opt_level or 0)
+                    if isinstance(code, bytes):
+                        output.llvm_code, output.llvm_binary = None, code
+                    else:
+                        output.llvm_code = code
+                if options.run:
+                    (
+                        output.return_code,
+                        output.stdout,
+                        output.jit_time,
+                        output.run_time,
+                    ) = run(module)
+
+        if options.target_mips:
+            # Generate MIPS target
+            from src.mips_target.MipsConverter import MipsConverter
+
+            mips_converter = MipsConverter(symbol_table, source)
+            mips_converter.convert(ast)
+            output.mips_code = mips_converter.return_mips_code()
+            output.stats["mips: instructions"] = sum(
+                not instruction.template.startswith("#")
+                for instruction in mips_converter.instructions
+            )
+            output.stats["mips: spilled registers"] = mips_converter.allocator.spilled
+            output.stats["mips: spill loads"] = mips_converter.allocator.loads
+            output.stats["mips: spill stores"] = mips_converter.allocator.stores
+
+        if cache is not None:
+            cache.store(key, output)
+
+        return output
+
+    @staticmethod
+    def compile_batch_item(
+        input_file: str, options: CompileOptions, input_root: str | None = None
+    ) -> CompileResult:
+        """
+        Compile one file of a batch, errors are returned instead of raised so one bad file doesn't stop the batch
+        :param input_file: Path of the C file to compile
+        :param options: The batch options, output options are directories
+        :param input_root: Directory of the batch, the outputs mirror the path of the input below it
+        :return: CompileResult : The result of the compilation
+        """
+        try:
+            Compiler.compile(input_file, options.for_input(input_file, input_root))
+        except Exception as e:
+            return CompileResult(input_file, str(e) or e.__class__.__name__)
+        return CompileResult(input_file)
+
+    @staticmethod
+    def compile_batch(
+        input_files: list[str],
+        options: CompileOptions,
+        jobs: int | None = None,
+    ) -> list[CompileResult]:
+        """
+        Compile many files in a pool of worker processes
+        Every worker imports the compiler once and compiles many files, instead of starting a new process per file
+        :param input_files: Paths of the C files to compile
+        :param options: The batch options, output options are directories
+        :param jobs: Amount of worker processes, defaults to the amount of CPUs
+        :return: list[CompileResult] : The results in the same order as the input files
+        """
+        root = input_root(input_files)
+        for directory in options.output_directories(input_files, root):
+            os.makedirs(directory, exist_ok=True)
+
+        jobs = jobs or os.cpu_count() or 1
+        if jobs == 1:
+            # Compile in this process, without starting a worker
+            return [
+                Compiler.compile_batch_item(input_file, options, root)
+                for input_file in input_files
+            ]
+
+        chunksize = max(1, len(input_files) // (jobs * 4))
+        results: list[CompileResult] = []
+        try:
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                for result in executor.map(
+                    Compiler.compile_batch_item,
+                    input_files,
+                    repeat(options),
+                    repeat(root),
+                    chunksize=chunksize,
+                ):
+                    results.append(result)
+        except BrokenProcessPool:
+            # A worker died, it is unknown which of its files killed it. The files without a result are compiled
+            # again in a process of their own, so only the file that kills its process fails.
+            for input_file in input_files[len(results) :]:
+                results.append(Compiler.compile_isolated(input_file, options, root))
+        return results
+
+    @staticmethod
+    def compile_isolated(
+        input_file: str,
+        options: CompileOptions,
+        input_root: str | None = None,
+    ) -> CompileResult:
+        """
+        Compile one file of a batch in a new worker process
+        :param input_file: Path of the C file to compile
+        :param options: The batch options, output options are directories
+        :param input_root: Directory of the batch, the outputs mirror the path of the input below it
+        :return: CompileResult : The result of the compilation, an error if the worker died
+        """
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            try:
+                return executor.submit(
+                    Compiler.compile_batch_item, input_file, options, input_root
+                ).result()
+            except BrokenProcessPool:
+                return CompileResult(input_file, "the compiler process died")
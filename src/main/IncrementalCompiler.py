@@ -0,0 +1,323 @@
+from itertools import islice
+from typing import TYPE_CHECKING
+
+from src.main.Options import CompileOptions
+from src.parser.ConstantFolder import ConstantFolder
+from src.parser.IncrementalParser import (
+    END,
+    MAIN,
+    Chunk,
+    IncrementalParser,
+    statements,
+)
+from src.parser.SourceBuffer import SourceBuffer
+from src.parser.SymbolTable import SymbolTable, SymbolTableEntry
+from src.parser.TreeNode import *
+
+if TYPE_CHECKING:
+    # Imported when llvm code is requested, like in Compiler
+    from src.llvm_target.Converter import LlvmConverter
+
+
+class IncrementalCompiler:
+    """
+    Compiles new versions of one source, the passes only run on the statements from the first changed statement on
+    Main has no control flow, so what the symbol table, the constant folder and the llvm converter build for a
+    statement only depends on the statements before it. The passes run statement by statement and their state
+    before every statement is kept as a checkpoint. A new version rolls the passes back to the checkpoint of the
+    first statement the IncrementalParser parsed again, the entries, folded ASTs and llvm code of the statements
+    before it are reused. The outputs are the same as the outputs of a compilation of the whole source.
+    """
+
+    def __init__(self) -> None:
+        self.parser: IncrementalParser = IncrementalParser()
+        self.reset()
+
+    def reset(self) -> None:
+        self.symbol_table: SymbolTable = SymbolTable()
+        self.folder: ConstantFolder | None = None
+        self.converter: "LlvmConverter | None" = None
+        # Signature of the options the state was built with
+        self.passes: tuple | None = None
+        # Visible entries of the global scope and of main and the amount of open scopes, see SymbolTable.resolve
+        self.scopes: list[dict[str, SymbolTableEntry]] = [{}]
+        self.depth: int = 1
+        self.scope_idx: int = 0
+        # Scopes, names and entries of declarations that replaced a visible entry of the same scope
+        self.hidden: list[tuple[dict[str, SymbolTableEntry], str, SymbolTableEntry]] = (
+            []
+        )
+        # State of the passes before every chunk and after the last chunk
+        self.checkpoints: list[tuple] = []
+        self.converter_checkpoints: list[tuple] = []
+        # Entries of which every chunk takes the address, None for no entries, only with ssa
+        self.taken: list[set[SymbolTableEntry] | None] = []
+        # Whether main had no statements, main is collapsed into its type then
+        self.empty_main: bool = False
+        # Statements the passes ran on in the last compilation
+        self.recompiled: int = 0
+
+    @staticmethod
+    def signature(options: CompileOptions) -> tuple:
+        """
+        Returns the passes the options run and how, the state of other passes can't be reused
+        :param options: The compile options
+        :return: tuple : The signature
+        """
+        return (
+            not options.no_const_folding,
+            not options.no_const_propagation,
+            bool(options.target_llvm or options.run),
+            options.ssa,
+        )
+
+    def compile(
+        self, source: str | SourceBuffer, options: CompileOptions
+    ) -> tuple[TreeNode, SymbolTable, "LlvmConverter | None"]:
+        """
+        Parse a new version of the source and run the passes from the first changed statement on
+        :param source: The C source code or a buffer with the source
+        :param options: The compile options
+        :return: tuple[TreeNode, SymbolTable, LlvmConverter | None] : The AST, the symbol table and the converter
+        with the llvm code, None if no llvm code is requested
+        """
+        if not isinstance(source, SourceBuffer):
+            source = SourceBuffer.from_string(source)
+        ast = self.parser.parse(source)
+        chunks = self.parser.chunks
+        first = self.parser.first_changed
+
+        main = next(
+            (idx for idx, chunk in enumerate(chunks) if chunk.kind == MAIN), None
+        )
+        empty_main = main is not None and chunks[main + 1].kind == END
+        if main is not None and empty_main != self.empty_main:
+            first = min(first, main)
+        signature = IncrementalCompiler.signature(options)
+        if signature != self.passes or first >= len(self.checkpoints):
+            first = 0
+
+        try:
+            if first < self.parser.first_changed:
+                # The passes run again on statements that kept their AST, these need new nodes
+                self.parser.first_changed = first
+                ast = self.parser.build_tree()
+            if not self.run(ast, chunks, first, source, options, empty_main):
+                self.parser.first_changed = first = 0
+                ast = self.parser.build_tree()
+                self.run(ast, chunks, first, source, options, empty_main)
+        except Exception:
+            # The passes stopped in the middle of a statement, the next version is compiled from the start
+            self.reset()
+            raise
+        self.passes = signature
+        self.empty_main = empty_main
+        self.recompiled = statements(chunks[first:])
+        return ast, self.symbol_table, self.converter
+
+    def run(
+        self,
+        ast: ProgNode,
+        chunks: list[Chunk],
+        first: int,
+        source: SourceBuffer,
+        options: CompileOptions,
+        empty_main: bool,
+    ) -> bool:
+        """
+        Run the passes on the chunks from first on
+        :param ast: The AST of the chunks
+        :param chunks: The chunks of the source
+        :param first: Index of the first chunk to run the passes on, the state is rolled back to its checkpoint
+        :param source: The source, for the line comments of the llvm code
+        :param options: The compile options
+        :param empty_main: Whether main is collapsed into its type
+        :return: bool : False if the llvm code of the chunks before first has to be built again, with ssa a changed
+        statement can take the address of a variable that was declared in a register before it
+        """
+        if first == 0:
+            self.reset()
+            if not options.no_const_folding or not options.no_const_propagation:
+                self.folder = ConstantFolder(
+                    self.symbol_table,
+                    fold=not options.no_const_folding,
+                    propagate=not options.no_const_propagation,
+                )
+            if options.target_llvm or options.run:
+                from src.llvm_target.Converter import LlvmConverter
+
+                self.converter = LlvmConverter(
+                    self.symbol_table, source, ssa=options.ssa, checkpoints=True
+                )
+        else:
+            self.rollback(first)
+
+        positions = IncrementalCompiler.positions(ast, chunks)
+        ssa = self.converter is not None and options.ssa
+        del self.checkpoints[first:]
+        del self.taken[first:]
+        for idx in range(first, len(chunks)):
+            self.checkpoints.append(self.checkpoint())
+            chunk = chunks[idx]
+            parent, position = positions[idx]
+            taken = None
+            if chunk.kind == MAIN and not empty_main:
+                self.symbol_table.enter_main(chunk.tree)
+                self.scope_idx = chunk.tree.scope_idx
+                self.scopes.append({})
+                self.depth = 2
+            elif chunk.kind == END:
+                self.depth = 1
+            else:
+                node = self.analyze(parent, position)
+                if chunk.kind != MAIN:
+                    chunk.tree = node
+                if ssa:
+                    taken = self.converter.taken_addresses(node) or None
+            self.taken.append(taken)
+        self.checkpoints.append(self.checkpoint())
+
+        converter = self.converter
+        if converter is None:
+            return True
+        converter.source = source
+        if ssa:
+            taken = set().union(*filter(None, self.taken))
+            if first and any(
+                self.converted(entry) for entry in taken ^ converter.address_taken
+            ):
+                return False
+            converter.address_taken = taken
+
+        del self.converter_checkpoints[first:]
+        if first == 0:
+            converter.add_statement_comment(ast)
+        for idx in range(first, len(chunks)):
+            self.converter_checkpoints.append(converter.checkpoint())
+            chunk = chunks[idx]
+            parent, position = positions[idx]
+            if chunk.kind == MAIN and not empty_main:
+                converter.convert_main(chunk.tree)
+                converter.convert_statement(chunk.tree.children[0])
+            elif chunk.kind != END:
+                converter.convert_statement(parent.children[position])
+        self.converter_checkpoints.append(converter.checkpoint())
+        converter.finish()
+        return True
+
+    def analyze(self, parent: TreeNode, position: int) -> TreeNode:
+        """
+        Declare, resolve and fold a statement after the statements before it
+        :param parent: The program or main
+        :param position: Index of the statement in the children of parent
+        :return: TreeNode : The statement, or the node folding replaced it with
+        """
+        node = parent.children[position]
+        table = self.symbol_table.tables[self.symbol_table.current_idx].table
+        size = len(table)
+        self.symbol_table.build_symbol_table(node)
+        # A declaration after main is added to the table of main, but to the global scope of resolve where it can
+        # replace a global of the same name
+        scope = self.scopes[self.depth - 1]
+        for name in islice(reversed(table), len(table) - size):
+            if name in scope:
+                self.hidden.append((scope, name, scope[name]))
+        self.symbol_table.resolve(node, self.scopes[: self.depth], self.scope_idx)
+        if self.folder is not None:
+            node = self.folder.run_statement(parent, position)
+        return node
+
+    def converted(self, entry: SymbolTableEntry | None) -> bool:
+        """
+        Check if the declaration of an entry was converted before the chunks that run again
+        :param entry: An entry of which the address is taken
+        :return: bool : True if the entry is an entry of the symbol table with llvm code
+        """
+        if entry is None or entry.llvm_var is None:
+            return False
+        return any(
+            table.table.get(entry.name) is entry for table in self.symbol_table.tables
+        )
+
+    @staticmethod
+    def positions(ast: ProgNode, chunks: list[Chunk]) -> list[tuple[TreeNode, int]]:
+        """
+        Returns where the node of every chunk is in the AST
+        :param ast: The AST of the chunks
+        :param chunks: The chunks of the source
+        :return: list[tuple[TreeNode, int]] : The parent and the index in its children of every chunk, the program
+        and the index of main for the closing bracket of main
+        """
+        positions = []
+        main = None
+        top_level, in_main = 0, 0
+        for chunk in chunks:
+            if chunk.kind == MAIN:
+                positions.append((ast, top_level))
+                top_level += 1
+                main, in_main = chunk.tree, 1
+            elif chunk.kind == END:
+                positions.append((ast, top_level - 1))
+                main = None
+            elif main is not None:
+                positions.append((main, in_main))
+                in_main += 1
+            else:
+                positions.append((ast, top_level))
+                top_level += 1
+        return positions
+
+    def checkpoint(self) -> tuple:
+        """
+        Returns the state of the symbol table, the scopes and the folder after the chunks that ran so far
+        Only the last table and the open scopes grow, so their sizes are enough to roll them back.
+        :return: tuple : The checkpoint, for rollback
+        """
+        tables = self.symbol_table.tables
+        return (
+            len(tables),
+            len(tables[-1].table),
+            self.symbol_table.current_idx,
+            tuple(len(scope) for scope in self.scopes),
+            self.depth,
+            self.scope_idx,
+            len(self.hidden),
+            None if self.folder is None else len(self.folder.values),
+            None if self.folder is None else self.folder.rewritten,
+        )
+
+    def rollback(self, first: int) -> None:
+        """
+        Roll the passes back to the state before a chunk
+        :param first: Index of the chunk
+        :return: None
+        """
+        (
+            tables,
+            table_size,
+            self.symbol_table.current_idx,
+            scope_sizes,
+            self.depth,
+            self.scope_idx,
+            hidden,
+            values,
+            rewritten,
+        ) = self.checkpoints[first]
+        del self.symbol_table.tables[tables:]
+        table = self.symbol_table.tables[-1].table
+        while len(table) > table_size:
+            table.popitem()
+        # The hidden entries are restored first, a scope is truncated to the names it had before the chunk after
+        while len(self.hidden) > hidden:
+            scope, name, entry = self.hidden.pop()
+            scope[name] = entry
+        del self.scopes[len(scope_sizes) :]
+        for scope, size in zip(self.scopes, scope_sizes):
+            while len(scope) > size:
+                scope.popitem()
+        if self.folder is not None:
+            while len(self.folder.values) > values:
+                self.folder.values.popitem()
+            self.folder.rewritten = rewritten
+        if self.converter is not None:
+            self.converter.rollback(self.converter_checkpoints[first])
@@ -0,0 +1,255 @@
+import base64
+import copy
+import glob
+import os
+import sys
+
+# Default size bound of the compilation cache in bytes
+DEFAULT_CACHE_SIZE = 256 * 1024 * 1024
+
+# Output formats of --emit and the extensions of their files in batch mode
+EMIT_EXTENSIONS: dict[str, str] = {"ll": ".ll", "bc": ".bc", "asm": ".s", "obj": ".o"}
+BINARY_EMITS: tuple[str, ...] = ("bc", "obj")
+
+
+class CompileOptions:
+    def __init__(
+        self,
+        render_ast: str | None = None,
+        render_symb: str | None = None,
+        target_llvm: str | None = None,
+        target_mips: str | None = None,
+        no_const_folding: bool = False,
+        no_const_propagation: bool = False,
+        cache_dir: str | None = None,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+        stats: bool = False,
+        stream: bool = False,
+        parse_mode: str = "sll",
+        lexer: str = "antlr",
+        frontend: str = "antlr",
+        incremental: bool = False,
+        opt_level: int | None = None,
+        passes: list[str] | None = None,
+        run: bool = False,
+        emit: str = "ll",
+        ssa: bool = False,
+    ) -> None:
+        self.render_ast: str | None = render_ast
+        self.render_symb: str | None = render_symb
+        self.target_llvm: str | None = target_llvm
+        self.target_mips: str | None = target_mips
+        self.no_const_folding: bool = no_const_folding
+        self.no_const_propagation: bool = no_const_propagation
+        self.cache_dir: str | None = cache_dir
+        self.cache_size: int = cache_size
+        self.stats: bool = stats
+        self.stream: bool = stream
+        self.parse_mode: str = parse_mode
+        self.lexer: str = lexer
+        self.frontend: str = frontend
+        self.incremental: bool = incremental
+        # Optimization of the llvm code, None writes the code as it is generated
+        self.opt_level: int | None = opt_level
+        self.passes: list[str] | None = passes
+        self.run: bool = run
+        # Format of the --target_llvm output
+        self.emit: str = emit
+        # Keep locals of which the address is never taken in registers instead of allocas
+        self.ssa: bool = ssa
+
+    def for_input(
+        self, input_file: str, input_root: str | None = None
+    ) -> "CompileOptions":
+        """
+        Returns the options to compile one file of a batch
+        In batch mode the output options are directories, every input file gets its own output files in them. The
+        outputs mirror the path of the input file below the input root, so inputs with the same name in different
+        directories don't overwrite each other.
+        :param input_file: The input file of the batch
+        :param input_root: Directory of the batch as returned by input_root, None puts all outputs in the directories
+        themselves
+        :return: CompileOptions : Options with per-file output paths
+        """
+        if input_root is None:
+            name = os.path.basename(input_file)
+        else:
+            name = os.path.relpath(os.path.abspath(input_file), input_root)
+
+        def output_path(directory: str | None, extension: str) -> str | None:
+            if directory is None:
+                return None
+            return os.path.join(directory, name + extension)
+
+        options = copy.copy(self)
+        options.render_ast = output_path(self.render_ast, ".ast")
+        options.render_symb = output_path(self.render_symb, ".symb")
+        options.target_llvm = output_path(self.target_llvm, EMIT_EXTENSIONS[self.emit])
+        options.target_mips = output_path(self.target_mips, ".asm")
+        return options
+
+    def output_directories(
+        self, input_files: list[str], input_root: str | None = None
+    ) -> list[str]:
+        """
+        Returns the directories the outputs of a batch are written to
+        :param input_files: The input files of the batch
+        :param input_root: Directory of the batch as returned by input_root
+        :return: list[str] : The output directories and the subdirectories of the inputs in them
+        """
+        subdirectories = {""}
+        if input_root is not None:
+            subdirectories.update(
+                os.path.dirname(
+                    os.path.relpath(os.path.abspath(input_file), input_root)
+                )
+                for input_file in input_files
+            )
+        return [
+            os.path.join(directory, subdirectory)
+            for directory in (
+                self.render_ast,
+                self.render_symb,
+                self.target_llvm,
+                self.target_mips,
+            )
+            if directory is not None
+            for subdirectory in sorted(subdirectories)
+        ]
+
+    def to_dict(self) -> dict:
+        return dict(vars(self))
+
+    @staticmethod
+    def from_dict(options: dict) -> "CompileOptions":
+        return CompileOptions(**options)
+
+
+class CompileOutput:
+    def __init__(
+        self,
+        ast: str | None = None,
+        symbol_table: str | None = None,
+        llvm_code: str | None = None,
+        llvm_binary: bytes | None = None,
+        mips_code: str | None = None,
+        stats: dict[str, int] | None = None,
+        return_code: int | None = None,
+        stdout: str | None = None,
+        jit_time: float | None = None,
+        run_time: float | None = None,
+    ) -> None:
+        self.ast: str | None = ast  # dot source of the AST
+        self.symbol_table: str | None = symbol_table
+        self.llvm_code: str | None = llvm_code
+        # Bitcode or native object of --emit bc and obj, llvm_code is None then
+        self.llvm_binary: bytes | None = llvm_binary
+        self.mips_code: str | None = mips_code
+        self.stats: dict[str, int] = stats if stats is not None else {}
+        # Result of running the program with --run, the times are in seconds
+        self.return_code: int | None = return_code
+        self.stdout: str | None = stdout
+        self.jit_time: float | None = jit_time
+        self.run_time: float | None = run_time
+
+    def write(self, options: CompileOptions, input_file: str) -> None:
+        """
+        Write the outputs to the paths given in the options
+        :param options: The compile options
+        :param input_file: Path of the compiled file, used in the statistics
+        :return: None
+        """
+        if options.stats:
+            for name, value in self.stats.items():
+                print(f"{input_file}: {name}: {value}", file=sys.stderr)
+
+        if options.render_ast and self.ast is not None:
+            # graphviz is only needed when the AST is rendered
+            from src.parser.DotExporter import DotExporter
+
+            DotExporter.render(self.ast, options.render_ast)
+
+        if options.render_symb and self.symbol_table is not None:
+            with open(options.render_symb + ".txt", "w") as f:
+                f.write(self.symbol_table)
+
+        if options.target_llvm and self.llvm_code is not None:
+            with open(options.target_llvm, "w") as f:
+                f.write(self.llvm_code)
+        if options.target_llvm and self.llvm_binary is not None:
+            with open(options.target_llvm, "wb") as f:
+                f.write(self.llvm_binary)
+
+        if options.target_mips and self.mips_code is not None:
+            with open(options.target_mips, "w") as f:
+                f.write(self.mips_code)
+
+        if options.run and self.return_code is not None:
+            sys.stdout.write(self.stdout)
+            sys.stdout.flush()
+            print(
+                f"{input_file}: returned {self.return_code}, jit {self.jit_time * 1000:.1f} ms, "
+                f"run {self.run_time * 1000:.1f} ms",
+                file=sys.stderr,
+            )
+
+    def has_llvm(self, options: CompileOptions) -> bool:
+        if options.emit in BINARY_EMITS:
+            return self.llvm_binary is not None
+        return self.llvm_code is not None
+
+    def to_dict(self) -> dict:
+        # JSON has no bytes, the binary output is sent and cached as base64
+        output = dict(vars(self))
+        if self.llvm_binary is not None:
+            output["llvm_binary"] = base64.b64encode(self.llvm_binary).decode("ascii")
+        return output
+
+    @staticmethod
+    def from_dict(output: dict) -> "CompileOutput":
+        output = dict(output)
+        if output.get("llvm_binary") is not None:
+            output["llvm_binary"] = base64.b64decode(output["llvm_binary"])
+        return CompileOutput(**output)
+
+
+class CompileResult:
+    def __init__(self, input_file: str, error: str | None = None) -> None:
+        self.input_file: str = input_file
+        self.error: str | None = error
+
+
+def expand_inputs(inputs: list[str]) -> list[str]:
+    """
+    Expand directories and glob patterns to the C files they contain
+    :param inputs: Files, directories or glob patterns
+    :return: list[str] : The input files
+    """
+    input_files = []
+    for pattern in inputs:
+        if os.path.isdir(pattern):
+            input_files += sorted(glob.glob(os.path.join(pattern, "*.c")))
+        elif glob.has_magic(pattern):
+            input_files += sorted(glob.glob(pattern))
+        else:
+            input_files.append(pattern)
+    return input_files
+
+
+def input_root(input_files: list[str]) -> str | None:
+    """
+    Returns the deepest directory that contains all input files of a batch
+    :param input_files: The input files
+    :return: str | None : The absolute path of the directory, None without input files
+    """
+    if not input_files:
+        return None
+    return os.path.commonpath(
+        [os.path.dirname(os.path.abspath(input_file)) for input_file in input_files]
+    )
+
+
+def is_batch(inputs: list[str]) -> bool:
+    return len(inputs) > 1 or any(
+        os.path.isdir(pattern) or glob.has_magic(pattern) for pattern in inputs
+    )
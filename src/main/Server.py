@@ -0,0 +1,130 @@
+import os
+import socketserver
+import sys
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+from src.main.Client import read_message, write_message
+from src.main.Compiler import Compiler
+from src.main.Options import CompileOptions
+
+if TYPE_CHECKING:
+    from src.main.IncrementalCompiler import IncrementalCompiler
+
+# Amount of files of which the server keeps the incremental compiler, every compiler keeps the AST, symbol table and
+# llvm module of its file
+MAX_INCREMENTAL_FILES = 16
+
+# Program compiled when the server starts, so the lazily built ANTLR DFA and the llvmlite objects are warm
+# before the first real request arrives
+WARM_UP_SOURCE = """
+int x = 1;
+int main() {
+    int y = x + 2 * 3;
+    printf("%d", y);
+    return 0;
+}
+"""
+
+
+class CompileRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        # A connection can send any amount of requests, they are answered in order
+        while True:
+            request = read_message(self.rfile)
+            if request is None:
+                return
+            try:
+                options = CompileOptions.from_dict(request["options"])
+                incremental = None
+                if options.incremental and request.get("input_file"):
+                    incremental = self.server.incremental_compiler(
+                        request["input_file"]
+                    )
+                output = Compiler.compile_source(
+                    request["source"], options, incremental
+                )
+                response = {"error": None, "output": output.to_dict()}
+            except Exception as e:
+                response = {"error": str(e) or e.__class__.__name__, "output": None}
+            write_message(self.wfile, response)
+
+
+class CompileServer(socketserver.UnixStreamServer):
+    """
+    Compile server listening on a Unix domain socket
+    The compiler stays imported and warm between requests. Requests are handled one at a time because the
+    ANTLR prediction caches are shared by all parsers and are not thread safe.
+    """
+
+    def __init__(
+        self, socket_path: str, max_incremental_files: int = MAX_INCREMENTAL_FILES
+    ) -> None:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        super().__init__(socket_path, CompileRequestHandler)
+        self.socket_path: str = socket_path
+        # Incremental compilers of the files last compiled with --incremental by absolute path, least recently
+        # used first
+        self.incremental_compilers: OrderedDict[str, "IncrementalCompiler"] = (
+            OrderedDict()
+        )
+        self.max_incremental_files: int = max_incremental_files
+
+    def incremental_compiler(self, input_file: str) -> "IncrementalCompiler":
+        """
+        Returns the compiler that keeps the statements and passes of the last compilation of a file
+        The compiler of the least recently compiled file is dropped when more than max_incremental_files files
+        have a compiler.
+        :param input_file: Path of the file as given by the client, the client sends absolute paths
+        :return: IncrementalCompiler : The compiler of the file
+        """
+        input_file = os.path.abspath(input_file)
+        compiler = self.incremental_compilers.get(input_file)
+        if compiler is None:
+            # Imported like the parsers, when the first file is parsed
+            from src.main.IncrementalCompiler import IncrementalCompiler
+
+            compiler = self.incremental_compilers[input_file] = IncrementalCompiler()
+            if len(self.incremental_compilers) > self.max_incremental_files:
+                self.incremental_compilers.popitem(last=False)
+        else:
+            self.incremental_compilers.move_to_end(input_file)
+        return compiler
+
+    def warm_up(
+        self,
+        frontend: str = "antlr",
+        lexer: str = "antlr",
+        parse_mode: str = "sll",
+        stream: bool = False,
+    ) -> bool:
+        """
+        Compile a small program, so the first request doesn't pay for building the DFAs and importing llvmlite
+        :param frontend: The front end the server was started with, see CompileOptions
+        :param lexer: The lexer the server was started with
+        :param parse_mode: The parse mode the server was started with
+        :param stream: Whether the server was started with --stream
+        :return: bool : False if the program didn't compile, the server still answers requests
+        """
+        # compile_source returns the outputs, the paths only mark which outputs are requested
+        options = CompileOptions(
+            render_symb="-",
+            target_llvm="-",
+            frontend=frontend,
+            lexer=lexer,
+            parse_mode=parse_mode,
+            stream=stream,
+        )
+        try:
+            Compiler.compile_source(WARM_UP_SOURCE, options)
+        except Exception as e:
+            # Every request has its own options, a request can still use a front end that works
+            print(f"warm-up failed: {str(e) or e.__class__.__name__}", file=sys.stderr)
+            return False
+        return True
+
+    def server_close(self) -> None:
+        super().server_close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
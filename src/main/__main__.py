@@ -1,14 +1,22 @@
 import argparse
-import copy
+import sys
+from typing import NoReturn
 
-from src.parser.Parser import Parser
-from src.parser.DotExporter import DotExporter
-from src.parser.SymbolTable import *
-from src.parser.SemanticAnalyzer import *
-from src.llvm_target.Converter import LlvmConverter
+from src.main.Options import (
+    DEFAULT_CACHE_SIZE,
+    EMIT_EXTENSIONS,
+    CompileOptions,
+    CompileResult,
+    expand_inputs,
+    is_batch,
+)
 
 parser: argparse.ArgumentParser = argparse.ArgumentParser(prog="C-Compiler")
-parser.add_argument("--input", help="input file", required=True)
+parser.add_argument(
+    "--input",
+    help="input file, multiple files, directories or glob patterns compile in batch mode",
+    nargs="+",
+)
 parser.add_argument("--render_ast", help="render AST as dot-file")
 parser.add_argument("--render_symb", help="render symbol table as dot-file")
 parser.add_argument("--target_llvm", help="compile to LLVM")
@@ -19,59 +27,170 @@ parser.add_argument(
 parser.add_argument(
     "--no-const-propagation", help="disable constant propagation", default=False
 )
+parser.add_argument(
+    "--opt-level",
+    help="verify the llvm code and optimize it in process with the pipeline of this level",
+    type=int,
+    choices=(0, 1, 2, 3),
+)
+parser.add_argument(
+    "--passes",
+    help="comma separated llvm passes to run before the pipeline of --opt-level, e.g. mem2reg,instcombine,gvn",
+    type=lambda passes: passes.split(","),
+)
+parser.add_argument(
+    "--emit",
+    help="format of the --target_llvm output: llvm code, bitcode, assembly or an object file of the host",
+    choices=tuple(EMIT_EXTENSIONS),
+    default="ll",
+)
+parser.add_argument(
+    "--ssa",
+    help="keep local variables of which the address is never taken in registers instead of allocas",
+    action="store_true",
+)
+parser.add_argument(
+    "--run",
+    help="compile the program with the llvm JIT and run it in a forked child, the exit code is the return code of main",
+    action="store_true",
+)
+parser.add_argument(
+    "--stats",
+    help="print statistics of the compiler passes",
+    action="store_true",
+)
+parser.add_argument(
+    "--stream",
+    help="parse statement by statement instead of building the parse tree of the whole file",
+    action="store_true",
+)
+parser.add_argument(
+    "--parse-mode",
+    help="prediction mode of the parser, sll is faster and falls back to ll on a syntax error",
+    choices=("ll", "sll"),
+    default="sll",
+)
+parser.add_argument(
+    "--lexer",
+    help="lexer of the parser, fast is a hand-written lexer that produces the same tokens as the antlr lexer",
+    choices=("antlr", "fast"),
+    default="antlr",
+)
+parser.add_argument(
+    "--frontend",
+    help="parser that builds the AST, fast is a hand-written parser that builds the same AST without ANTLR",
+    choices=("antlr", "fast"),
+    default="antlr",
+)
+parser.add_argument(
+    "--incremental",
+    help="with --connect, the server only reparses the statements that changed since it last compiled the file, "
+    "with the fast front end, and only compiles the statements from the first changed one",
+    action="store_true",
+)
+parser.add_argument(
+    "--jobs",
+    help="amount of worker processes in batch mode, defaults to the amount of CPUs",
+    type=int,
+)
+parser.add_argument(
+    "--cache-dir",
+    help="reuse the outputs of earlier compilations stored in this directory",
+)
+parser.add_argument(
+    "--cache-size",
+    help="maximum size of the compilation cache in MB, least recently used entries are evicted first",
+    type=int,
+    default=DEFAULT_CACHE_SIZE // (1024 * 1024),
+)
+parser.add_argument(
+    "--server", help="run a compile server listening on the given unix socket"
+)
+parser.add_argument(
+    "--connect", help="let the compile server on the given unix socket compile"
+)
+
+
+def print_summary(results: list[CompileResult]) -> None:
+    failures = [result for result in results if result.error is not None]
+    for failure in failures:
+        print(f"{failure.input_file}: {failure.error}", file=sys.stderr)
+    print(
+        f"Compiled {len(results) - len(failures)}/{len(results)} files, {len(failures)} failed",
+        file=sys.stderr,
+    )
+    sys.exit(1 if failures else 0)
+
+
+def fail(input_file: str, error: Exception) -> NoReturn:
+    # Reported like a failed file of a batch, e.g. a program that crashed with --run
+    print(f"{input_file}: {str(error) or error.__class__.__name__}", file=sys.stderr)
+    sys.exit(1)
+
 
 if __name__ == "__main__":
     args = parser.parse_args()
 
-    input_file = args.input
-    ast_file = args.render_ast
-    symb_file = args.render_symb
-    target_llvm = args.target_llvm
-    target_mips = args.target_mips
-    no_const_folding = args.no_const_folding
-    no_const_propagation = args.no_const_propagation
-
-    # Generate AST
-    ast: TreeNode = Parser.parse(input_file)
-    # Generate symbol table
-    symbol_table: SymbolTable = SymbolTable()
-    symbol_table.build_symbol_table(ast)
-    # Constant folding and propagation
-    if not no_const_folding:
-        Parser.const_folding(ast)
-    if not no_const_propagation:
-        Parser.const_prop(ast, symbol_table)
-    if not no_const_folding and not no_const_propagation:
-        changed = True
-        while changed:
-            changed = Parser.const_folding(ast)
-            changed = Parser.const_prop(ast, symbol_table)
-    # Analyze semantic
-    """
-    semantic_errors, warnings = SemanticAnalyzer.analyze(ast, symbol_table)
-    for error in semantic_errors:
-        print(error)
-    for warning in warnings:
-        print(warning)
-    if semantic_errors:
-        quit(-1)
-    """
-
-    if ast_file:
-        DotExporter.export(ast, ast_file)
-
-    if symb_file:
-        with open(symb_file + ".txt", "w") as f:
-            f.write(str(symbol_table))
-
-    if target_llvm:
-        # Generate llvm target
-        converter = LlvmConverter(symbol_table, input_file)
-        converter.convert(ast)
-
-        with open(target_llvm, "w") as f:
-            f.write(converter.return_llvm_code())
-
-    if target_mips:
-        # TODO: Implement MIPS compiler
-        pass
+    if args.server:
+        from src.main.Server import CompileServer
+
+        with CompileServer(args.server) as server:
+            server.warm_up(args.frontend, args.lexer, args.parse_mode, args.stream)
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+        sys.exit(0)
+
+    if not args.input:
+        parser.error("the following arguments are required: --input")
+
+    options = CompileOptions(
+        render_ast=args.render_ast,
+        render_symb=args.render_symb,
+        target_llvm=args.target_llvm,
+        target_mips=args.target_mips,
+        no_const_folding=args.no_const_folding,
+        no_const_propagation=args.no_const_propagation,
+        cache_dir=args.cache_dir,
+        cache_size=args.cache_size * 1024 * 1024,
+        stats=args.stats,
+        stream=args.stream,
+        parse_mode=args.parse_mode,
+        lexer=args.lexer,
+        frontend=args.frontend,
+        incremental=args.incremental,
+        opt_level=args.opt_level,
+        passes=args.passes,
+        run=args.run,
+        emit=args.emit,
+        ssa=args.ssa,
+    )
+
+    if args.connect:
+        # Thin client, the compiler itself is not imported
+        from src.main.Client import CompileClient
+
+        client = CompileClient(args.connect)
+        try:
+            if not is_batch(args.input):
+                try:
+                    output = client.compile(args.input[0], options)
+                except Exception as e:
+                    fail(args.input[0], e)
+                sys.exit(output.return_code or 0)
+            print_summary(client.compile_batch(expand_inputs(args.input), options))
+        finally:
+            client.close()
+
+    from src.main.Compiler import Compiler
+
+    if not is_batch(args.input):
+        try:
+            output = Compiler.compile(args.input[0], options)
+        except Exception as e:
+            fail(args.input[0], e)
+        sys.exit(output.return_code or 0)
+
+    # Batch mode: the output options are directories
+    print_summary(Compiler.compile_batch(expand_inputs(args.input), options, args.jobs))
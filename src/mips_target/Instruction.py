@@ -0,0 +1,59 @@
+class VirtualRegister:
+    """
+    A register of the generated code before register allocation, there is no limit on the amount of them
+    Locals that stay in registers have one virtual register for their whole lifetime, every other value gets a new
+    one.
+    """
+
+    __slots__ = ("number", "is_float", "variable", "defined_at")
+
+    def __init__(
+        self, number: int, is_float: bool = False, variable: bool = False
+    ) -> None:
+        self.number: int = number
+        # Floats live in the registers of coprocessor 1
+        self.is_float: bool = is_float
+        self.variable: bool = variable
+        # Index of the first instruction that mentions the register
+        self.defined_at: int = -1
+
+    def __repr__(self) -> str:
+        return f"%{'f' if self.is_float else 'r'}{self.number}"
+
+
+class Instruction:
+    """
+    One line of MIPS assembly with virtual registers
+    The template is formatted with {d0} for the defined register and {u0}, {u1}, ... for the used registers, the
+    register allocator fills in the physical registers. Physical registers like $sp or $a0 are written in the template.
+    """
+
+    __slots__ = ("template", "defs", "uses")
+
+    def __init__(
+        self,
+        template: str,
+        defs: list[VirtualRegister] | None = None,
+        uses: list[VirtualRegister] | None = None,
+    ) -> None:
+        self.template: str = template
+        self.defs: list[VirtualRegister] = defs if defs is not None else []
+        self.uses: list[VirtualRegister] = uses if uses is not None else []
+
+    @staticmethod
+    def comment(text: str) -> "Instruction":
+        return Instruction("# " + text.replace("{", "{{").replace("}", "}}"))
+
+    def render(self, registers: dict[VirtualRegister, str]) -> str:
+        """
+        Returns the assembly of the instruction
+        :param registers: The physical register of every virtual register of the instruction
+        :return: str : The line of assembly
+        """
+        operands = {
+            f"d{i}": registers[register] for i, register in enumerate(self.defs)
+        }
+        operands.update(
+            (f"u{i}", registers[register]) for i, register in enumerate(self.uses)
+        )
+        return self.template.format(**operands)
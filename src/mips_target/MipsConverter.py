@@ -0,0 +1,833 @@
+import re
+
+from src.mips_target.Instruction import Instruction, VirtualRegister
+from src.mips_target.RegisterAllocator import LinearScanAllocator
+from src.parser.SourceBuffer import SourceBuffer
+from src.parser.SymbolTable import SymbolTable, SymbolTableEntry, SymbolTableEntryType
+from src.parser.TreeNode import *
+from src.parser.Walker import SKIP_CHILDREN, walk
+
+# Syscalls of MARS and SPIM
+PRINT_INT = 1
+PRINT_FLOAT = 2
+PRINT_STRING = 4
+PRINT_CHAR = 11
+EXIT = 17  # exit2, exits with the code in $a0
+
+# A conversion of a printf format string, flags, width, precision and length are accepted and ignored
+FORMAT_CONVERSION = re.compile(r"%[-+ #0]*\d*(?:\.\d+)?[hl]*([dicfs%])")
+
+TYPE_NAMES: dict[str, SymbolTableEntryType] = {
+    "int": SymbolTableEntryType.Int,
+    "float": SymbolTableEntryType.Float,
+    "char": SymbolTableEntryType.Char,
+    "bool": SymbolTableEntryType.Bool,
+}
+
+# Integer operators with one instruction
+INT_TEMPLATES: dict[NodeKind, str] = {
+    NodeKind.Plus: "addu {d0}, {u0}, {u1}",
+    NodeKind.Minus: "subu {d0}, {u0}, {u1}",
+    NodeKind.Mult: "mul {d0}, {u0}, {u1}",
+    NodeKind.BitAnd: "and {d0}, {u0}, {u1}",
+    NodeKind.BitOr: "or {d0}, {u0}, {u1}",
+    NodeKind.BitXor: "xor {d0}, {u0}, {u1}",
+    NodeKind.LShift: "sllv {d0}, {u0}, {u1}",
+    NodeKind.RShift: "srav {d0}, {u0}, {u1}",
+    NodeKind.Lt: "slt {d0}, {u0}, {u1}",
+    NodeKind.Gt: "slt {d0}, {u1}, {u0}",
+}
+
+# Integer operators with a second instruction that only reads the result of the first one
+INT_TWO_TEMPLATES: dict[NodeKind, tuple[str, str]] = {
+    NodeKind.Leq: ("slt {d0}, {u1}, {u0}", "xori {d0}, {u0}, 1"),
+    NodeKind.Geq: ("slt {d0}, {u0}, {u1}", "xori {d0}, {u0}, 1"),
+    NodeKind.Equal: ("xor {d0}, {u0}, {u1}", "sltiu {d0}, {u0}, 1"),
+    NodeKind.Eq: ("xor {d0}, {u0}, {u1}", "sltiu {d0}, {u0}, 1"),
+    NodeKind.Neq: ("xor {d0}, {u0}, {u1}", "sltu {d0}, $zero, {u0}"),
+    NodeKind.Or: ("or {d0}, {u0}, {u1}", "sltu {d0}, $zero, {u0}"),
+}
+
+# Integer operators with an immediate form, with the range of the immediate
+IMMEDIATE_TEMPLATES: dict[NodeKind, tuple[str, int, int]] = {
+    NodeKind.Plus: ("addiu {d0}, {u0}, %d", -32768, 32767),
+    NodeKind.Minus: ("addiu {d0}, {u0}, %d", -32767, 32768),  # adds the negated value
+    NodeKind.LShift: ("sll {d0}, {u0}, %d", 0, 31),
+    NodeKind.RShift: ("sra {d0}, {u0}, %d", 0, 31),
+    NodeKind.Lt: ("slti {d0}, {u0}, %d", -32768, 32767),
+    NodeKind.BitAnd: ("andi {d0}, {u0}, %d", 0, 65535),
+    NodeKind.BitOr: ("ori {d0}, {u0}, %d", 0, 65535),
+    NodeKind.BitXor: ("xori {d0}, {u0}, %d", 0, 65535),
+}
+
+FLOAT_TEMPLATES: dict[NodeKind, str] = {
+    NodeKind.Plus: "add.s {d0}, {u0}, {u1}",
+    NodeKind.Minus: "sub.s {d0}, {u0}, {u1}",
+    NodeKind.Mult: "mul.s {d0}, {u0}, {u1}",
+    NodeKind.Div: "div.s {d0}, {u0}, {u1}",
+}
+
+# Float comparisons set the condition flag, with the instruction that clears the result when the comparison is false
+FLOAT_COMPARISONS: dict[NodeKind, tuple[str, str]] = {
+    NodeKind.Lt: ("c.lt.s {u0}, {u1}", "movf"),
+    NodeKind.Gt: ("c.lt.s {u1}, {u0}", "movf"),
+    NodeKind.Leq: ("c.le.s {u0}, {u1}", "movf"),
+    NodeKind.Geq: ("c.le.s {u1}, {u0}", "movf"),
+    NodeKind.Equal: ("c.eq.s {u0}, {u1}", "movf"),
+    NodeKind.Eq: ("c.eq.s {u0}, {u1}", "movf"),
+    NodeKind.Neq: ("c.eq.s {u0}, {u1}", "movt"),
+}
+
+BINARY_KINDS: set[NodeKind] = {
+    NodeKind.Plus,
+    NodeKind.Minus,
+    NodeKind.Mult,
+    NodeKind.Div,
+    NodeKind.Mod,
+    NodeKind.LShift,
+    NodeKind.RShift,
+    NodeKind.BitAnd,
+    NodeKind.BitOr,
+    NodeKind.BitXor,
+    NodeKind.Equal,
+    NodeKind.Eq,
+    NodeKind.Neq,
+    NodeKind.Lt,
+    NodeKind.Gt,
+    NodeKind.Leq,
+    NodeKind.Geq,
+    NodeKind.And,
+    NodeKind.Or,
+}
+
+BOOL_KINDS: set[NodeKind] = {
+    NodeKind.Equal,
+    NodeKind.Eq,
+    NodeKind.Neq,
+    NodeKind.Lt,
+    NodeKind.Gt,
+    NodeKind.Leq,
+    NodeKind.Geq,
+    NodeKind.And,
+    NodeKind.Or,
+    NodeKind.Not,
+}
+
+# The register, type and pointer depth of a converted expression
+Value = tuple[VirtualRegister, SymbolTableEntryType, int]
+
+
+class Variable:
+    """
+    Where a variable lives: in a register, in a stack slot of main when its address is taken, or in the data segment
+    """
+
+    __slots__ = ("type", "pointer_depth", "register", "offset", "label")
+
+    def __init__(self, type: SymbolTableEntryType, pointer_depth: int) -> None:
+        self.type: SymbolTableEntryType = type
+        self.pointer_depth: int = pointer_depth
+        self.register: VirtualRegister | None = None
+        self.offset: int | None = None
+        self.label: str | None = None
+
+    @property
+    def is_float(self) -> bool:
+        return self.type == SymbolTableEntryType.Float and self.pointer_depth == 0
+
+
+class MipsConverter:
+    def __init__(
+        self,
+        symbol_table: SymbolTable,
+        source: str | SourceBuffer,
+        allocator: LinearScanAllocator | None = None,
+    ) -> None:
+        self.symbol_table: SymbolTable = symbol_table
+        # The source lines are sliced from the buffer when they are commented
+        if not isinstance(source, SourceBuffer):
+            source = SourceBuffer.from_string(source)
+        self.source: SourceBuffer = source
+        self.allocator: LinearScanAllocator = allocator or LinearScanAllocator()
+
+        # Code of main with virtual registers, and the data segment
+        self.instructions: list[Instruction] = []
+        self.data: list[str] = []
+        # Labels of the strings and float constants in the data segment, equal values share a label
+        self.strings: dict[str, str] = {}
+        self.floats: dict[float, str] = {}
+
+        self.variables: dict[SymbolTableEntry, Variable] = {}
+        self.address_taken: set[SymbolTableEntry] = set()
+        # Bytes of the stack slots of the variables of which the address is taken
+        self.frame_size: int = 0
+        self.register_count: int = 0
+        self.in_main: bool = False
+        # True when the last instruction exits the program
+        self.terminated: bool = False
+        self.commented_lines: set[int] = set()
+
+    def register(
+        self, is_float: bool = False, variable: bool = False
+    ) -> VirtualRegister:
+        self.register_count += 1
+        return VirtualRegister(self.register_count, is_float, variable)
+
+    def emit(
+        self,
+        template: str,
+        defs: list[VirtualRegister] | None = None,
+        uses: list[VirtualRegister] | None = None,
+    ) -> None:
+        instruction = Instruction(template, defs, uses)
+        for register in instruction.defs + instruction.uses:
+            if register.defined_at == -1:
+                register.defined_at = len(self.instructions)
+        self.instructions.append(instruction)
+        self.terminated = False
+
+    def add_statement_comment(self, node: TreeNode) -> None:
+        if not self.in_main or node.line_nr is None or node.line_nr < 0:
+            return
+        if node.line_nr in self.commented_lines:
+            return
+        self.commented_lines.add(node.line_nr)
+        line = self.source.line(node.line_nr).strip()
+        self.instructions.append(Instruction.comment(f"Line {node.line_nr}: {line}"))
+
+    def string_label(self, text: str) -> str:
+        """
+        Returns the label of a string in the data segment
+        :param text: The string as it is written in C, escape sequences are kept
+        :return: str : The label
+        """
+        label = self.strings.get(text)
+        if label is None:
+            label = self.strings[text] = f"str{len(self.strings)}"
+            self.data.append(f'{label}: .asciiz "{text}"')
+        return label
+
+    def float_label(self, value: float) -> str:
+        # MIPS has no immediate floats, float constants are loaded from the data segment
+        label = self.floats.get(value)
+        if label is None:
+            label = self.floats[value] = f"float{len(self.floats)}"
+            self.data.append(f"{label}: .float {value!r}")
+        return label
+
+    def convert(self, node: TreeNode) -> None:
+        """
+        Convert the AST to MIPS code, always give the root of the AST to this function
+        MIPS code can be retrieved by calling return_mips_code() afterwards
+        :param node: The root of the AST
+        :return: None
+        """
+        # Variables used with & live in memory, all other locals of main are kept in registers
+        walk(
+            node,
+            enter={
+                AddressNode: lambda address: self.address_taken.add(
+                    self.symbol_table.lookup(address.children[0])
+                )
+            },
+        )
+        walk(
+            node,
+            enter={
+                MainNode: self.convert_main,
+                NewVariableNode: self.convert_new_variable,
+                AssignNode: self.convert_assignment,
+                PrintfNode: self.convert_printf,
+                ReturnNode: self.convert_return,
+                CommentNode: self.convert_comment,
+                TreeNode: self.add_statement_comment,
+            },
+        )
+        # Like in C, main returns 0 when it reaches its end without a return
+        if not self.terminated:
+            self.emit("li $a0, 0")
+            self.syscall(EXIT)
+
+    def convert_main(self, node: MainNode) -> object:
+        self.in_main = True
+        self.add_statement_comment(node)
+
+    def convert_comment(self, node: CommentNode) -> object:
+        if not self.in_main:
+            return SKIP_CHILDREN
+        for comment_line in node.value[2:].split("\n"):
+            if comment_line.strip() == "*/" or comment_line == "":
+                continue
+            self.instructions.append(Instruction.comment(comment_line))
+        return SKIP_CHILDREN
+
+    def convert_new_variable(self, node: NewVariableNode) -> object:
+        self.add_statement_comment(node)
+        type_idx = 1 if isinstance(node.children[0], ConstNode) else 0
+        id_node = node.children[type_idx + 1]
+        pointer_depth = 0
+        if isinstance(
+            id_node,
+            (IntPointerNode, FloatPointerNode, CharPointerNode, BoolPointerNode),
+        ):
+            pointer_depth = id_node.depth
+            id_node = id_node.children[0]
+        # An explicit conversion is a type between the id and the value, e.g. int a = (int) 5.0;
+        conversion = None
+        value_node = node.children[type_idx + 2]
+        if isinstance(value_node, TypeNode):
+            conversion = TYPE_NAMES[value_node.value]
+            value_node = node.children[type_idx + 3]
+
+        entry = self.symbol_table.lookup(id_node)
+        variable = self.variables[entry] = Variable(entry.type, pointer_depth)
+
+        if not self.in_main:
+            variable.label = f"global_{entry.name}"
+            self.data.append(
+                f"{variable.label}: {self.global_initializer(value_node, variable)}"
+            )
+            return SKIP_CHILDREN
+
+        value = self.expression(value_node)
+        if conversion is not None:
+            value = self.convert_value(value, conversion)
+        if entry in self.address_taken:
+            variable.offset = self.frame_size
+            self.frame_size += 4
+        else:
+            variable.register = self.register(variable.is_float, variable=True)
+        self.write_variable(variable, value)
+        return SKIP_CHILDREN
+
+    def global_initializer(self, node: TreeNode, variable: Variable) -> str:
+        match node:
+            case IntNode():
+                if variable.is_float:
+                    return f".float {float(node.value)!r}"
+                return f".word {int(node.value)}"
+            case FloatNode():
+                if variable.is_float:
+                    return f".float {float(node.value)!r}"
+                return f".word {int(float(node.value))}"
+            case CharNode():
+                return f".word {self.char_value(node)}"
+            case BoolNode():
+                return f".word {int(node.value == 'true')}"
+            case AddressNode():
+                return f".word {self.variables[self.symbol_table.lookup(node.children[0])].label}"
+            case _:
+                raise Exception(f"Global variables need a constant value: {node}")
+
+    def convert_assignment(self, node: AssignNode) -> object:
+        self.add_statement_comment(node)
+        self.assign(node)
+        return SKIP_CHILDREN
+
+    def assign(self, node: AssignNode) -> Value:
+        """
+        Convert an assignment, also when it is used as a value like in int a = b++;
+        :param node: The AssignNode
+        :return: Value : The assigned value
+        """
+        target = node.children[0]
+        value_node = node.children[1]
+        conversion = None
+        if isinstance(value_node, TypeNode):
+            conversion = TYPE_NAMES[value_node.value]
+            value_node = node.children[2]
+        value = self.expression(value_node)
+        if conversion is not None:
+            value = self.convert_value(value, conversion)
+
+        if isinstance(target, PointerNode):
+            address, pointee_type, pointee_depth = self.dereference(
+                target, self.expression(target.children[0])
+            )
+            value = self.convert_value(value, pointee_type, pointee_depth)
+            store = "s.s" if value[0].is_float else "sw"
+            self.emit(f"{store} {{u0}}, 0({{u1}})", uses=[value[0], address])
+            return value
+
+        variable = self.variables[self.symbol_table.lookup(target)]
+        return self.write_variable(variable, value)
+
+    def write_variable(self, variable: Variable, value: Value) -> Value:
+        value = self.convert_value(value, variable.type, variable.pointer_depth)
+        register = value[0]
+        if variable.register is not None:
+            last = self.instructions[-1] if self.instructions else None
+            if (
+                not register.variable
+                and register.defined_at == len(self.instructions) - 1
+                and last.defs == [register]
+                and register not in last.uses
+            ):
+                # The value was just computed, compute it in the register of the variable instead of copying it
+                last.defs = [variable.register]
+                if variable.register.defined_at == -1:
+                    variable.register.defined_at = len(self.instructions) - 1
+            else:
+                move = "mov.s" if register.is_float else "move"
+                self.emit(f"{move} {{d0}}, {{u0}}", [variable.register], [register])
+            return variable.register, value[1], value[2]
+
+        store = "s.s" if register.is_float else "sw"
+        if variable.label is not None:
+            self.emit(f"{store} {{u0}}, {variable.label}", uses=[register])
+        else:
+            self.emit(f"{store} {{u0}}, {variable.offset}($sp)", uses=[register])
+        return value
+
+    def read_variable(self, variable: Variable) -> Value:
+        if variable.register is not None:
+            return variable.register, variable.type, variable.pointer_depth
+        register = self.register(variable.is_float)
+        load = "l.s" if variable.is_float else "lw"
+        if variable.label is not None:
+            self.emit(f"{load} {{d0}}, {variable.label}", [register])
+        else:
+            self.emit(f"{load} {{d0}}, {variable.offset}($sp)", [register])
+        return register, variable.type, variable.pointer_depth
+
+    def dereference(self, node: PointerNode, pointer: Value) -> Value:
+        """
+        Returns the address a dereference reads or writes
+        :param node: The PointerNode, e.g. **p
+        :param pointer: The value of the dereferenced pointer
+        :return: Value : The address, the type and the pointer depth of the value at the address
+        """
+        register, entry_type, depth = pointer
+        for _ in range(node.depth - 1):
+            pointee = self.register()
+            self.emit("lw {d0}, 0({u0})", [pointee], [register])
+            register = pointee
+        return register, entry_type, depth - node.depth
+
+    def constant(self, value: int) -> Value:
+        register = self.register()
+        self.emit(f"li {{d0}}, {value}", [register])
+        return register, SymbolTableEntryType.Int, 0
+
+    def float_constant(self, value: float) -> Value:
+        register = self.register(is_float=True)
+        self.emit(f"l.s {{d0}}, {self.float_label(value)}", [register])
+        return register, SymbolTableEntryType.Float, 0
+
+    @staticmethod
+    def char_value(node: CharNode) -> int:
+        text = node.value[1:-1]
+        if text.startswith("\\"):
+            # escape character e.g. '\\n'
+            text = text.encode("utf-8").decode("unicode_escape")
+        return ord(text)
+
+    def convert_value(
+        self, value: Value, to_type: SymbolTableEntryType, to_depth: int = 0
+    ) -> Value:
+        """
+        Convert a value to another type, like an explicit conversion or an assignment in C does
+        :param value: The value to convert
+        :param to_type: The type to convert to
+        :param to_depth: The pointer depth to convert to, pointers are not converted
+        :return: Value : The converted value
+        """
+        register, from_type, from_depth = value
+        if to_depth > 0 or from_depth > 0:
+            return register, to_type, to_depth
+        if from_type == to_type:
+            return value
+
+        if to_type == SymbolTableEntryType.Float:
+            converted = self.register(is_float=True)
+            self.emit("mtc1 {u0}, {d0}", [converted], [register])
+            self.emit("cvt.s.w {d0}, {u0}", [converted], [converted])
+            return converted, to_type, 0
+
+        if register.is_float:
+            if to_type == SymbolTableEntryType.Bool:
+                zero = self.register(is_float=True)
+                self.emit("mtc1 $zero, {d0}", [zero])
+                return self.float_comparison(
+                    NodeKind.Neq, register, zero, SymbolTableEntryType.Bool
+                )
+            truncated = self.register(is_float=True)
+            self.emit("trunc.w.s {d0}, {u0}", [truncated], [register])
+            register = self.register()
+            self.emit("mfc1 {d0}, {u0}", [register], [truncated])
+            from_type = SymbolTableEntryType.Int
+
+        converted = self.register()
+        if (
+            to_type == SymbolTableEntryType.Char
+            and from_type != SymbolTableEntryType.Bool
+        ):
+            self.emit("sll {d0}, {u0}, 24", [converted], [register])
+            self.emit("sra {d0}, {u0}, 24", [converted], [converted])
+        elif to_type == SymbolTableEntryType.Bool:
+            self.emit("sltu {d0}, $zero, {u0}", [converted], [register])
+        else:
+            # chars and bools are already ints
+            return register, to_type, 0
+        return converted, to_type, 0
+
+    def float_comparison(
+        self,
+        kind: NodeKind,
+        left: VirtualRegister,
+        right: VirtualRegister,
+        result_type: SymbolTableEntryType,
+    ) -> Value:
+        compare, clear = FLOAT_COMPARISONS[kind]
+        result = self.register()
+        self.emit(compare, uses=[left, right])
+        self.emit("li {d0}, 1", [result])
+        self.emit(f"{clear} {{d0}}, $zero", [result], [result])
+        return result, result_type, 0
+
+    def operands(self, node: TreeNode) -> list[TreeNode]:
+        """
+        Returns the children of an expression node that are converted to registers before the node
+        :param node: The expression node
+        :return: list[TreeNode] : The operands, an empty list for nodes that are converted on their own
+        """
+        if node.kind in BINARY_KINDS:
+            if self.immediate(node) is not None:
+                return [node.children[0]]
+            return node.children
+        match node:
+            case NotNode() | BitNotNode() | UnaryMinusNode() | UnaryPlusNode():
+                return [node.children[0]]
+            case ExprNode():
+                # -a is an expression of a MinusNode without children and the operand
+                return [node.children[-1]]
+            case ConvertNode():
+                return [node.children[1]]
+            case PointerNode():
+                return [node.children[0]]
+        return []
+
+    @staticmethod
+    def immediate(node: TreeNode) -> int | None:
+        """
+        Returns the value of the right operand of an operator if it fits in the immediate of the instruction
+        :param node: The operator
+        :return: int | None : The value, None if the operand has to be converted to a register
+        """
+        template = IMMEDIATE_TEMPLATES.get(node.kind)
+        right = node.children[1]
+        if template is None or not isinstance(right, IntNode):
+            return None
+        value = int(right.value)
+        if not template[1] <= value <= template[2]:
+            return None
+        return value
+
+    def labels(self, root: TreeNode) -> tuple[dict[TreeNode, int], set[TreeNode]]:
+        """
+        Sethi-Ullman numbering of an expression tree
+        The label of a node is the amount of registers needed to convert it without spilling. Converting the operand
+        with the highest label first keeps that amount as low as possible.
+        :param root: The root of the expression
+        :return: tuple[dict[TreeNode, int], set[TreeNode]] : The labels, and the nodes that contain an assignment
+        """
+        labels: dict[TreeNode, int] = {}
+        effects: set[TreeNode] = set()
+        # Post order with an explicit stack, a long chain of additions nests as deep as it is long
+        stack: list[tuple[TreeNode, bool]] = [(root, False)]
+        while stack:
+            node, finished = stack.pop()
+            operands = self.operands(node)
+            if not finished and operands:
+                stack.append((node, True))
+                stack.extend((operand, False) for operand in operands)
+                continue
+            if isinstance(node, AssignNode) or any(
+                operand in effects for operand in operands
+            ):
+                effects.add(node)
+            if len(operands) == 2:
+                left, right = labels[operands[0]], labels[operands[1]]
+                labels[node] = left + 1 if left == right else max(left, right)
+            elif operands:
+                labels[node] = labels[operands[0]]
+            else:
+                labels[node] = 1
+        return labels, effects
+
+    def expression(self, root: TreeNode) -> Value:
+        """
+        Convert an expression to a register
+        Operands are converted bottom up with an explicit stack, the operand that needs the most registers first
+        unless one of them assigns a variable.
+        :param root: The root of the expression
+        :return: Value : The value of the expression
+        """
+        labels, effects = self.labels(root)
+        values: dict[TreeNode, Value] = {}
+        stack: list[tuple[TreeNode, bool]] = [(root, False)]
+        while stack:
+            node, finished = stack.pop()
+            operands = self.operands(node)
+            if finished or not operands:
+                values[node] = self.operation(
+                    node, [values.pop(operand) for operand in operands]
+                )
+                continue
+            stack.append((node, True))
+            order = operands
+            if (
+                len(operands) == 2
+                and labels[operands[1]] > labels[operands[0]]
+                and not (operands[0] in effects or operands[1] in effects)
+            ):
+                order = [operands[1], operands[0]]
+            stack.extend((operand, False) for operand in reversed(order))
+        return values[root]
+
+    def operation(self, node: TreeNode, operands: list[Value]) -> Value:
+        """
+        Convert one node of an expression of which the operands are converted
+        :param node: The node
+        :param operands: The values of the operands of the node
+        :return: Value : The value of the node
+        """
+        match node:
+            case IntNode():
+                return self.constant(int(node.value))
+            case FloatNode():
+                return self.float_constant(float(node.value))
+            case CharNode():
+                register, _, _ = self.constant(self.char_value(node))
+                return register, SymbolTableEntryType.Char, 0
+            case BoolNode():
+                register, _, _ = self.constant(int(node.value == "true"))
+                return register, SymbolTableEntryType.Bool, 0
+            case StringNode():
+                register = self.register()
+                self.emit(
+                    f"la {{d0}}, {self.string_label(node.value[1:-1])}", [register]
+                )
+                return register, SymbolTableEntryType.String, 0
+            case IdNode():
+                return self.read_variable(
+                    self.variables[self.symbol_table.lookup(node)]
+                )
+            case AddressNode():
+                variable = self.variables[self.symbol_table.lookup(node.children[0])]
+                register = self.register()
+                if variable.label is not None:
+                    self.emit(f"la {{d0}}, {variable.label}", [register])
+                else:
+                    self.emit(f"addiu {{d0}}, $sp, {variable.offset}", [register])
+                return register, variable.type, variable.pointer_depth + 1
+            case AssignNode():
+                return self.assign(node)
+            case PointerNode():
+                address, entry_type, pointee_depth = self.dereference(node, operands[0])
+                is_float = (
+                    entry_type == SymbolTableEntryType.Float and pointee_depth == 0
+                )
+                register = self.register(is_float)
+                self.emit(
+                    f"{'l.s' if is_float else 'lw'} {{d0}}, 0({{u0}})",
+                    [register],
+                    [address],
+                )
+                return register, entry_type, pointee_depth
+            case ConvertNode():
+                return self.convert_value(
+                    operands[0], TYPE_NAMES[node.children[0].value]
+                )
+            case ExprNode() | UnaryMinusNode() | UnaryPlusNode():
+                if isinstance(node, UnaryMinusNode) or (
+                    isinstance(node, ExprNode)
+                    and isinstance(node.children[0], MinusNode)
+                ):
+                    return self.negate(operands[0])
+                return operands[0]
+            case NotNode():
+                register = self.register()
+                value = self.convert_value(operands[0], SymbolTableEntryType.Bool)
+                self.emit("sltiu {d0}, {u0}, 1", [register], [value[0]])
+                return register, SymbolTableEntryType.Bool, 0
+            case BitNotNode():
+                register = self.register()
+                value = self.convert_value(operands[0], SymbolTableEntryType.Int)
+                self.emit("nor {d0}, {u0}, $zero", [register], [value[0]])
+                return register, SymbolTableEntryType.Int, 0
+        if node.kind in BINARY_KINDS:
+            return self.binary(node, operands)
+        raise Exception(f"Unknown type: {node}")
+
+    def negate(self, value: Value) -> Value:
+        register = self.register(value[0].is_float)
+        if value[0].is_float:
+            self.emit("neg.s {d0}, {u0}", [register], [value[0]])
+        else:
+            self.emit("subu {d0}, $zero, {u0}", [register], [value[0]])
+        return register, value[1], value[2]
+
+    def binary(self, node: TreeNode, operands: list[Value]) -> Value:
+        left = operands[0]
+        immediate = self.immediate(node)
+        if immediate is not None:
+            if left[0].is_float:
+                # The immediate of a float operator is a float constant
+                right = self.float_constant(float(immediate))
+            elif left[2] > 0 and node.kind in (NodeKind.Plus, NodeKind.Minus):
+                # Pointer arithmetic, pointers point to words
+                return self.pointer_arithmetic(node, left, self.constant(immediate))
+            else:
+                return self.immediate_operation(node, left, immediate)
+        else:
+            right = operands[1]
+
+        if node.kind in (NodeKind.And, NodeKind.Or):
+            left = self.convert_value(left, SymbolTableEntryType.Bool)
+            right = self.convert_value(right, SymbolTableEntryType.Bool)
+        if left[2] > 0 and node.kind in (NodeKind.Plus, NodeKind.Minus):
+            return self.pointer_arithmetic(node, left, right)
+
+        is_float = left[0].is_float or right[0].is_float
+        result_type = (
+            SymbolTableEntryType.Bool
+            if node.kind in BOOL_KINDS
+            else SymbolTableEntryType.Float if is_float else SymbolTableEntryType.Int
+        )
+        if is_float:
+            left = self.convert_value(left, SymbolTableEntryType.Float)
+            right = self.convert_value(right, SymbolTableEntryType.Float)
+            if node.kind in FLOAT_COMPARISONS:
+                return self.float_comparison(node.kind, left[0], right[0], result_type)
+            template = FLOAT_TEMPLATES.get(node.kind)
+            if template is None:
+                raise Exception(f"Invalid operator for floats: {node}")
+            register = self.register(is_float=True)
+            self.emit(template, [register], [left[0], right[0]])
+            return register, result_type, 0
+
+        register = self.register()
+        if node.kind in INT_TEMPLATES:
+            self.emit(INT_TEMPLATES[node.kind], [register], [left[0], right[0]])
+        elif node.kind in INT_TWO_TEMPLATES:
+            first, second = INT_TWO_TEMPLATES[node.kind]
+            self.emit(first, [register], [left[0], right[0]])
+            self.emit(second, [register], [register])
+        elif node.kind in (NodeKind.Div, NodeKind.Mod):
+            self.emit("div {u0}, {u1}", uses=[left[0], right[0]])
+            self.emit(
+                f"{'mflo' if node.kind == NodeKind.Div else 'mfhi'} {{d0}}", [register]
+            )
+        elif node.kind == NodeKind.And:
+            # The result is the first operand as a bool, cleared when the second operand is 0
+            self.emit("sltu {d0}, $zero, {u0}", [register], [left[0]])
+            self.emit("movz {d0}, $zero, {u1}", [register], [register, right[0]])
+        else:
+            raise Exception(f"Unknown type: {node}")
+        return register, result_type, 0
+
+    def immediate_operation(self, node: TreeNode, left: Value, immediate: int) -> Value:
+        template = IMMEDIATE_TEMPLATES[node.kind][0]
+        if node.kind == NodeKind.Minus:
+            immediate = -immediate
+        register = self.register()
+        self.emit(template % immediate, [register], [left[0]])
+        result_type = (
+            SymbolTableEntryType.Bool
+            if node.kind in BOOL_KINDS
+            else SymbolTableEntryType.Int
+        )
+        return register, result_type, 0
+
+    def pointer_arithmetic(
+        self, node: TreeNode, pointer: Value, offset: Value
+    ) -> Value:
+        scaled = self.register()
+        self.emit("sll {d0}, {u0}, 2", [scaled], [offset[0]])
+        register = self.register()
+        operation = "addu" if node.kind == NodeKind.Plus else "subu"
+        self.emit(
+            f"{operation} {{d0}}, {{u0}}, {{u1}}", [register], [pointer[0], scaled]
+        )
+        return register, pointer[1], pointer[2]
+
+    def convert_printf(self, node: PrintfNode) -> object:
+        self.add_statement_comment(node)
+        # The arguments are evaluated before anything is printed, string literals are printed from their label
+        arguments = [
+            child if isinstance(child, StringNode) else self.expression(child)
+            for child in node.children[1:]
+        ]
+        format_string = node.children[0].value[1:-1]
+        text = ""
+        position = 0
+        for conversion in FORMAT_CONVERSION.finditer(format_string):
+            text += format_string[position : conversion.start()]
+            position = conversion.end()
+            specifier = conversion.group(1)
+            if specifier == "%":
+                text += "%"
+                continue
+            if not arguments:
+                raise Exception(f"Too few arguments for printf: {node}")
+            self.print_string(text)
+            text = ""
+            self.print_value(specifier, arguments.pop(0))
+        if arguments:
+            raise Exception(f"Too many arguments for printf: {node}")
+        self.print_string(text + format_string[position:])
+        return SKIP_CHILDREN
+
+    def print_string(self, text: str) -> None:
+        if text:
+            self.emit(f"la $a0, {self.string_label(text)}")
+            self.syscall(PRINT_STRING)
+
+    def print_value(self, specifier: str, argument: Value | StringNode) -> None:
+        if isinstance(argument, StringNode) or specifier == "s":
+            if not isinstance(argument, StringNode):
+                raise Exception(f"%s needs a string literal: {argument}")
+            self.print_string(argument.value[1:-1])
+        elif specifier == "f":
+            value = self.convert_value(argument, SymbolTableEntryType.Float)
+            self.emit("mov.s $f12, {u0}", uses=[value[0]])
+            self.syscall(PRINT_FLOAT)
+        else:
+            value = self.convert_value(argument, SymbolTableEntryType.Int)
+            self.emit("move $a0, {u0}", uses=[value[0]])
+            self.syscall(PRINT_CHAR if specifier == "c" else PRINT_INT)
+
+    def syscall(self, number: int) -> None:
+        self.emit(f"li $v0, {number}")
+        self.emit("syscall")
+
+    def convert_return(self, node: ReturnNode) -> object:
+        self.add_statement_comment(node)
+        self.exit(self.expression(node.children[0]))
+        return SKIP_CHILDREN
+
+    def exit(self, value: Value) -> None:
+        value = self.convert_value(value, SymbolTableEntryType.Int)
+        self.emit("move $a0, {u0}", uses=[value[0]])
+        self.syscall(EXIT)
+        self.terminated = True
+
+    def return_mips_code(self) -> str:
+        """
+        Allocate the registers and return the generated MIPS code
+        :return: str : The generated MIPS code
+        """
+        self.allocator.allocate(self.instructions)
+        code = self.allocator.rewrite(self.instructions, self.frame_size)
+        # The stack pointer stays aligned to 8 bytes
+        frame_size = self.frame_size + 4 * self.allocator.slots
+        frame_size += frame_size % 8
+
+        lines = [".data"]
+        lines.extend(self.data)
+        lines.extend(["", ".text", ".globl main", "main:"])
+        if frame_size:
+            lines.append(f"    addiu $sp, $sp, -{frame_size}")
+        lines.extend(f"    {line}" for line in code)
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,172 @@
+from bisect import insort
+
+from src.mips_target.Instruction import Instruction, VirtualRegister
+
+# main never returns to a caller, so the $s registers don't have to be saved and are allocated like the $t registers
+INT_REGISTERS: tuple[str, ...] = tuple(f"$t{i}" for i in range(10)) + tuple(
+    f"$s{i}" for i in range(8)
+)
+# $f12 is the argument of the print_float syscall
+FLOAT_REGISTERS: tuple[str, ...] = tuple(f"$f{i}" for i in range(2, 32) if i != 12)
+# Never allocated, spilled values are loaded into these around the instruction that uses them
+INT_SCRATCH: tuple[str, ...] = ("$a1", "$a2")
+FLOAT_SCRATCH: tuple[str, ...] = ("$f0", "$f1")
+
+
+class Interval:
+    """
+    The instructions between the first and the last mention of a virtual register
+    The code of main is a single straight-line block, so the register is live in exactly this range.
+    """
+
+    __slots__ = ("register", "start", "end", "location", "slot")
+
+    def __init__(self, register: VirtualRegister, start: int) -> None:
+        self.register: VirtualRegister = register
+        self.start: int = start
+        self.end: int = start
+        # Physical register, None if the interval is spilled to the stack slot
+        self.location: str | None = None
+        self.slot: int = -1
+
+
+class LinearScanAllocator:
+    """
+    Linear scan register allocation with spilling, as described by Poletto and Sarkar
+    Intervals are visited by start, an interval of which the register is needed when all registers are taken spills
+    the interval of its class that ends last to a stack slot. Spilled values are loaded into a scratch register
+    before every instruction that uses them and stored after every instruction that defines them.
+    """
+
+    def __init__(
+        self,
+        int_registers: tuple[str, ...] = INT_REGISTERS,
+        float_registers: tuple[str, ...] = FLOAT_REGISTERS,
+    ) -> None:
+        self.int_registers: tuple[str, ...] = int_registers
+        self.float_registers: tuple[str, ...] = float_registers
+        self.intervals: dict[VirtualRegister, Interval] = {}
+        # Amount of stack slots of spilled intervals, slots are reused once their interval ended
+        self.slots: int = 0
+        self.spilled: int = 0
+        self.loads: int = 0
+        self.stores: int = 0
+
+    def build_intervals(self, instructions: list[Instruction]) -> list[Interval]:
+        for idx, instruction in enumerate(instructions):
+            for register in instruction.uses + instruction.defs:
+                interval = self.intervals.get(register)
+                if interval is None:
+                    self.intervals[register] = Interval(register, idx)
+                else:
+                    interval.end = idx
+        return sorted(self.intervals.values(), key=lambda interval: interval.start)
+
+    def allocate(self, instructions: list[Instruction]) -> None:
+        """
+        Assign a physical register or a stack slot to every virtual register of the instructions
+        :param instructions: The instructions of main
+        :return: None
+        """
+        free: dict[bool, list[str]] = {
+            False: list(reversed(self.int_registers)),
+            True: list(reversed(self.float_registers)),
+        }
+        # Intervals in a register by end, and the slots of ended spilled intervals with the index they ended at
+        active: list[Interval] = []
+        spilled: list[Interval] = []
+        free_slots: list[tuple[int, int]] = []
+
+        for interval in self.build_intervals(instructions):
+            # An interval that ends at the start of this one is only read before this one is written
+            while active and active[0].end <= interval.start:
+                expired = active.pop(0)
+                free[expired.register.is_float].append(expired.location)
+            for expired in [s for s in spilled if s.end <= interval.start]:
+                spilled.remove(expired)
+                free_slots.append((expired.end, expired.slot))
+
+            registers = free[interval.register.is_float]
+            if registers:
+                interval.location = registers.pop()
+                insort(
+                    active, interval, key=lambda active_interval: active_interval.end
+                )
+                continue
+
+            # Spill the interval of the same class that is needed the longest
+            last = next(
+                (
+                    candidate
+                    for candidate in reversed(active)
+                    if candidate.register.is_float == interval.register.is_float
+                ),
+                None,
+            )
+            if last is not None and last.end > interval.end:
+                interval.location = last.location
+                last.location = None
+                active.remove(last)
+                insort(
+                    active, interval, key=lambda active_interval: active_interval.end
+                )
+                interval = last
+            interval.slot = self.slot(free_slots, interval.start)
+            spilled.append(interval)
+            self.spilled += 1
+
+    def slot(self, free_slots: list[tuple[int, int]], start: int) -> int:
+        # A slot can only be reused by an interval that starts after the slot was freed
+        for idx, (freed_at, slot) in enumerate(free_slots):
+            if freed_at <= start:
+                del free_slots[idx]
+                return slot
+        self.slots += 1
+        return self.slots - 1
+
+    def rewrite(self, instructions: list[Instruction], slot_offset: int) -> list[str]:
+        """
+        Returns the assembly of the instructions with physical registers, with the loads and stores of spilled values
+        :param instructions: The allocated instructions
+        :param slot_offset: Offset of the first spill slot from $sp
+        :return: list[str] : The lines of assembly
+        """
+        lines = []
+        for instruction in instructions:
+            registers: dict[VirtualRegister, str] = {}
+            scratch = {False: 0, True: 0}
+            stores = []
+            for register in instruction.uses:
+                if register in registers:
+                    continue
+                interval = self.intervals[register]
+                if interval.location is not None:
+                    registers[register] = interval.location
+                    continue
+                location = self.scratch(register, scratch[register.is_float])
+                scratch[register.is_float] += 1
+                load = "l.s" if register.is_float else "lw"
+                lines.append(
+                    f"{load} {location}, {slot_offset + 4 * interval.slot}($sp)"
+                )
+                self.loads += 1
+                registers[register] = location
+            for register in instruction.defs:
+                interval = self.intervals[register]
+                if interval.location is not None:
+                    registers[register] = interval.location
+                    continue
+                # The sources are read before the result is written, the first scratch register can be reused
+                location = registers.setdefault(register, self.scratch(register, 0))
+                store = "s.s" if register.is_float else "sw"
+                stores.append(
+                    f"{store} {location}, {slot_offset + 4 * interval.slot}($sp)"
+                )
+                self.stores += 1
+            lines.append(instruction.render(registers))
+            lines.extend(stores)
+        return lines
+
+    @staticmethod
+    def scratch(register: VirtualRegister, idx: int) -> str:
+        return (FLOAT_SCRATCH if register.is_float else INT_SCRATCH)[idx]
@@ -0,0 +1,247 @@
+import struct
+from array import array
+
+from src.parser.TreeNode import *
+
+# The kind of a node is stored, every kind has one node class
+NODE_CLASSES: dict[NodeKind, type] = {
+    cls.kind: cls for cls in TreeNode.__subclasses__()
+}
+
+# Default values of the slots that are not stored in the arena
+EXTRA_SLOTS: dict[str, object] = {
+    "converted": False,
+    "entry": None,
+    "scope_idx": -1,
+}
+
+# Slots of every node class that are not shared by all nodes, with their default value
+CLASS_SLOTS: dict[type, list[tuple[str, object]]] = {
+    cls: [(slot, EXTRA_SLOTS.get(slot)) for slot in cls.__slots__]
+    for cls in NODE_CLASSES.values()
+}
+
+MAGIC = b"AST2"
+# magic, amount of nodes, amount of strings, size of the string data
+HEADER = struct.Struct("=4sIII")
+
+NO_NODE = -1
+
+
+class NodeView:
+    """
+    Read-only view of one node of an arena, it has the same attributes as a TreeNode
+    """
+
+    __slots__ = ("arena", "idx")
+
+    def __init__(self, arena: "AstArena", idx: int) -> None:
+        self.arena: AstArena = arena
+        self.idx: int = idx
+
+    @property
+    def node_class(self) -> type:
+        return NODE_CLASSES[self.arena.kind[self.idx]]
+
+    @property
+    def value(self) -> str | None:
+        return self.arena.string(self.arena.value[self.idx])
+
+    @property
+    def line_nr(self) -> int:
+        return self.arena.line[self.idx]
+
+    @property
+    def column(self) -> int:
+        return self.arena.column[self.idx]
+
+    @property
+    def depth(self) -> int:
+        return self.arena.extra[self.idx]
+
+    @property
+    def children(self) -> list["NodeView"]:
+        return [NodeView(self.arena, child) for child in self.arena.children(self.idx)]
+
+
+class AstArena:
+    """
+    AST stored in parallel arrays instead of linked python objects
+    Node i is described by kind[i] (the NodeKind of the node), value[i] (index in the string table), first_child[i],
+    next_sibling[i], line[i], column[i] and extra[i] (the depth of pointer nodes). Nodes are numbered in pre-order,
+    so walking the AST in pre-order is iterating over the indices and the root is node 0.
+    The arrays are written to bytes as one block, so an arena can be cached, pickled or memory mapped and read back
+    without building any python object per node. Bindings to the symbol table (IdNode.entry) are not stored.
+    """
+
+    def __init__(self) -> None:
+        self.kind = array("B")
+        self.value = array("i")
+        self.first_child = array("i")
+        self.next_sibling = array("i")
+        self.line = array("i")
+        self.column = array("i")
+        self.extra = array("i")
+        self.strings: list[str] = []
+        self.string_idx: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.kind)
+
+    def __reduce__(self):
+        return AstArena.from_buffer, (self.to_bytes(),)
+
+    def intern(self, string: str | None) -> int:
+        if string is None:
+            return NO_NODE
+        idx = self.string_idx.get(string)
+        if idx is None:
+            idx = len(self.strings)
+            self.strings.append(string)
+            self.string_idx[string] = idx
+        return idx
+
+    def string(self, idx: int) -> str | None:
+        return self.strings[idx] if idx != NO_NODE else None
+
+    def add_node(self, node: TreeNode) -> int:
+        idx = len(self.kind)
+        self.kind.append(node.kind)
+        self.value.append(self.intern(node.value))
+        self.first_child.append(NO_NODE)
+        self.next_sibling.append(NO_NODE)
+        self.line.append(node.line_nr)
+        self.column.append(node.column)
+        self.extra.append(getattr(node, "depth", 0))
+        return idx
+
+    def children(self, idx: int) -> list[int]:
+        children = []
+        child = self.first_child[idx]
+        while child != NO_NODE:
+            children.append(child)
+            child = self.next_sibling[child]
+        return children
+
+    def root(self) -> NodeView:
+        return NodeView(self, 0)
+
+    @staticmethod
+    def from_tree(tree: TreeNode) -> "AstArena":
+        """
+        Store an AST in a new arena
+        :param tree: The root of the AST
+        :return: AstArena : The arena, the root is node 0
+        """
+        arena = AstArena()
+        last_child = []
+        stack: list[tuple[TreeNode, int]] = [(tree, NO_NODE)]
+        while stack:
+            node, parent = stack.pop()
+            idx = arena.add_node(node)
+            last_child.append(NO_NODE)
+            if parent != NO_NODE:
+                # Children are popped in order, so every child is the next sibling of the previous one
+                if last_child[parent] == NO_NODE:
+                    arena.first_child[parent] = idx
+                else:
+                    arena.next_sibling[last_child[parent]] = idx
+                last_child[parent] = idx
+            stack.extend((child, idx) for child in reversed(node.children))
+        return arena
+
+    def to_tree(self, line_offset: int = 0) -> TreeNode:
+        """
+        Build the TreeNode objects of the AST in the arena
+        :param line_offset: Added to the line of every node, e.g. when the source moved since the arena was stored
+        :return: TreeNode : The root of the AST
+        """
+        strings = self.strings + [None]  # a value of NO_NODE is None
+        nodes = []
+        for kind, value, line, column, extra in zip(
+            self.kind.tolist(),
+            self.value.tolist(),
+            self.line.tolist(),
+            self.column.tolist(),
+            self.extra.tolist(),
+        ):
+            cls = NODE_CLASSES[kind]
+            node = cls.__new__(cls)
+            node.value = strings[value]
+            node.children = []
+            node.line_nr = line + line_offset
+            node.column = column
+            for slot, default in CLASS_SLOTS[cls]:
+                setattr(node, slot, extra if slot == "depth" else default)
+            nodes.append(node)
+
+        next_sibling = self.next_sibling.tolist()
+        for node, child in zip(nodes, self.first_child.tolist()):
+            while child != NO_NODE:
+                node.children.append(nodes[child])
+                child = next_sibling[child]
+        return nodes[0]
+
+    def to_bytes(self) -> bytes:
+        """
+        Write the arena to one block of bytes, in the byte order of this machine
+        :return: bytes : The arena
+        """
+        encoded = [string.encode("utf-8") for string in self.strings]
+        string_sizes = array("i", (len(string) for string in encoded))
+        string_data = b"".join(encoded)
+        return b"".join(
+            (
+                HEADER.pack(MAGIC, len(self.kind), len(self.strings), len(string_data)),
+                self.value.tobytes(),
+                self.first_child.tobytes(),
+                self.next_sibling.tobytes(),
+                self.line.tobytes(),
+                self.column.tobytes(),
+                self.extra.tobytes(),
+                string_sizes.tobytes(),
+                self.kind.tobytes(),
+                string_data,
+            )
+        )
+
+    @staticmethod
+    def from_buffer(buffer) -> "AstArena":
+        """
+        Read an arena written by to_bytes
+        The node columns are memoryviews on the buffer, they are not copied, so reading an arena from an mmap only
+        loads the pages that are used. The arena can't get new nodes.
+        :param buffer: bytes, mmap or another object supporting the buffer protocol
+        :return: AstArena : The arena
+        """
+        view = memoryview(buffer).cast("B")
+        magic, nodes, strings, string_data_size = HEADER.unpack_from(view)
+        if magic != MAGIC:
+            raise ValueError("Not an AST arena")
+
+        arena = AstArena()
+        offset = HEADER.size
+
+        def column(size: int, typecode: str):
+            nonlocal offset
+            end = offset + size * struct.calcsize(typecode)
+            data = view[offset:end].cast(typecode)
+            offset = end
+            return data
+
+        arena.value = column(nodes, "i")
+        arena.first_child = column(nodes, "i")
+        arena.next_sibling = column(nodes, "i")
+        arena.line = column(nodes, "i")
+        arena.column = column(nodes, "i")
+        arena.extra = column(nodes, "i")
+        string_sizes = column(strings, "i")
+        arena.kind = column(nodes, "B")
+
+        string_data = bytes(view[offset : offset + string_data_size])
+        start = 0
+        for size in string_sizes:
+            arena.strings.append(string_data[start : start + size].decode("utf-8"))
+            start += size
+        arena.string_idx = {string: idx for idx, string in enumerate(arena.strings)}
+        return arena
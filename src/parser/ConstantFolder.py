@@ -0,0 +1,240 @@
+import operator
+from typing import Callable
+
+from src.parser.TreeNode import *
+from src.parser.SymbolTable import SymbolTable, SymbolTableEntry
+
+
+def c_divide(left: int | float, right: int | float) -> int | float:
+    if isinstance(left, float) or isinstance(right, float):
+        return left / right
+    # Integer division in C rounds towards zero
+    quotient = abs(left) // abs(right)
+    return quotient if (left >= 0) == (right >= 0) else -quotient
+
+
+def c_modulo(left: int, right: int) -> int:
+    # The remainder in C has the sign of the dividend
+    return left - right * c_divide(left, right)
+
+
+def shift_left(left: int, right: int) -> int:
+    if abs(right) >= 32:
+        raise ValueError("shift count larger than the width of an int")
+    return left << right if right >= 0 else left >> -right
+
+
+def shift_right(left: int, right: int) -> int:
+    if abs(right) >= 32:
+        raise ValueError("shift count larger than the width of an int")
+    return left >> right if right >= 0 else left << -right
+
+
+# Operator of every binary node that can be folded, and whether it only works on integral operands
+BINARY_OPERATORS: dict[NodeKind, tuple[Callable, bool]] = {
+    NodeKind.Plus: (operator.add, False),
+    NodeKind.Minus: (operator.sub, False),
+    NodeKind.Mult: (operator.mul, False),
+    NodeKind.Div: (c_divide, False),
+    NodeKind.Mod: (c_modulo, True),
+    NodeKind.LShift: (shift_left, True),
+    NodeKind.RShift: (shift_right, True),
+    NodeKind.BitAnd: (operator.and_, True),
+    NodeKind.BitOr: (operator.or_, True),
+    NodeKind.BitXor: (operator.xor, True),
+    NodeKind.Lt: (lambda left, right: int(left < right), False),
+    NodeKind.Gt: (lambda left, right: int(left > right), False),
+    NodeKind.Leq: (lambda left, right: int(left <= right), False),
+    NodeKind.Geq: (lambda left, right: int(left >= right), False),
+    NodeKind.Equal: (lambda left, right: int(left == right), False),
+    NodeKind.Neq: (lambda left, right: int(left != right), False),
+    NodeKind.And: (lambda left, right: int(bool(left) and bool(right)), False),
+    NodeKind.Or: (lambda left, right: int(bool(left) or bool(right)), False),
+}
+
+LITERAL_KINDS = {NodeKind.Int, NodeKind.Float, NodeKind.Char, NodeKind.Bool}
+
+# Children of these nodes are not read, so they are never replaced by their value
+ADDRESS_KINDS = {
+    NodeKind.Address,
+    NodeKind.Pointer,
+    NodeKind.IntPointer,
+    NodeKind.FloatPointer,
+    NodeKind.CharPointer,
+    NodeKind.BoolPointer,
+}
+
+
+def char_value(value: str) -> int:
+    char = value[1:-1]
+    if len(char) == 2:
+        # escape character e.g. '\\n'
+        char = char.encode("utf-8").decode("unicode_escape")
+    return ord(char)
+
+
+# Value of every kind of literal node, chars and bools are promoted to integers like in C
+LITERAL_VALUES: dict[NodeKind, Callable[[str], int | float]] = {
+    NodeKind.Int: int,
+    NodeKind.Float: float,
+    NodeKind.Char: char_value,
+    NodeKind.Bool: lambda value: int(value == "true"),
+}
+
+
+def literal_value(node: TreeNode) -> int | float | None:
+    """
+    Returns the value of a literal node, chars and bools are promoted to integers like in C
+    :param node: The node to get the value of
+    :return: int | float | None : The value, None if the node is not a literal
+    """
+    to_value = LITERAL_VALUES.get(node.kind)
+    if to_value is None:
+        return None
+    try:
+        return to_value(node.value)
+    except (ValueError, TypeError):
+        return None
+
+
+def literal_node(value: int | float, line_nr: int, column: int = -1) -> TreeNode:
+    if isinstance(value, float):
+        return FloatNode(str(value), line_nr=line_nr, column=column)
+    # Wrap around like a 32 bit int
+    return IntNode(str((value + 2**31) % 2**32 - 2**31), line_nr=line_nr, column=column)
+
+
+class ConstantFolder:
+    """
+    Constant folding and propagation in a single traversal of the AST
+    The AST is walked post-order with an explicit stack. When a node is finished, all its operands are final, so
+    its children can be folded right away, and the value of a constant declaration is known before any statement
+    after it is visited. The language has no control flow, so one pass in program order reaches the fixpoint.
+    """
+
+    def __init__(
+        self, symbol_table: SymbolTable, fold: bool = True, propagate: bool = True
+    ) -> None:
+        self.symbol_table: SymbolTable = symbol_table
+        self.fold: bool = fold
+        self.propagate: bool = propagate
+        self.values: dict[SymbolTableEntry, TreeNode] = {}  # values of constants
+        self.rewritten: int = 0
+
+    def run(self, ast: TreeNode) -> int:
+        """
+        Fold and propagate the constants of an AST, nodes are replaced in place
+        :param ast: The root of the AST
+        :return: int : The amount of rewritten nodes
+        """
+        stack: list[tuple[TreeNode, bool]] = [(ast, False)]
+        while stack:
+            node, finished = stack.pop()
+            if not finished:
+                stack.append((node, True))
+                stack.extend((child, False) for child in reversed(node.children))
+                continue
+
+            self.rewrite_children(node)
+            if self.propagate:
+                self.store_constant(node)
+        return self.rewritten
+
+    def run_statement(self, parent: TreeNode, idx: int) -> TreeNode:
+        """
+        Fold and propagate the constants of one statement of the program or of main, after the statements before it
+        :param parent: The program or main
+        :param idx: Index of the statement in the children of parent
+        :return: TreeNode : The statement, or the node that replaced it
+        """
+        self.run(parent.children[idx])
+        self.rewrite_child(parent, idx)
+        return parent.children[idx]
+
+    def rewrite_children(self, node: TreeNode) -> None:
+        for idx in range(len(node.children)):
+            self.rewrite_child(node, idx)
+
+    def rewrite_child(self, node: TreeNode, idx: int) -> None:
+        child = node.children[idx]
+        new_child = None
+        if child.kind == NodeKind.Id:
+            if self.propagate and ConstantFolder.is_rvalue(node, idx):
+                new_child = self.constant_value(child)
+        elif self.fold:
+            new_child = ConstantFolder.fold_node(child)
+
+        if new_child is not None:
+            node.children[idx] = new_child
+            self.rewritten += 1
+
+    @staticmethod
+    def declared_idx(node: NewVariableNode) -> int:
+        return 2 if node.children[0].kind == NodeKind.Const else 1
+
+    @staticmethod
+    def is_rvalue(parent: TreeNode, idx: int) -> bool:
+        """
+        Check if the child of a node is read, only ids that are read can be replaced by their value
+        :param parent: The parent node
+        :param idx: The index of the child
+        :return: bool : True if the value of the child is used
+        """
+        if parent.kind in ADDRESS_KINDS:
+            return False
+        if parent.kind == NodeKind.NewVariable:
+            return idx == len(
+                parent.children
+            ) - 1 and idx > ConstantFolder.declared_idx(parent)
+        if parent.kind == NodeKind.Assign:
+            return idx == len(parent.children) - 1 and idx > 0
+        return True
+
+    def constant_value(self, node: IdNode) -> TreeNode | None:
+        entry = self.symbol_table.lookup(node)
+        if entry is None or not entry.const:
+            return None
+        value = self.values.get(entry)
+        if value is None:
+            return None
+        return value.__class__(value.value, line_nr=node.line_nr, column=node.column)
+
+    def store_constant(self, node: TreeNode) -> None:
+        if node.kind != NodeKind.NewVariable or node.children[0].kind != NodeKind.Const:
+            return
+        declared_idx = ConstantFolder.declared_idx(node)
+        value = node.children[-1]
+        if len(node.children) - 1 == declared_idx or value.kind not in LITERAL_KINDS:
+            return
+        entry = self.symbol_table.lookup(node.children[declared_idx])
+        if entry is not None:
+            self.values[entry] = value
+
+    @staticmethod
+    def fold_node(node: TreeNode) -> TreeNode | None:
+        """
+        Fold an operator with literal operands
+        :param node: The node to fold
+        :return: TreeNode | None : The literal node replacing the operator, None if it can't be folded
+        """
+        if node.kind == NodeKind.Not and len(node.children) == 1:
+            value = literal_value(node.children[0])
+            if value is None:
+                return None
+            return literal_node(int(not value), node.line_nr, node.column)
+
+        binary_operator = BINARY_OPERATORS.get(node.kind)
+        if binary_operator is None or len(node.children) != 2:
+            return None
+        function, integral = binary_operator
+        left = literal_value(node.children[0])
+        right = literal_value(node.children[1])
+        if left is None or right is None:
+            return None
+        if integral and (isinstance(left, float) or isinstance(right, float)):
+            return None
+        try:
+            return literal_node(function(left, right), node.line_nr, node.column)
+        except (ZeroDivisionError, OverflowError, ValueError):
+            # Leave e.g. a division by zero to the runtime
+            return None
@@ -1,5 +1,5 @@
-import graphviz as gv  # type: ignore
 from src.parser.TreeNode import TreeNode
+from src.parser.AstArena import AstArena, NO_NODE
 
 
 class DotExporter:
@@ -8,13 +8,35 @@ class DotExporter:
 
     @staticmethod
     def export(tree: TreeNode, output_path: str) -> None:
+        DotExporter.render(DotExporter.to_dot(tree), output_path)
+
+    @staticmethod
+    def to_dot(tree: TreeNode) -> str:
+        return DotExporter.arena_to_dot(AstArena.from_tree(tree))
+
+    @staticmethod
+    def arena_to_dot(arena: AstArena) -> str:
+        """
+        Returns the dot source of an AST stored in an arena
+        The nodes are named after their index in the arena, so the same AST always gives the same dot source
+        :param arena: The AST
+        :return: str : The dot source
+        """
+        # graphviz is only imported when an AST is exported
+        import graphviz as gv  # type: ignore
+
         g = gv.Digraph(format="png")
-        DotExporter._export(g, tree)
-        g.render(output_path.replace(".dot", ""), view=True)
+        for idx in range(len(arena)):
+            g.node(str(idx), arena.string(arena.value[idx]) or "")
+            child = arena.first_child[idx]
+            while child != NO_NODE:
+                g.edge(str(idx), str(child))
+                child = arena.next_sibling[child]
+        return g.source
 
     @staticmethod
-    def _export(g: gv.Digraph, tree: TreeNode) -> None:
-        g.node(str(id(tree)), tree.value)
-        for child in tree.children:
-            DotExporter._export(g, child)
-            g.edge(str(id(tree)), str(id(child)))
+    def render(dot: str, output_path: str) -> None:
+        import graphviz as gv  # type: ignore
+
+        g = gv.Source(dot, format="png")
+        g.render(output_path.replace(".dot", ""), view=True)
@@ -0,0 +1,196 @@
+import re
+
+from antlr4 import InputStream
+from antlr4.CommonTokenFactory import CommonTokenFactory
+from antlr4.Lexer import TokenSource
+from antlr4.Recognizer import Recognizer
+from antlr4.Token import CommonToken, Token
+from antlr4.error.Errors import LexerNoViableAltException
+from src.antlr_files.compilerLexer import compilerLexer as CLexer
+
+# Token type of every keyword, a word that is not a keyword is an ID.
+# BOOL is not a keyword: 'true' and 'false' also match ID, which is defined before BOOL in the grammar and wins
+# the tie, so compilerLexer never produces a BOOL token either.
+KEYWORDS: dict[str, int] = {
+    "int": CLexer.TYPE,
+    "float": CLexer.TYPE,
+    "char": CLexer.TYPE,
+    "string": CLexer.TYPE,
+    "bool": CLexer.TYPE,
+    "void": CLexer.TYPE,
+    "main": CLexer.literalNames.index("'main'"),
+    "printf": CLexer.PRINTF,
+    "return": CLexer.RETURN,
+    "break": CLexer.BREAK,
+    "continue": CLexer.CONTINUE,
+    "for": CLexer.FOR,
+    "if": CLexer.IF,
+    "while": CLexer.WHILE,
+    "typedef": CLexer.TYPEDEF,
+    "else": CLexer.ELSE,
+    "const": CLexer.CONST,
+}
+
+# Token type of every operator and punctuation sign, the signs that are only used in parser rules are implicit
+# tokens of the grammar without a name
+SIGNS: dict[str, int] = {
+    ";": CLexer.SEMI,
+    ",": CLexer.COMMA,
+    "{": CLexer.LBRACKET,
+    "}": CLexer.RBRACKET,
+    "(": CLexer.LPAREN,
+    ")": CLexer.RPAREN,
+    "*": CLexer.POINTER,
+    "++": CLexer.PLUSPLUS,
+    "--": CLexer.MINUSMINUS,
+    "'": CLexer.SQUOTE,
+    '"': CLexer.DQUOTE,
+    "<<": CLexer.LSHIFT,
+    ">>": CLexer.RSHIFT,
+    "&": CLexer.AMPERSAND,
+    "|": CLexer.BITOR,
+    "^": CLexer.BITXOR,
+    "~": CLexer.BITNOT,
+    **{
+        sign: CLexer.literalNames.index(f"'{sign}'")
+        for sign in ("||", "&&", "==", "!=", "<", ">", "<=", ">=")
+        + ("+", "-", "/", "%", "!", "=")
+    },
+}
+
+# All tokens in one pattern. ANTLR takes the longest match and the first rule on a tie, a regex takes the first
+# alternative that matches, so the alternatives are ordered such that the first match is also the longest:
+# 'else if' before a word, a float before an int and the signs from long to short.
+TOKEN_PATTERN = re.compile(
+    r"""
+    (?P<WS>[ \t\n\r]+)
+    | (?P<LINE_COMMENT>//[^\r\n]*)
+    | (?P<COMMENT>/\*.*?\*/)
+    | (?P<ELIF>else\ if)
+    | (?P<WORD>[_a-zA-Z][_a-zA-Z0-9.]*)
+    | (?P<FLOAT>-?[0-9]*\.[0-9]*)
+    | (?P<INT>0|[1-9][0-9]*)
+    | (?P<CHAR>'\\.'|'.')
+    | (?P<STRING>"[^"]*")
+    | (?P<INCLUDE>\#include)
+    | (?P<SIGN>\+\+|--|<<|>>|<=|>=|==|!=|&&|\|\||[-+*/%<>=!&|^~;,(){}'"])
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+# Token type of every group of the pattern that is a single token type
+GROUP_TYPES: dict[str, int] = {
+    "LINE_COMMENT": CLexer.LINE_COMMENT,
+    "COMMENT": CLexer.COMMENT,
+    "ELIF": CLexer.ELIF,
+    "FLOAT": CLexer.FLOAT,
+    "INT": CLexer.INT,
+    "CHAR": CLexer.CHAR,
+    "STRING": CLexer.STRING,
+    "INCLUDE": CLexer.INCLUDE,
+}
+
+# Longest prefix of a token that compilerLexer consumes before it reports a character it can't match
+ERROR_PREFIX = re.compile(r"\#(?:i(?:n(?:c(?:l(?:u(?:d)?)?)?)?)?)?")
+
+
+class FastLexer(Recognizer, TokenSource):
+    """
+    Lexer for the tokens of compiler.g4 with one regular expression instead of the ANTLR lexer ATN
+    Produces the same tokens as compilerLexer: the same types, text, start and stop indices, lines and columns,
+    and reports the same token recognition errors to the error listeners, so it can be the token source of a
+    CommonTokenStream for compilerParser.
+    """
+
+    def __init__(self, input_stream: InputStream) -> None:
+        super().__init__()
+        self._input: InputStream = input_stream
+        self._factory = CommonTokenFactory.DEFAULT
+        self.source_text: str = input_stream.strdata
+        self.source: tuple = (self, input_stream)
+        self.pos: int = 0
+        # Position of the next character, columns are counted from the start of the line like compilerLexer does
+        self.line: int = 1
+        self.line_start: int = 0
+
+    @property
+    def column(self) -> int:
+        return self.pos - self.line_start
+
+    def getInputStream(self) -> InputStream:
+        return self._input
+
+    def getSourceName(self) -> str:
+        return self._input.getSourceName()
+
+    def nextToken(self) -> Token:
+        """
+        Returns the next token, whitespace is skipped and the end of the input is an EOF token
+        :return: Token : The next token
+        """
+        text = self.source_text
+        while self.pos < len(text):
+            start = self.pos
+            line, column = self.line, start - self.line_start
+            match = TOKEN_PATTERN.match(text, start)
+            if match is None:
+                self.recognition_error(start, line, column)
+                continue
+
+            value = match.group()
+            self.pos = match.end()
+            newline = value.rfind("\n")
+            if newline != -1:
+                self.line += value.count("\n")
+                self.line_start = start + newline + 1
+
+            group = match.lastgroup
+            if group == "WS":
+                continue
+            if group == "WORD":
+                token_type = KEYWORDS.get(value, CLexer.ID)
+            elif group == "SIGN":
+                token_type = SIGNS[value]
+            else:
+                token_type = GROUP_TYPES[group]
+            token = CommonToken(
+                self.source, token_type, Token.DEFAULT_CHANNEL, start, self.pos - 1
+            )
+            token.line = line
+            token.column = column
+            token.text = value
+            return token
+
+        token = CommonToken(
+            self.source, Token.EOF, Token.DEFAULT_CHANNEL, self.pos, self.pos - 1
+        )
+        token.line = self.line
+        token.column = self.column
+        return token
+
+    def recognition_error(self, start: int, line: int, column: int) -> None:
+        """
+        Report a character that starts no token and skip it like compilerLexer does
+        compilerLexer consumes the longest prefix of a token before it gives up, the error shows that prefix and
+        the character it failed on, and the lexer continues after that character.
+        :param start: Index of the first character of the failed token
+        :param line: Line of the failed token
+        :param column: Column of the failed token
+        :return: None
+        """
+        stop = ERROR_PREFIX.match(self.source_text, start)
+        stop = start if stop is None else stop.end()
+        failed = self.source_text[start : stop + 1]
+        display = failed.replace("\n", "\\n").replace("\t", "\\t").replace("\r", "\\r")
+        self.getErrorListenerDispatch().syntaxError(
+            self,
+            None,
+            line,
+            column,
+            f"token recognition error at: '{display}'",
+            LexerNoViableAltException(self, self._input, start, None),
+        )
+        self.pos = min(stop + 1, len(self.source_text))
+        if "\n" in failed:
+            self.line += failed.count("\n")
+            self.line_start = start + failed.rfind("\n") + 1
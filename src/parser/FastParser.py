@@ -0,0 +1,388 @@
+from antlr4 import Token
+
+from src.antlr_files.compilerParser import compilerParser as CParser
+from src.parser.Parser import ASTVisitor, MAIN_TOKEN, Parser
+from src.parser.SourceBuffer import SourceBuffer
+from src.parser.TreeNode import *
+
+
+def literal_token(text: str) -> int:
+    # Token type of a sign that is an implicit token of the grammar
+    return CParser.literalNames.index(f"'{text}'")
+
+
+ASSIGN: int = literal_token("=")
+
+# Precedence and node of every binary operator, one precedence per level of expr in compiler.g4 from the lowest
+# (||) to the highest (* / %)
+BINARY_OPERATORS: dict[int, tuple[int, type]] = {
+    literal_token("||"): (1, OrNode),
+    literal_token("&&"): (2, AndNode),
+    CParser.BITOR: (3, BitOrNode),
+    CParser.BITXOR: (4, BitXorNode),
+    CParser.AMPERSAND: (5, BitAndNode),
+    literal_token("=="): (6, EqualNode),
+    literal_token("!="): (6, NeqNode),
+    literal_token("<"): (7, LtNode),
+    literal_token(">"): (7, GtNode),
+    literal_token("<="): (7, LeqNode),
+    literal_token(">="): (7, GeqNode),
+    CParser.LSHIFT: (8, LShiftNode),
+    CParser.RSHIFT: (8, RShiftNode),
+    literal_token("+"): (9, PlusNode),
+    literal_token("-"): (9, MinusNode),
+    CParser.POINTER: (10, MultNode),
+    literal_token("/"): (10, DivNode),
+    literal_token("%"): (10, ModNode),
+}
+
+PREFIX_OPERATORS: set[int] = {
+    literal_token("!"),
+    literal_token("-"),
+    literal_token("+"),
+    CParser.BITNOT,
+}
+
+LITERALS: set[int] = {
+    CParser.FLOAT,
+    CParser.INT,
+    CParser.CHAR,
+    CParser.STRING,
+    CParser.BOOL,
+}
+
+# Tokens an expression or a statement can start with
+EXPR_START: set[int] = (
+    PREFIX_OPERATORS
+    | LITERALS
+    | {
+        CParser.PRINTF,
+        CParser.POINTER,
+        CParser.AMPERSAND,
+        CParser.MINUSMINUS,
+        CParser.PLUSPLUS,
+        CParser.ID,
+        CParser.LPAREN,
+    }
+)
+STAT_START: set[int] = EXPR_START | {
+    CParser.TYPE,
+    CParser.CONST,
+    CParser.RETURN,
+    CParser.LINE_COMMENT,
+    CParser.COMMENT,
+    CParser.TYPEDEF,
+}
+
+
+class FastParser:
+    """
+    Hand-written parser of compiler.g4 that builds the AST without a parse tree
+    Statements are parsed with recursive descent and expressions with precedence climbing, a chain of operators of
+    the same precedence is a loop. The nodes are built by the same ASTVisitor methods and collapsed by the same
+    convert_to_ast as the ANTLR front end, so both build the same AST. The alternatives of a rule are chosen by
+    looking ahead at the tokens that decide them, e.g. `a * b = c;` declares a pointer and `a * b;` multiplies.
+    """
+
+    def __init__(self, tokens: list[Token]) -> None:
+        self.tokens: list[Token] = tokens
+        self.pos: int = 0
+        self.typedefs: dict[str, str] = {}
+
+    @staticmethod
+    def parse_source(source: str | SourceBuffer) -> TreeNode:
+        """
+        Tokenize the source with the fast lexer and parse it
+        :param source: The C source code or a buffer with the source
+        :return: TreeNode : The AST, the same AST as Parser.parse_source builds
+        """
+        lexer = Parser.create_lexer(Parser.create_input_stream(source), "fast")
+        tokens = []
+        while True:
+            token = lexer.nextToken()
+            tokens.append(token)
+            if token.type == Token.EOF:
+                break
+        return FastParser(tokens).parse()
+
+    def LA(self, offset: int) -> int:
+        idx = min(self.pos + offset - 1, len(self.tokens) - 1)
+        return self.tokens[idx].type
+
+    def consume(self) -> Token:
+        token = self.tokens[self.pos]
+        if token.type != Token.EOF:
+            self.pos += 1
+        return token
+
+    def match(self, token_type: int) -> Token:
+        token = self.tokens[self.pos]
+        if token.type != token_type:
+            raise Parser.mismatched_input(token, token_type)
+        self.pos += 1
+        return token
+
+    def error(self, message: str) -> Exception:
+        token = self.tokens[self.pos]
+        found = "<EOF>" if token.type == Token.EOF else f"'{token.text}'"
+        return Exception(
+            f"Syntax error at line {token.line} column {token.column}: {message} at {found}"
+        )
+
+    def parse(self) -> TreeNode:
+        """
+        prog: stat+
+        Like the ANTLR parser, parsing stops at the first token that can't start a statement.
+        :return: TreeNode : The AST
+        """
+        first = self.tokens[0]
+        if first.type not in STAT_START:
+            raise self.error("no viable alternative")
+        prog = ProgNode(line_nr=first.line, column=first.column, children=[])
+        while self.LA(1) in STAT_START:
+            prog.children.append(self.stat())
+        return Parser.convert_to_ast(prog)
+
+    def stat(self) -> TreeNode:
+        """
+        A statement, without the StatNode around it: convert_to_ast replaces a StatNode with its only child
+        :return: TreeNode : The node of the statement
+        """
+        token_type = self.LA(1)
+        if token_type == CParser.TYPE and self.LA(2) == MAIN_TOKEN:
+            return self.main()
+        if token_type == CParser.TYPE or token_type == CParser.CONST:
+            statement = self.new_variable()
+        elif token_type == CParser.ID:
+            next_type = self.LA(2)
+            if next_type == ASSIGN:
+                statement = self.assignment()
+            elif (
+                next_type == CParser.ID
+                or next_type == CParser.LPAREN
+                or self.pointer_assignment(2)
+            ):
+                statement = self.new_variable()
+            else:
+                statement = self.expr()
+        elif token_type == CParser.POINTER and self.pointer_assignment(1):
+            statement = self.assignment()
+        elif token_type == CParser.RETURN:
+            statement = self.return_stat()
+        elif token_type == CParser.LINE_COMMENT or token_type == CParser.COMMENT:
+            return ASTVisitor.terminal_node(self.consume())
+        elif token_type == CParser.TYPEDEF:
+            return self.typedef()
+        else:
+            statement = self.expr()
+        self.match(CParser.SEMI)
+        return statement
+
+    def pointer_assignment(self, offset: int) -> bool:
+        # Whether the tokens from offset are a pointer followed by '=', e.g. `* * p =`
+        if self.LA(offset) != CParser.POINTER:
+            return False
+        while self.LA(offset) == CParser.POINTER:
+            offset += 1
+        return self.LA(offset) == CParser.ID and self.LA(offset + 1) == ASSIGN
+
+    def typedef(self) -> StatNode:
+        # typedef: TYPEDEF TYPE typedefname SEMI
+        start = self.match(CParser.TYPEDEF)
+        c_type = self.match(CParser.TYPE).text
+        if self.LA(1) != CParser.TYPE:
+            self.match(CParser.ID)
+        else:
+            self.consume()
+        ASTVisitor.add_typedef(self.typedefs, c_type, self.tokens[self.pos - 1].text)
+        self.match(CParser.SEMI)
+        # The ANTLR front end keeps an empty statement for a typedef
+        return StatNode(line_nr=start.line, column=start.column, children=[])
+
+    def main(self) -> MainNode:
+        # main: TYPE 'main' LPAREN RPAREN LBRACKET stat* RBRACKET
+        type_token = self.match(CParser.TYPE)
+        self.match(MAIN_TOKEN)
+        self.match(CParser.LPAREN)
+        self.match(CParser.RPAREN)
+        self.match(CParser.LBRACKET)
+        children = [ASTVisitor.terminal_node(type_token)]
+        while self.LA(1) in STAT_START:
+            children.append(self.stat())
+        self.match(CParser.RBRACKET)
+        return MainNode(
+            line_nr=type_token.line, column=type_token.column, children=children
+        )
+
+    def return_stat(self) -> ReturnNode:
+        start = self.match(CParser.RETURN)
+        return ReturnNode(
+            line_nr=start.line, column=start.column, children=[self.expr()]
+        )
+
+    def cast(self, children: list[TreeNode]) -> None:
+        # ('(' TYPE ')'), the type is added to the children
+        self.match(CParser.LPAREN)
+        children.append(ASTVisitor.terminal_node(self.match(CParser.TYPE)))
+        self.match(CParser.RPAREN)
+
+    def new_variable(self) -> NewVariableNode:
+        """
+        newVariable: CONST* (TYPE | ID) ('(' TYPE ')')? variable
+                   | CONST* (TYPE | ID) variable '=' ('(' TYPE ')')? expr
+                   | CONST* (TYPE | ID) pointer '=' expr
+        :return: NewVariableNode : The declaration
+        """
+        start = self.tokens[self.pos]
+        children = []
+        while self.LA(1) == CParser.CONST:
+            children.append(ASTVisitor.terminal_node(self.consume()))
+        if self.LA(1) != CParser.ID:
+            self.match(CParser.TYPE)
+        else:
+            self.consume()
+        children.append(ASTVisitor.terminal_node(self.tokens[self.pos - 1]))
+
+        if self.LA(1) == CParser.LPAREN:
+            self.cast(children)
+            children.append(self.variable())
+        elif self.LA(1) == CParser.POINTER:
+            children.append(self.pointer())
+            self.match(ASSIGN)
+            children.append(self.expr())
+        else:
+            children.append(self.variable())
+            if self.LA(1) == ASSIGN:
+                self.consume()
+                if self.LA(1) == CParser.LPAREN and self.LA(2) == CParser.TYPE:
+                    self.cast(children)
+                children.append(self.expr())
+        return ASTVisitor.new_variable_node(
+            self.typedefs, children, start.line, start.column
+        )
+
+    def assignment(self) -> AssignNode:
+        # assignment: (ID | pointer) '=' ('(' TYPE ')')? expr
+        start = self.tokens[self.pos]
+        if self.LA(1) == CParser.ID:
+            children = [ASTVisitor.terminal_node(self.consume())]
+        else:
+            children = [self.pointer()]
+        self.match(ASSIGN)
+        if self.LA(1) == CParser.LPAREN and self.LA(2) == CParser.TYPE:
+            self.cast(children)
+        children.append(self.expr())
+        return AssignNode(line_nr=start.line, column=start.column, children=children)
+
+    def expr(self, precedence: int = 1) -> TreeNode:
+        """
+        Parse the operators of at least the given precedence, left associative like the expr levels of the grammar
+        The binary nodes of a level are positioned at the first token of the level, like ctx.start in ASTVisitor.
+        :param precedence: The lowest precedence of the operators to parse
+        :return: TreeNode : The expression
+        """
+        start = self.tokens[self.pos]
+        node = self.unary()
+        while True:
+            operator = BINARY_OPERATORS.get(self.tokens[self.pos].type)
+            if operator is None or operator[0] < precedence:
+                return node
+            self.pos += 1
+            node = operator[1](
+                line_nr=start.line,
+                column=start.column,
+                children=[node, self.expr(operator[0] + 1)],
+            )
+
+    def unary(self) -> TreeNode:
+        # unary: ('!' | '-' | '+' | BITNOT) unary | primary, the prefix operators are applied from the inside out
+        operators = []
+        while self.tokens[self.pos].type in PREFIX_OPERATORS:
+            operators.append(self.consume())
+        node = self.primary()
+        for operator in reversed(operators):
+            node = ASTVisitor.unary_node(
+                [ASTVisitor.terminal_node(operator), node],
+                operator.line,
+                operator.column,
+            )
+        return node
+
+    def primary(self) -> TreeNode:
+        token = self.tokens[self.pos]
+        token_type = token.type
+        if token_type in LITERALS:
+            self.pos += 1
+            return LiteralNode(
+                line_nr=token.line,
+                column=token.column,
+                children=[ASTVisitor.terminal_node(token)],
+            )
+        if token_type == CParser.ID:
+            next_type = self.LA(2)
+            if next_type == CParser.PLUSPLUS or next_type == CParser.MINUSMINUS:
+                var = self.variable()
+                self.consume()
+                return ASTVisitor.step_node(
+                    PlusNode if next_type == CParser.PLUSPLUS else MinusNode,
+                    var,
+                    token.line,
+                    token.column,
+                )
+            return self.variable()
+        if token_type == CParser.PLUSPLUS or token_type == CParser.MINUSMINUS:
+            self.pos += 1
+            return ASTVisitor.step_node(
+                PlusNode if token_type == CParser.PLUSPLUS else MinusNode,
+                self.variable(),
+                token.line,
+                token.column,
+            )
+        if token_type == CParser.LPAREN:
+            self.pos += 1
+            node = self.expr()
+            self.match(CParser.RPAREN)
+            return node
+        if token_type == CParser.POINTER:
+            return self.pointer()
+        if token_type == CParser.AMPERSAND:
+            # address: AMPERSAND ID
+            self.pos += 1
+            return AddressNode(
+                line_nr=token.line,
+                column=token.column,
+                children=[ASTVisitor.terminal_node(self.match(CParser.ID))],
+            )
+        if token_type == CParser.PRINTF:
+            return self.printf()
+        raise self.error("no viable alternative")
+
+    def variable(self) -> VariableNode:
+        token = self.match(CParser.ID)
+        return VariableNode(
+            line_nr=token.line,
+            column=token.column,
+            children=[ASTVisitor.terminal_node(token)],
+        )
+
+    def pointer(self) -> PointerNode:
+        # pointer: POINTER+ variable
+        start = self.match(CParser.POINTER)
+        depth = 1
+        while self.LA(1) == CParser.POINTER:
+            self.pos += 1
+            depth += 1
+        return PointerNode(
+            depth, line_nr=start.line, column=start.column, children=[self.variable()]
+        )
+
+    def printf(self) -> PrintfNode:
+        # printf: PRINTF LPAREN STRING (COMMA expr)* RPAREN
+        start = self.match(CParser.PRINTF)
+        self.match(CParser.LPAREN)
+        children = [ASTVisitor.terminal_node(self.match(CParser.STRING))]
+        while self.LA(1) == CParser.COMMA:
+            self.pos += 1
+            children.append(self.expr())
+        self.match(CParser.RPAREN)
+        return PrintfNode(line_nr=start.line, column=start.column, children=children)
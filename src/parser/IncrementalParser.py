@@ -0,0 +1,375 @@
+from bisect import bisect_left, bisect_right
+
+from antlr4 import Token
+from antlr4.Token import CommonToken
+
+from src.antlr_files.compilerParser import compilerParser as CParser
+from src.parser.AstArena import AstArena
+from src.parser.FastParser import FastParser, STAT_START
+from src.parser.Parser import ASTVisitor, MAIN_TOKEN, Parser
+from src.parser.SourceBuffer import SourceBuffer
+from src.parser.TreeNode import *
+
+# Kinds of chunks: a statement, the header of main up to its '{' and the '}' that closes main
+STATEMENT = 0
+MAIN = 1
+END = 2
+
+# Size of the blocks in which the old and new source are compared, see common_prefix
+BLOCK_SIZE = 4096
+
+
+def common_prefix(old: str, new: str) -> int:
+    """
+    Returns the length of the common prefix of two strings
+    Compares blocks of BLOCK_SIZE characters first, so only one block is compared character by character.
+    :param old: The first string
+    :param new: The second string
+    :return: int : The amount of equal characters at the start
+    """
+    size = min(len(old), len(new))
+    start = 0
+    while (
+        start < size
+        and old[start : start + BLOCK_SIZE] == new[start : start + BLOCK_SIZE]
+    ):
+        start += BLOCK_SIZE
+    end = min(start + BLOCK_SIZE, size)
+    while start < end and old[start] == new[start]:
+        start += 1
+    return min(start, size)
+
+
+def common_suffix(old: str, new: str, limit: int) -> int:
+    """
+    Returns the length of the common suffix of two strings
+    :param old: The first string
+    :param new: The second string
+    :param limit: Maximum length of the suffix, so it doesn't overlap the common prefix
+    :return: int : The amount of equal characters at the end
+    """
+    length = 0
+    while (
+        length + BLOCK_SIZE <= limit
+        and old[len(old) - length - BLOCK_SIZE : len(old) - length]
+        == new[len(new) - length - BLOCK_SIZE : len(new) - length]
+    ):
+        length += BLOCK_SIZE
+    while length < limit and old[len(old) - length - 1] == new[len(new) - length - 1]:
+        length += 1
+    return length
+
+
+def unclosed(text: str, tokens: list[Token]) -> list[int]:
+    """
+    Returns the start of the tokens that open a string, char or comment that is not closed
+    The lexer makes these signs, a closing quote or */ later in the source makes them the start of one long token.
+    :param text: The source
+    :param tokens: Tokens of the source
+    :return: list[int] : The indices of the tokens in the source
+    """
+    return [
+        token.start
+        for token in tokens
+        if token.type == CParser.DQUOTE
+        or token.type == CParser.SQUOTE
+        or (token.text == "/" and text.startswith("*", token.stop + 1))
+    ]
+
+
+def statements(chunks: list["Chunk"]) -> int:
+    return sum(chunk.kind == STATEMENT for chunk in chunks)
+
+
+class Chunk:
+    """
+    A top level statement or a statement in the body of main, with the range of the source it was parsed from
+    The AST of the statement is stored in an arena, so a statement that moved or follows a changed statement gets
+    new nodes to bind and fold. The statements before the first changed one keep their AST, see first_changed.
+    The header and the closing bracket of main are chunks without a statement of their own.
+    """
+
+    __slots__ = (
+        "kind",
+        "start",
+        "stop",
+        "line",
+        "column",
+        "line_shift",
+        "top_level",
+        "arena",
+        "typedefs",
+        "tree",
+    )
+
+    def __init__(
+        self,
+        kind: int,
+        first: Token,
+        last: Token,
+        top_level: bool,
+        node: TreeNode | None = None,
+        typedefs: dict[str, str] | None = None,
+    ) -> None:
+        self.kind: int = kind
+        # Index of the first and last character in the source
+        self.start: int = first.start
+        self.stop: int = last.stop
+        self.line: int = first.line
+        self.column: int = first.column
+        # Lines the chunk moved since it was parsed
+        self.line_shift: int = 0
+        self.top_level: bool = top_level
+        self.arena: AstArena | None = None if node is None else AstArena.from_tree(node)
+        # Typedefs declared by a typedef statement, None for other statements
+        self.typedefs: dict[str, str] | None = typedefs
+        # The AST of the chunk in the last built tree, main without its statements for the header of main
+        self.tree: TreeNode | None = None
+
+    def to_tree(self) -> TreeNode:
+        return self.arena.to_tree(self.line_shift)
+
+
+class IncrementalParser:
+    """
+    Parser that keeps the statements of the previous version of a source and only reparses the statements on the
+    lines that changed
+    The old and new source are compared to find the changed range, the statements on its lines are lexed and parsed
+    again with the fast front end and all other statements are reused from their arenas. Lines that change main
+    itself or a typedef, or a string or comment that reaches past the changed lines, fall back to parsing the whole
+    source. The AST is the same AST FastParser.parse_source builds.
+    """
+
+    def __init__(self) -> None:
+        self.source: str | None = None
+        self.chunks: list[Chunk] = []
+        # Whether the statements cover the whole source, the tokens after the last statement are ignored like by
+        # the other parsers, but an edit can make them a statement
+        self.complete: bool = False
+        self.unclosed: list[int] = []
+        # Statements parsed and reused by the last parse
+        self.reparsed: int = 0
+        self.reused: int = 0
+        # Index of the first chunk that changed in the last parse, the chunks before it keep the AST of the previous
+        # parse with everything later passes stored in it
+        self.first_changed: int = 0
+
+    def parse(self, source: str | SourceBuffer) -> TreeNode:
+        """
+        Parse a new version of the source
+        :param source: The C source code or a buffer with the source
+        :return: TreeNode : The AST
+        """
+        text = source.text if isinstance(source, SourceBuffer) else source
+        if not self.complete or not self.reparse(text):
+            self.parse_all(text)
+        self.source = text
+        return self.build_tree()
+
+    @staticmethod
+    def lex(text: str, start: int, line: int, stop: int) -> list[Token] | None:
+        """
+        Tokenize a range of whole lines of the source with the fast lexer
+        :param text: The source
+        :param start: Index of the first character of a line
+        :param line: The line of start
+        :param stop: Index after the range
+        :return: list[Token] | None : The tokens ending with EOF, None if a token reaches past the range
+        """
+        lexer = Parser.create_lexer(
+            Parser.create_input_stream(SourceBuffer.from_string(text)), "fast"
+        )
+        lexer.pos = start
+        lexer.line = line
+        lexer.line_start = start
+        tokens = []
+        while True:
+            token = lexer.nextToken()
+            if token.type == Token.EOF or token.start >= stop:
+                break
+            if token.stop >= stop:
+                return None
+            tokens.append(token)
+        eof = CommonToken(
+            token.source, Token.EOF, Token.DEFAULT_CHANNEL, stop, stop - 1
+        )
+        eof.line = token.line
+        eof.column = token.column
+        tokens.append(eof)
+        return tokens
+
+    @staticmethod
+    def parse_statements(parser: FastParser, top_level: bool) -> list[Chunk]:
+        """
+        Parse statements until a token that can't start a statement
+        The statements of main are chunks of their own, between the chunks of its header and closing bracket.
+        :param parser: The parser at the first statement
+        :param top_level: Whether the statements are top level statements or statements of main
+        :return: list[Chunk] : The chunks of the statements
+        """
+        chunks = []
+        while parser.LA(1) in STAT_START:
+            first = parser.tokens[parser.pos]
+            if (
+                top_level
+                and parser.LA(1) == CParser.TYPE
+                and parser.LA(2) == MAIN_TOKEN
+            ):
+                # main: TYPE 'main' LPAREN RPAREN LBRACKET stat* RBRACKET
+                parser.consume()
+                parser.match(MAIN_TOKEN)
+                parser.match(CParser.LPAREN)
+                parser.match(CParser.RPAREN)
+                header = parser.match(CParser.LBRACKET)
+                main = MainNode(
+                    line_nr=first.line,
+                    column=first.column,
+                    children=[ASTVisitor.terminal_node(first)],
+                )
+                chunks.append(Chunk(MAIN, first, header, True, main))
+                chunks += IncrementalParser.parse_statements(parser, False)
+                end = parser.match(CParser.RBRACKET)
+                chunks.append(Chunk(END, end, end, True))
+                continue
+
+            typedef = parser.LA(1) == CParser.TYPEDEF
+            known = set(parser.typedefs.items())
+            statement = parser.stat()
+            declared = None
+            if typedef:
+                declared = dict(set(parser.typedefs.items()) - known)
+            # Collapsed like convert_to_ast collapses the children of the program or of main
+            wrapper = Parser.convert_to_ast(ProgNode(children=[statement]))
+            chunks.append(
+                Chunk(
+                    STATEMENT,
+                    first,
+                    parser.tokens[parser.pos - 1],
+                    top_level,
+                    wrapper.children[0],
+                    declared,
+                )
+            )
+        return chunks
+
+    def parse_all(self, text: str) -> None:
+        tokens = IncrementalParser.lex(text, 0, 1, len(text))
+        parser = FastParser(tokens)
+        if parser.LA(1) not in STAT_START:
+            raise parser.error("no viable alternative")
+        self.chunks = IncrementalParser.parse_statements(parser, True)
+        self.complete = parser.LA(1) == Token.EOF
+        self.unclosed = unclosed(text, tokens)
+        self.reparsed = statements(self.chunks)
+        self.reused = 0
+        self.first_changed = 0
+
+    def reparse(self, text: str) -> bool:
+        """
+        Reparse the statements on the lines that changed since the previous source
+        :param text: The new source
+        :return: bool : False if the whole source has to be parsed
+        """
+        old = self.source
+        chunks = self.chunks
+        if old == text:
+            self.reparsed, self.reused = 0, statements(chunks)
+            self.first_changed = len(chunks)
+            return True
+
+        change_start = common_prefix(old, text)
+        suffix = common_suffix(old, text, min(len(old), len(text)) - change_start)
+        change_end = len(old) - suffix
+        delta = len(text) - len(old)
+
+        def line_start(idx: int) -> int:
+            return old.rfind("\n", 0, idx) + 1
+
+        def line_end(idx: int) -> int:
+            end = old.find("\n", idx)
+            return len(old) if end == -1 else end
+
+        # The chunks on the changed lines, and the chunks that share a line with them
+        first = bisect_left([chunk.stop for chunk in chunks], line_start(change_start))
+        last = bisect_right([chunk.start for chunk in chunks], line_end(change_end)) - 1
+        region_start = line_start(change_start)
+        region_end = line_end(change_end)
+        if first <= last:
+            region_start = min(region_start, line_start(chunks[first].start))
+            region_end = max(region_end, line_end(chunks[last].stop))
+        while first > 0 and chunks[first - 1].stop >= region_start:
+            first -= 1
+            region_start = min(region_start, line_start(chunks[first].start))
+        while last + 1 < len(chunks) and chunks[last + 1].start <= region_end:
+            last += 1
+            region_end = max(region_end, line_end(chunks[last].stop))
+        region_end = min(region_end + 1, len(old))
+
+        for chunk in chunks[first : last + 1]:
+            if chunk.kind != STATEMENT or chunk.typedefs is not None:
+                return False
+        # An edit can close a string or comment opened before the changed lines
+        if self.unclosed and self.unclosed[0] < region_start:
+            return False
+
+        line = old.count("\n", 0, region_start) + 1
+        top_level = first == 0 or (
+            chunks[first - 1].top_level and chunks[first - 1].kind != MAIN
+        )
+        try:
+            tokens = IncrementalParser.lex(text, region_start, line, region_end + delta)
+            if tokens is None or any(token.type == CParser.TYPEDEF for token in tokens):
+                return False
+            parser = FastParser(tokens)
+            for chunk in chunks[:first]:
+                if chunk.typedefs is not None:
+                    parser.typedefs.update(chunk.typedefs)
+            new_chunks = IncrementalParser.parse_statements(parser, top_level)
+        except Exception:
+            # The error is raised again by parsing the whole source, with the same message
+            return False
+        if parser.LA(1) != Token.EOF:
+            return False
+        if not new_chunks and first == 0 and last + 1 == len(chunks):
+            return False
+
+        line_delta = text.count("\n", region_start, region_end + delta) - old.count(
+            "\n", region_start, region_end
+        )
+        for chunk in chunks[last + 1 :]:
+            chunk.start += delta
+            chunk.stop += delta
+            chunk.line += line_delta
+            chunk.line_shift += line_delta
+        self.chunks = chunks[:first] + new_chunks + chunks[last + 1 :]
+        self.unclosed = unclosed(text, tokens) + [
+            start + delta for start in self.unclosed if start >= region_end
+        ]
+        self.reparsed = statements(new_chunks)
+        self.reused = statements(self.chunks) - self.reparsed
+        self.first_changed = first
+        return True
+
+    def build_tree(self) -> TreeNode:
+        """
+        Build the AST of the current source from the chunks
+        The chunks before first_changed keep their AST, all other chunks get new nodes from their arena.
+        :return: TreeNode : The AST
+        """
+        first = self.chunks[0]
+        prog = ProgNode(line_nr=first.line, column=first.column, children=[])
+        parents: list[TreeNode] = [prog]
+        for idx, chunk in enumerate(self.chunks):
+            if chunk.kind == END:
+                main = parents.pop()
+                parents[-1].children.append(Parser.collapse(main))
+                continue
+            if idx >= self.first_changed or chunk.tree is None:
+                chunk.tree = chunk.to_tree()
+            if chunk.kind == MAIN:
+                # Only the header of main is kept, the statements are added again
+                del chunk.tree.children[1:]
+                parents.append(chunk.tree)
+            else:
+                parents[-1].children.append(chunk.tree)
+        return prog
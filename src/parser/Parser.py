@@ -1,12 +1,21 @@
 import copy
+from typing import Callable
 
 from antlr4 import *
 from src.parser.TreeNode import *
 from src.parser.SymbolTable import *
+from src.parser.Walker import postorder
+from antlr4.atn.PredictionMode import PredictionMode
 from antlr4.error.ErrorListener import ErrorListener, ConsoleErrorListener
+from antlr4.error.ErrorStrategy import BailErrorStrategy, DefaultErrorStrategy
+from antlr4.error.Errors import ParseCancellationException
+from antlr4.Lexer import TokenSource
+from antlr4.tree.Tree import ParseTree
 from src.antlr_files.compilerLexer import compilerLexer as CLexer
 from src.antlr_files.compilerParser import compilerParser as CParser, compilerParser
 from src.antlr_files.compilerVisitor import compilerVisitor as CVisitor
+from src.parser.FastLexer import FastLexer
+from src.parser.SourceBuffer import SourceBuffer
 
 
 class MyErrorListener(ErrorListener):
@@ -16,7 +25,44 @@ class MyErrorListener(ErrorListener):
         )
 
 
+class SourceStream(InputStream):
+    """
+    Input stream of the lexer on a SourceBuffer
+    InputStream converts the source to a list with the code point of every character, which takes far more memory
+    than the source itself. The bytes of an ASCII source are the code points already, so the stream reads them from
+    the buffer, the text of a token is sliced from the buffer too and the source is only decoded when the whole text
+    is needed.
+    """
+
+    def __init__(self, source: SourceBuffer) -> None:
+        self.name = source.name
+        self.source: SourceBuffer = source
+        self.ascii: bool = source.is_ascii
+        if self.ascii:
+            self._index = 0
+            self.data = source.data
+            self._size = len(source.data)
+        else:
+            self._loadString()
+
+    @property
+    def strdata(self) -> str:
+        return self.source.text
+
+    def getText(self, start: int, stop: int) -> str:
+        if not self.ascii:
+            return super().getText(start, stop)
+        if start >= self._size:
+            return ""
+        return str(self.data[start : min(stop, self._size - 1) + 1], "ascii")
+
+
 class Parser:
+    # Amount of SLL parses and of LL parses after SLL failed in this process, a streaming parse counts every
+    # statement
+    sll_parses: int = 0
+    ll_fallbacks: int = 0
+
     def __init__(self) -> None:
         pass
 
@@ -27,324 +73,364 @@ class Parser:
     """
 
     @staticmethod
-    def parse(input_file: str) -> TreeNode:
-        error_listener = MyErrorListener()
-        lexer = CLexer(FileStream(input_file))
-        lexer.removeErrorListener(ConsoleErrorListener.INSTANCE)
-        lexer.addErrorListener(error_listener)
+    def parse(
+        input_file: str,
+        streaming: bool = False,
+        parse_mode: str = "sll",
+        lexer: str = "antlr",
+    ) -> TreeNode:
+        with SourceBuffer.open(input_file) as source:
+            return Parser.parse_source(source, streaming, parse_mode, lexer)
 
-        stream: CommonTokenStream = CommonTokenStream(lexer)
+    @staticmethod
+    def parse_source(
+        source: str | SourceBuffer,
+        streaming: bool = False,
+        parse_mode: str = "sll",
+        lexer: str = "antlr",
+    ) -> TreeNode:
+        input_stream = Parser.create_input_stream(source)
+        if streaming:
+            return Parser.parse_streaming(input_stream, parse_mode, lexer)
+        return Parser.parse_stream(input_stream, parse_mode, lexer)
+
+    @staticmethod
+    def create_input_stream(source: str | SourceBuffer) -> InputStream:
+        """
+        Create the input stream of the lexer
+        :param source: The C source code or a buffer with the source
+        :return: InputStream : The input of the lexer
+        """
+        if isinstance(source, SourceBuffer):
+            return SourceStream(source)
+        return InputStream(source)
+
+    @staticmethod
+    def create_lexer(input_stream: InputStream, lexer: str = "antlr") -> TokenSource:
+        """
+        Create the lexer of the input, lexer errors are raised as syntax errors
+        :param input_stream: The input to tokenize
+        :param lexer: "antlr" or "fast", both produce the same tokens
+        :return: TokenSource : The lexer
+        """
+        token_source = LEXERS[lexer](input_stream)
+        token_source.removeErrorListener(ConsoleErrorListener.INSTANCE)
+        token_source.addErrorListener(MyErrorListener())
+        return token_source
+
+    @staticmethod
+    def parse_stream(
+        input_stream: InputStream, parse_mode: str = "sll", lexer: str = "antlr"
+    ) -> TreeNode:
+        """
+        Parse the whole input to a parse tree and convert it to the AST
+        With the sll parse mode the parser first predicts with SLL, which only looks at the tokens and not at the
+        rules that called the current rule, and stops at the first syntax error without reporting it. That error
+        can be caused by SLL itself, so the input is then parsed again with LL, which reports the real syntax
+        errors. Valid input, almost all input, is parsed once with the fast SLL prediction.
+        :param input_stream: The input to parse
+        :param parse_mode: "ll" or "sll"
+        :param lexer: "antlr" or "fast"
+        :return: TreeNode : The AST
+        """
+        stream: CommonTokenStream = CommonTokenStream(
+            Parser.create_lexer(input_stream, lexer)
+        )
         parser: CParser = CParser(stream)
-        parser.removeErrorListener(ConsoleErrorListener.INSTANCE)
-        parser.addErrorListener(error_listener)
+        PARSE_MODES[parse_mode](parser)
 
-        tree: CParser.ProgContext = parser.prog()
+        if parse_mode == "ll":
+            tree: CParser.ProgContext = parser.prog()
+        else:
+            Parser.sll_parses += 1
+            try:
+                tree = parser.prog()
+            except ParseCancellationException:
+                Parser.ll_fallbacks += 1
+                parser.reset()
+                Parser.use_ll(parser)
+                tree = parser.prog()
 
         return Parser.convert_to_ast(ASTVisitor().visit(tree))
 
+    @staticmethod
+    def parse_streaming(
+        input_stream: InputStream, parse_mode: str = "sll", lexer: str = "antlr"
+    ) -> TreeNode:
+        """
+        Parse statement by statement, the AST is built without keeping the parse tree of the whole program
+        Every statement is parsed on its own, converted to AST nodes and its parse tree and tokens are released
+        before the next statement is parsed, so the peak memory depends on the largest statement instead of the
+        whole program. The statements of main are streamed the same way.
+        With the sll parse mode every statement that fails with SLL is parsed again with LL, like in parse_stream.
+        :param input_stream: The input to parse
+        :param parse_mode: "ll" or "sll"
+        :param lexer: "antlr" or "fast"
+        :return: TreeNode : The AST, the same AST as parse_stream builds
+        """
+        stream: StreamingTokenStream = StreamingTokenStream(
+            Parser.create_lexer(input_stream, lexer)
+        )
+        parser: CParser = CParser(stream)
+        PARSE_MODES[parse_mode](parser)
+        visitor = ASTVisitor()
+
+        prog = ProgNode(
+            line_nr=stream.LT(1).line, column=stream.LT(1).column, children=[]
+        )
+        if stream.LA(1) == Token.EOF:
+            # prog needs at least one statement, LL reports the error
+            Parser.use_ll(parser)
+            parser.prog()
+
+        while stream.LA(1) != Token.EOF:
+            if stream.LA(1) == CParser.TYPE and stream.LA(2) == MAIN_TOKEN:
+                statement = StatNode(
+                    line_nr=stream.LT(1).line,
+                    column=stream.LT(1).column,
+                    children=[Parser.collapse(Parser.parse_main(parser, visitor))],
+                )
+            else:
+                statement = Parser.parse_statement(parser, visitor)
+            prog.children.append(Parser.collapse(statement))
+
+        return prog
+
+    @staticmethod
+    def parse_statement(parser: CParser, visitor: "ASTVisitor") -> TreeNode:
+        stream: StreamingTokenStream = parser.getTokenStream()
+        start = stream.index
+        sll = isinstance(parser._errHandler, BailErrorStrategy)
+        if sll:
+            Parser.sll_parses += 1
+        try:
+            # Without a parent context the parse tree of the statement is not attached to anything
+            ctx: CParser.StatContext = parser.stat()
+        except ParseCancellationException:
+            # The tokens of the statement are not released yet, parse it again with LL
+            Parser.ll_fallbacks += 1
+            stream.seek(start)
+            Parser.use_ll(parser)
+            ctx = parser.stat()
+            Parser.use_sll(parser)
+        statement = visitor.visit(ctx)
+        Parser.convert_to_ast(statement)
+        parser.getTokenStream().release_consumed()
+        return statement
+
+    @staticmethod
+    def use_sll(parser: CParser) -> None:
+        """
+        Predict with SLL and stop at the first syntax error without reporting it
+        :param parser: The parser
+        :return: None
+        """
+        parser._interp.predictionMode = PredictionMode.SLL
+        parser._errHandler = BailErrorStrategy()
+        parser.removeErrorListeners()
+
+    @staticmethod
+    def use_ll(parser: CParser) -> None:
+        """
+        Predict with full LL and raise an exception with the message of the first syntax error
+        :param parser: The parser
+        :return: None
+        """
+        parser._interp.predictionMode = PredictionMode.LL
+        parser._errHandler = DefaultErrorStrategy()
+        parser.removeErrorListeners()
+        parser.addErrorListener(MyErrorListener())
+
+    @staticmethod
+    def parse_main(parser: CParser, visitor: "ASTVisitor") -> MainNode:
+        stream: StreamingTokenStream = parser.getTokenStream()
+        type_token = Parser.match(stream, CParser.TYPE)
+        Parser.match(stream, MAIN_TOKEN)
+        Parser.match(stream, CParser.LPAREN)
+        Parser.match(stream, CParser.RPAREN)
+        Parser.match(stream, CParser.LBRACKET)
+        visitor.visited_main = True
+
+        main = MainNode(
+            line_nr=type_token.line,
+            column=type_token.column,
+            children=[
+                TypeNode(
+                    type_token.text,
+                    line_nr=type_token.line,
+                    column=type_token.column,
+                )
+            ],
+        )
+        while stream.LA(1) not in (CParser.RBRACKET, Token.EOF):
+            main.children.append(
+                Parser.collapse(Parser.parse_statement(parser, visitor))
+            )
+        Parser.match(stream, CParser.RBRACKET)
+        stream.release_consumed()
+        return main
+
+    @staticmethod
+    def match(stream: "StreamingTokenStream", token_type: int) -> Token:
+        token = stream.LT(1)
+        if token.type != token_type:
+            raise Parser.mismatched_input(token, token_type)
+        stream.consume()
+        return token
+
+    @staticmethod
+    def mismatched_input(token: Token, token_type: int) -> Exception:
+        """
+        Returns the syntax error of a token that is not of the expected type
+        :param token: The token
+        :param token_type: The expected token type
+        :return: Exception : The syntax error, in the format of MyErrorListener
+        """
+        expected = CParser.literalNames[token_type]
+        if expected == "<INVALID>":
+            expected = CParser.symbolicNames[token_type]
+        found = "<EOF>" if token.type == Token.EOF else f"'{token.text}'"
+        return Exception(
+            "Syntax error at line {0} column {1}: {2}".format(
+                token.line,
+                token.column,
+                f"mismatched input {found} expecting {expected}",
+            )
+        )
+
     @staticmethod
     def convert_to_ast(cst: TreeNode) -> TreeNode | None:
         if not cst.children:
             return
 
-        for child in cst.children:
-            Parser.convert_to_ast(child)
-
         # Remove all statements that have only one child except for some specific ones
-        for child in cst.children:
-            if len(child.children) == 1:
-                new_child = child.children[0]
-                if not isinstance(
-                    child,
-                    (
-                        ProgNode,
-                        AddressNode,
-                        ReturnNode,
-                        NotNode,
-                        PointerNode,
-                        IntPointerNode,
-                        FloatPointerNode,
-                        CharPointerNode,
-                        BoolPointerNode,
-                        PrintfNode,
-                    ),
-                ):
-                    idx = cst.children.index(child)
-                    cst.children[idx] = new_child
+        # Post-order, so the children of a node are collapsed before the node itself
+        for node in postorder(cst):
+            for idx, child in enumerate(node.children):
+                node.children[idx] = Parser.collapse(child)
 
         return cst
 
     @staticmethod
-    def const_folding(ast: TreeNode, changed=False) -> bool | None:
-        if not ast.children:
+    def collapse(node: TreeNode) -> TreeNode:
+        """
+        Replace a node with only one child by that child, except for the nodes for which the child is an operand
+        :param node: The node to collapse
+        :return: TreeNode : The child or the node itself
+        """
+        if len(node.children) == 1 and not isinstance(
+            node,
+            (
+                ProgNode,
+                AddressNode,
+                ReturnNode,
+                NotNode,
+                PointerNode,
+                IntPointerNode,
+                FloatPointerNode,
+                CharPointerNode,
+                BoolPointerNode,
+                PrintfNode,
+            ),
+        ):
+            return node.children[0]
+        return node
+
+
+class StreamingTokenStream(CommonTokenStream):
+    """
+    Token stream that can drop the tokens that are already parsed
+    """
+
+    def release_consumed(self) -> None:
+        """
+        Drop all tokens before the current token, only call this between top level rules
+        :return: None
+        """
+        if self.index <= 0:
             return
+        del self.tokens[: self.index]
+        for idx, token in enumerate(self.tokens):
+            token.tokenIndex = idx
+        self.index = 0
 
-        for child in ast.children:
-            Parser.const_folding(child, changed)
 
-        for child in ast.children:
-            if (
-                child.children is not None
-                and len(child.children) >= 2
-                and (
-                    not isinstance(child.children[0], IntNode)
-                    or not isinstance(child.children[1], IntNode)
-                )
-            ):
-                continue
-            new_child = None
-            if isinstance(child, PlusNode) and len(child.children) == 2:
-                new_child = IntNode(
-                    str(int(child.children[0].value) + int(child.children[1].value)),
-                    line_nr=child.line_nr,
-                )
-            elif isinstance(child, MinusNode) and len(child.children) == 2:
-                new_child = IntNode(
-                    str(int(child.children[0].value) - int(child.children[1].value)),
-                    line_nr=child.line_nr,
-                )
-            elif isinstance(child, MultNode):
-                new_child = IntNode(
-                    str(int(child.children[0].value) * int(child.children[1].value)),
-                    line_nr=child.line_nr,
-                )
-            elif isinstance(child, DivNode):
-                new_child = IntNode(
-                    str(int(child.children[0].value) // int(child.children[1].value)),
-                    line_nr=child.line_nr,
-                )
-            elif isinstance(child, ModNode):
-                new_child = IntNode(
-                    str(int(child.children[0].value) % int(child.children[1].value)),
-                    line_nr=child.line_nr,
-                )
-            elif isinstance(child, OrNode):
-                new_child = IntNode(
-                    str(int(child.children[0].value) or int(child.children[1].value)),
-                    line_nr=child.line_nr,
-                )
-            elif isinstance(child, AndNode):
-                new_child = IntNode(
-                    str(int(child.children[0].value) and int(child.children[1].value)),
-                    line_nr=child.line_nr,
-                )
-            elif isinstance(child, NotNode):
-                new_child = IntNode(
-                    str(int(not int(child.children[0].value))),
-                    line_nr=child.line_nr,
-                )
-            elif isinstance(child, GtNode):
-                new_child = IntNode(
-                    str(
-                        int(int(child.children[0].value) > int(child.children[1].value))
-                    ),
-                    line_nr=child.line_nr,
-                )
-            elif isinstance(child, LtNode):
-                new_child = IntNode(
-                    str(
-                        int(int(child.children[0].value) < int(child.children[1].value))
-                    ),
-                    line_nr=child.line_nr,
-                )
-            elif isinstance(child, GeqNode):
-                new_child = IntNode(
-                    str(
-                        int(
-                            int(child.children[0].value) <= int(child.children[1].value)
-                        )
-                    ),
-                    line_nr=child.line_nr,
-                )
-            elif isinstance(child, LeqNode):
-                new_child = IntNode(
-                    str(
-                        int(
-                            int(child.children[0].value) <= int(child.children[1].value)
-                        )
-                    ),
-                    line_nr=child.line_nr,
-                )
-            elif isinstance(child, NeqNode):
-                new_child = IntNode(
-                    str(
-                        int(
-                            int(child.children[0].value) != int(child.children[1].value)
-                        )
-                    ),
-                    line_nr=child.line_nr,
-                )
-            elif isinstance(child, LShiftNode):
-                if int(child.children[1].value) >= 0:
-                    new_child = IntNode(
-                        str(
-                            int(
-                                int(child.children[0].value)
-                                << int(child.children[1].value)
-                            )
-                        ),
-                        line_nr=child.line_nr,
-                    )
-                else:
-                    new_child = IntNode(
-                        str(
-                            int(
-                                int(child.children[0].value)
-                                >> -int(child.children[1].value)
-                            )
-                        ),
-                        line_nr=child.line_nr,
-                    )
-            elif isinstance(child, RShiftNode):
-                if int(child.children[1].value) >= 0:
-                    new_child = IntNode(
-                        str(
-                            int(
-                                int(child.children[0].value)
-                                >> int(child.children[1].value)
-                            )
-                        ),
-                        line_nr=child.line_nr,
-                    )
-                else:
-                    new_child = IntNode(
-                        str(
-                            int(
-                                int(child.children[0].value)
-                                << -int(child.children[1].value)
-                            )
-                        ),
-                        line_nr=child.line_nr,
-                    )
-            elif isinstance(child, BitXorNode):
-                new_child = IntNode(
-                    str(
-                        int(int(child.children[0].value) ^ int(child.children[1].value))
-                    ),
-                    line_nr=child.line_nr,
-                )
-            elif isinstance(child, BitAndNode):
-                new_child = IntNode(
-                    str(
-                        int(int(child.children[0].value) & int(child.children[1].value))
-                    ),
-                    line_nr=child.line_nr,
-                )
-            elif isinstance(child, BitOrNode):
-                new_child = IntNode(
-                    str(
-                        int(int(child.children[0].value) & int(child.children[1].value))
-                    ),
-                    line_nr=child.line_nr,
-                )
+# Token type of the 'main' keyword, an implicit token of the grammar
+MAIN_TOKEN: int = CParser.literalNames.index("'main'")
+
+# Setup of the parser for every parse mode
+PARSE_MODES: dict[str, Callable[[CParser], None]] = {
+    "ll": Parser.use_ll,
+    "sll": Parser.use_sll,
+}
 
-            if new_child is not None:
-                idx = ast.children.index(child)
-                ast.children[idx] = new_child
-                changed = True
+# Lexer class of every lexer option
+LEXERS: dict[str, Callable[[InputStream], TokenSource]] = {
+    "antlr": CLexer,
+    "fast": FastLexer,
+}
 
-        return changed
+# Node of every operator sign
+OPERATOR_NODES: dict[str, type] = {
+    "+": PlusNode,
+    "-": MinusNode,
+    "*": MultNode,
+    "/": DivNode,
+    "%": ModNode,
+    ">>": RShiftNode,
+    "<<": LShiftNode,
+    "==": EqualNode,
+    "!=": NeqNode,
+    "<": LtNode,
+    ">": GtNode,
+    "<=": LeqNode,
+    ">=": GeqNode,
+    "&&": AndNode,
+    "||": OrNode,
+    "!": NotNode,
+}
 
-    @staticmethod
-    def const_prop(
-        ast: TreeNode,
-        symbol_table: SymbolTable,
-    ) -> bool | None:
-        class ValueEntry:
-            def __init__(self, id: str, value: str):
-                self.id: str = id
-                self.value: str = value
-
-        const_values: [ValueEntry] = []
-
-        def get_const_value(id: str) -> str | None:
-            for entry in const_values:
-                if entry.id == id:
-                    return entry.value
-            return None
-
-        def const_prop_recur(ast: TreeNode, changed=False) -> bool | None:
-            if ast.children is None:
-                return
-
-            for child in ast.children:
-                const_prop_recur(child)
-
-            # Store new constant variables
-            if (
-                isinstance(ast, NewVariableNode)
-                and isinstance(ast.children[0], ConstNode)
-                and isinstance(
-                    ast.children[-1], (IntNode, FloatNode, CharNode, BoolNode)
-                )
-            ):
-                const_values.append(
-                    ValueEntry(ast.children[-2].value, ast.children[-1].value)
-                )
+# Node of every other kind of token, the text of the token is the value of the node
+TOKEN_NODES: dict[int, type] = {
+    CParser.INT: IntNode,
+    CParser.POINTER: PointerNode,
+    CParser.FLOAT: FloatNode,
+    CParser.STRING: StringNode,
+    CParser.ID: IdNode,
+    CParser.AMPERSAND: AddressNode,
+    CParser.BITOR: BitOrNode,
+    CParser.BITXOR: BitXorNode,
+    CParser.BITNOT: BitNotNode,
+    CParser.RETURN: ReturnNode,
+    CParser.CHAR: CharNode,
+    CParser.TYPE: TypeNode,
+    CParser.BOOL: BoolNode,
+    CParser.LINE_COMMENT: CommentNode,
+    CParser.COMMENT: CommentNode,
+    CParser.PLUSPLUS: UnaryPlusNode,
+    CParser.MINUSMINUS: UnaryMinusNode,
+}
 
-            # Check if right id is constant at new assignments
-            if (
-                isinstance(ast, (NewVariableNode, AssignNode))
-                and isinstance(ast.children[-1], IdNode)
-                and symbol_table.find_entry(ast.children[-1].value).const
-            ):
-                const_value = get_const_value(ast.children[-1].value)
-                if const_value is not None:
-                    match symbol_table.find_entry(ast.children[-1].value).type:
-                        case SymbolTableEntryType.Int:
-                            new_node = IntNode(const_value)
-                        case SymbolTableEntryType.Float:
-                            new_node = FloatNode(const_value)
-                        case SymbolTableEntryType.Char:
-                            new_node = CharNode(const_value)
-                        case SymbolTableEntryType.Bool:
-                            new_node = BoolNode(const_value)
-                    new_node.line_nr = ast.line_nr
-                    ast.children[-1] = new_node
-                    changed = True
-
-            if not isinstance(ast, (NewVariableNode, AssignNode, AddressNode)):
-                for child in ast.children:
-                    if (
-                        isinstance(child, IdNode)
-                        and symbol_table.find_entry(child.value).const
-                    ):
-                        const_value = get_const_value(ast.children[-1].value)
-                        if const_value is not None:
-                            match symbol_table.find_entry(ast.children[-1].value).type:
-                                case SymbolTableEntryType.Int:
-                                    new_node = IntNode(const_value)
-                                case SymbolTableEntryType.Float:
-                                    new_node = FloatNode(const_value)
-                                case SymbolTableEntryType.Char:
-                                    new_node = CharNode(const_value)
-                                case SymbolTableEntryType.Bool:
-                                    new_node = BoolNode(const_value)
-                            new_node.line_nr = ast.line_nr
-                            ast.children[-1] = new_node
-                            changed = True
-            return changed
-
-        return const_prop_recur(ast)
-
-
-operator_signs = {
-    "+",
-    "-",
-    "*",
-    "/",
-    "<",
-    ">",
-    "==",
-    "&&",
-    "||",
-    ">=",
-    "<=",
-    "!=",
-    "%",
-    ">>",
-    "<<",
-    "!",
+# Binary operator node built from the node of the operator sign in the middle of an expression
+BINARY_NODES: dict[NodeKind, type] = {
+    NodeKind.Plus: PlusNode,
+    NodeKind.Minus: MinusNode,
+    NodeKind.Mult: MultNode,
+    NodeKind.Div: DivNode,
+    NodeKind.Mod: ModNode,
+    NodeKind.LShift: LShiftNode,
+    NodeKind.RShift: RShiftNode,
+    NodeKind.Address: BitAndNode,  # '&' between two operands
+    NodeKind.BitOr: BitOrNode,
+    NodeKind.BitXor: BitXorNode,
+    NodeKind.Equal: EqualNode,
+    NodeKind.Neq: NeqNode,
+    NodeKind.Lt: LtNode,
+    NodeKind.Gt: GtNode,
+    NodeKind.Leq: LeqNode,
+    NodeKind.Geq: GeqNode,
+    NodeKind.And: AndNode,
+    NodeKind.Or: OrNode,
 }
 
 
@@ -353,6 +439,38 @@ class ASTVisitor(CVisitor):
     def __init__(self) -> None:
         self.typedefs = {}
         self.visited_main = False
+        self.results: dict[ParseTree, TreeNode | None] = {}
+
+    def visit(self, tree: ParseTree) -> TreeNode | None:
+        """
+        Visit a parse tree without recursing over its depth
+        The descendants of the tree are visited first in post-order with an explicit stack and their results are
+        kept, so when a visit method visits the children of its context they are looked up instead of visited
+        again. Visit methods therefore never nest deeper than one level, e.g. for a long chain of additions.
+        :param tree: The parse tree to visit
+        :return: TreeNode | None : The result of the visit method of the tree
+        """
+        if tree in self.results:
+            return self.results.pop(tree)
+
+        stack: list[tuple[ParseTree, bool]] = [
+            (tree.getChild(idx), False) for idx in reversed(range(tree.getChildCount()))
+        ]
+        while stack:
+            node, finished = stack.pop()
+            if not finished and node.getChildCount():
+                stack.append((node, True))
+                stack.extend(
+                    (node.getChild(idx), False)
+                    for idx in reversed(range(node.getChildCount()))
+                )
+                continue
+            self.results[node] = node.accept(self)
+
+        result = tree.accept(self)
+        # Drop the results of children a visit method didn't use
+        self.results.clear()
+        return result
 
     def visitProg(self, ctx: CParser.ProgContext):
         children = []
@@ -362,16 +480,22 @@ class ASTVisitor(CVisitor):
                 continue
             children.append(cstChild)
 
-        return ProgNode(line_nr=ctx.start.line, children=children)
+        return ProgNode(
+            line_nr=ctx.start.line, column=ctx.start.column, children=children
+        )
 
     def visitTypedef(self, ctx: compilerParser.TypedefContext):
-        c_type = ctx.children[1].getText()
-        new_type = ctx.children[2].getText()
+        ASTVisitor.add_typedef(
+            self.typedefs, ctx.children[1].getText(), ctx.children[2].getText()
+        )
+
+    @staticmethod
+    def add_typedef(typedefs: dict[str, str], c_type: str, new_type: str) -> None:
         if new_type in ["int", "float", "char"]:
             raise Exception(
                 f"Type {new_type} is a reserved keyword and cannot be used as a typedef."
             )
-        self.typedefs[new_type] = c_type
+        typedefs[new_type] = c_type
 
     def visitMain(self, ctx: compilerParser.MainContext):
         children = []
@@ -382,7 +506,9 @@ class ASTVisitor(CVisitor):
                 continue
             children.append(cstChild)
 
-        return MainNode(line_nr=ctx.start.line, children=children)
+        return MainNode(
+            line_nr=ctx.start.line, column=ctx.start.column, children=children
+        )
 
     def visitStat(self, ctx: CParser.StatContext):
         children = []
@@ -392,7 +518,9 @@ class ASTVisitor(CVisitor):
                 continue
             children.append(cstChild)
 
-        return StatNode(line_nr=ctx.start.line, children=children)
+        return StatNode(
+            line_nr=ctx.start.line, column=ctx.start.column, children=children
+        )
 
     def visitPrintf(self, ctx: compilerParser.PrintfContext):
         children = []
@@ -402,9 +530,25 @@ class ASTVisitor(CVisitor):
                 continue
             children.append(cstChild)
 
-        return PrintfNode(line_nr=ctx.start.line, children=children)
+        return PrintfNode(
+            line_nr=ctx.start.line, column=ctx.start.column, children=children
+        )
+
+    def visitReturnStat(self, ctx: CParser.ReturnStatContext) -> ReturnNode:
+        return ReturnNode(
+            line_nr=ctx.start.line,
+            column=ctx.start.column,
+            children=[self.visit(ctx.children[1])],
+        )
 
-    def visitExpr(self, ctx: CParser.ExprContext):
+    def visitExpr(self, ctx: CParser.ExprContext) -> TreeNode:
+        """
+        Visit one precedence level of an expression, e.g. additive: multiplicative (('+' | '-') multiplicative)*
+        The operators of a level are left associative, a + b - c is built as (a + b) - c. A level with only one
+        operand returns that operand, so no node is built for the levels an operand passes through.
+        :param ctx: The context of the precedence level
+        :return: TreeNode : The operand or the binary operator nodes
+        """
         children = []
         for child in ctx.children:
             cstChild = self.visit(child)
@@ -412,108 +556,72 @@ class ASTVisitor(CVisitor):
                 continue
             children.append(cstChild)
 
-        # Check which expression
-        if len(children) == 3:
-            middle = children[1]
-            if isinstance(middle, PlusNode):
-                return PlusNode(
-                    line_nr=ctx.start.line, children=[children[0], children[2]]
-                )
-            elif isinstance(middle, MinusNode):
-                return MinusNode(
-                    line_nr=ctx.start.line, children=[children[0], children[2]]
-                )
-            elif isinstance(middle, MultNode):
-                return MultNode(
-                    line_nr=ctx.start.line, children=[children[0], children[2]]
-                )
-            elif isinstance(middle, DivNode):
-                return DivNode(
-                    line_nr=ctx.start.line, children=[children[0], children[2]]
-                )
-            elif isinstance(middle, ModNode):
-                return ModNode(
-                    line_nr=ctx.start.line, children=[children[0], children[2]]
-                )
-            elif isinstance(middle, LShiftNode):
-                return LShiftNode(
-                    line_nr=ctx.start.line, children=[children[0], children[2]]
-                )
-            elif isinstance(middle, RShiftNode):
-                return RShiftNode(
-                    line_nr=ctx.start.line, children=[children[0], children[2]]
-                )
-            elif isinstance(middle, AddressNode):
-                return BitAndNode(
-                    line_nr=ctx.start.line, children=[children[0], children[2]]
-                )
-            elif isinstance(middle, BitOrNode):
-                return BitOrNode(
-                    line_nr=ctx.start.line, children=[children[0], children[2]]
-                )
-            elif isinstance(middle, BitXorNode):
-                return BitXorNode(
-                    line_nr=ctx.start.line, children=[children[0], children[2]]
-                )
-            elif isinstance(middle, BitNotNode):
-                return BitNotNode(
-                    line_nr=ctx.start.line, children=[children[0], children[2]]
-                )
-            elif isinstance(middle, EqualNode):
-                return EqualNode(
-                    line_nr=ctx.start.line, children=[children[0], children[2]]
-                )
-            elif isinstance(middle, NeqNode):
-                return NeqNode(
-                    line_nr=ctx.start.line, children=[children[0], children[2]]
-                )
-            elif isinstance(middle, LtNode):
-                return LtNode(
-                    line_nr=ctx.start.line, children=[children[0], children[2]]
-                )
-            elif isinstance(middle, GtNode):
-                return GtNode(
-                    line_nr=ctx.start.line, children=[children[0], children[2]]
-                )
-            elif isinstance(middle, LeqNode):
-                return LeqNode(
-                    line_nr=ctx.start.line, children=[children[0], children[2]]
-                )
-            elif isinstance(middle, GeqNode):
-                return GeqNode(
-                    line_nr=ctx.start.line, children=[children[0], children[2]]
-                )
-            elif isinstance(middle, AndNode):
-                return AndNode(
-                    line_nr=ctx.start.line, children=[children[0], children[2]]
-                )
-            elif isinstance(middle, OrNode):
-                return OrNode(
-                    line_nr=ctx.start.line, children=[children[0], children[2]]
-                )
-        if len(children) == 2:
-            if isinstance(children[0], ReturnNode):
-                return ReturnNode(line_nr=ctx.start.line, children=[children[1]])
-            if isinstance(children[0], NotNode):
-                return NotNode(line_nr=ctx.start.line, children=[children[1]])
-            if isinstance(children[0], PlusNode):
-                return children[1]
-            if isinstance(children[0], MinusNode) and children[0].children == []:
-                try:
-                    if isinstance(children[1].children[0].children[0], IntNode):
-                        return IntNode(
-                            "-" + children[1].children[0].children[0].value,
-                            line_nr=children[1].line_nr,
-                        )
-                    if isinstance(children[1].children[0].children[0], FloatNode):
-                        return FloatNode(
-                            "-" + children[1].children[0].children[0].value,
-                            line_nr=children[1].line_nr,
-                        )
-                except:
-                    pass
-
-        return ExprNode(line_nr=ctx.start.line, children=children)
+        node = children[0]
+        for idx in range(1, len(children) - 1, 2):
+            node = BINARY_NODES[children[idx].kind](
+                line_nr=ctx.start.line,
+                column=ctx.start.column,
+                children=[node, children[idx + 1]],
+            )
+        return node
+
+    # Every precedence level is built the same way
+    visitLogicalAnd = visitExpr
+    visitBitwiseOr = visitExpr
+    visitBitwiseXor = visitExpr
+    visitBitwiseAnd = visitExpr
+    visitEquality = visitExpr
+    visitRelational = visitExpr
+    visitShift = visitExpr
+    visitAdditive = visitExpr
+    visitMultiplicative = visitExpr
+    visitPrimary = visitExpr  # the operand, or the expr between parentheses
+
+    def visitUnary(self, ctx: CParser.UnaryContext) -> TreeNode:
+        children = []
+        for child in ctx.children:
+            cstChild = self.visit(child)
+            if cstChild is None:
+                continue
+            children.append(cstChild)
+
+        if len(children) == 1:
+            return children[0]
+        return ASTVisitor.unary_node(children, ctx.start.line, ctx.start.column)
+
+    @staticmethod
+    def unary_node(children: list[TreeNode], line_nr: int, column: int) -> TreeNode:
+        """
+        Build the node of a prefix operator
+        :param children: The node of the operator sign and the operand
+        :param line_nr: Line of the operator
+        :param column: Column of the operator
+        :return: TreeNode : The node of the operator, or the operand for '+' and a negative literal for '-'
+        """
+        operator, operand = children
+        if isinstance(operator, NotNode):
+            return NotNode(
+                line_nr=line_nr,
+                column=column,
+                children=[operand],
+            )
+        if isinstance(operator, BitNotNode):
+            return BitNotNode(
+                line_nr=line_nr,
+                column=column,
+                children=[operand],
+            )
+        if isinstance(operator, PlusNode):
+            return operand
+        # Negative literals are literals
+        if isinstance(operand, LiteralNode) and isinstance(
+            operand.children[0], (IntNode, FloatNode)
+        ):
+            literal = operand.children[0]
+            return literal.__class__(
+                "-" + literal.value, line_nr=operand.line_nr, column=operand.column
+            )
+        return ExprNode(line_nr=line_nr, column=column, children=children)
 
     def visitVariable(self, ctx: CParser.VariableContext) -> VariableNode:
         children = []
@@ -523,38 +631,48 @@ class ASTVisitor(CVisitor):
                 continue
             children.append(cstChild)
 
-        return VariableNode(line_nr=ctx.start.line, children=children)
+        return VariableNode(
+            line_nr=ctx.start.line, column=ctx.start.column, children=children
+        )
 
     def visitUnaryplusplus(self, ctx: CParser.UnaryplusplusContext) -> AssignNode:
         if ctx.children[0].getText() == "++":
             var = self.visit(ctx.children[1])
         else:
             var = self.visit(ctx.children[0])
-
-        return AssignNode(
-            line_nr=ctx.start.line,
-            children=[
-                var,
-                PlusNode(
-                    [copy.deepcopy(var), IntNode("1", line_nr=ctx.start.line)],
-                    line_nr=ctx.start.line,
-                ),
-            ],
-        )
+        return ASTVisitor.step_node(PlusNode, var, ctx.start.line, ctx.start.column)
 
     def visitUnaryminusminus(self, ctx: CParser.UnaryminusminusContext) -> AssignNode:
         if ctx.children[0].getText() == "--":
             var = self.visit(ctx.children[1])
         else:
             var = self.visit(ctx.children[0])
+        return ASTVisitor.step_node(MinusNode, var, ctx.start.line, ctx.start.column)
 
+    @staticmethod
+    def step_node(
+        operator: type, var: TreeNode, line_nr: int, column: int
+    ) -> AssignNode:
+        """
+        Build the assignment of an increment or decrement, x++ is x = x + 1
+        :param operator: PlusNode or MinusNode
+        :param var: The variable
+        :param line_nr: Line of the increment or decrement
+        :param column: Column of the increment or decrement
+        :return: AssignNode : The assignment
+        """
         return AssignNode(
-            line_nr=ctx.start.line,
+            line_nr=line_nr,
+            column=column,
             children=[
                 var,
-                MinusNode(
-                    [copy.deepcopy(var), IntNode("1", line_nr=ctx.start.line)],
-                    line_nr=ctx.start.line,
+                operator(
+                    [
+                        copy.deepcopy(var),
+                        IntNode("1", line_nr=line_nr, column=column),
+                    ],
+                    line_nr=line_nr,
+                    column=column,
                 ),
             ],
         )
@@ -566,34 +684,64 @@ class ASTVisitor(CVisitor):
             if cstChild is None:
                 continue
             children.append(cstChild)
+        return ASTVisitor.new_variable_node(
+            self.typedefs, children, ctx.start.line, ctx.start.column
+        )
+
+    @staticmethod
+    def new_variable_node(
+        typedefs: dict[str, str], children: list[TreeNode], line_nr: int, column: int
+    ) -> NewVariableNode:
+        """
+        Build the node of a declaration from the nodes of its parts
+        :param typedefs: The typedefs declared before the declaration
+        :param children: The const, type, variable or pointer, cast type and value nodes in source order
+        :param line_nr: Line of the declaration
+        :param column: Column of the declaration
+        :return: NewVariableNode : The declaration
+        """
         const_node = isinstance(children[0], ConstNode)
         explicit_conversion = isinstance(children[2 + const_node], TypeNode)
         type_node = children[0 + const_node]
         pointer_node = children[1 + const_node]
         pointer_idx = 1 + const_node
-        if self.typedefs.get(type_node.value):
-            type = self.typedefs.get(type_node.value)
-            children[0 + const_node] = TypeNode(type, line_nr=type_node.line_nr)
+        if typedefs.get(type_node.value):
+            type = typedefs.get(type_node.value)
+            children[0 + const_node] = TypeNode(
+                type, line_nr=type_node.line_nr, column=type_node.column
+            )
         if isinstance(pointer_node, PointerNode):
             match type_node.value:
                 case "int":
                     children[pointer_idx] = IntPointerNode(
-                        pointer_node.depth, pointer_node.children, pointer_node.line_nr
+                        pointer_node.depth,
+                        pointer_node.children,
+                        pointer_node.line_nr,
+                        pointer_node.column,
                     )
                     type_node.value = "int*"
                 case "float":
                     children[pointer_idx] = FloatPointerNode(
-                        pointer_node.depth, pointer_node.children, pointer_node.line_nr
+                        pointer_node.depth,
+                        pointer_node.children,
+                        pointer_node.line_nr,
+                        pointer_node.column,
                     )
                     type_node.value = "float*"
                 case "char":
                     children[pointer_idx] = CharPointerNode(
-                        pointer_node.depth, pointer_node.children, pointer_node.line_nr
+                        pointer_node.depth,
+                        pointer_node.children,
+                        pointer_node.line_nr,
+                        pointer_node.column,
                     )
                     type_node.value = "char*"
                 case "bool":
                     children[pointer_idx] = BoolPointerNode(
-                        pointer_node.depth, pointer_node.children, pointer_node.line_nr
+                        pointer_node.depth,
+                        pointer_node.children,
+                        pointer_node.line_nr,
+                        pointer_node.column,
                     )
                     type_node.value = "bool*"
 
@@ -601,9 +749,11 @@ class ASTVisitor(CVisitor):
             type = children[2 + const_node]
             children.pop(2 + const_node)
             children[2 + const_node] = ConvertNode(
-                children=[type, children[2 + const_node]], line_nr=type.line_nr
+                children=[type, children[2 + const_node]],
+                line_nr=type.line_nr,
+                column=type.column,
             )
-        return NewVariableNode(line_nr=ctx.start.line, children=children)
+        return NewVariableNode(line_nr=line_nr, column=column, children=children)
 
     def visitPointer(self, ctx: CParser.PointerContext) -> PointerNode:
         children = []
@@ -617,7 +767,12 @@ class ASTVisitor(CVisitor):
                 continue
             children.append(cstChild)
 
-        return PointerNode(pointer_depth, line_nr=ctx.start.line, children=children)
+        return PointerNode(
+            pointer_depth,
+            line_nr=ctx.start.line,
+            column=ctx.start.column,
+            children=children,
+        )
 
     def visitAddress(self, ctx: CParser.AddressContext) -> AddressNode:
         children = []
@@ -627,7 +782,9 @@ class ASTVisitor(CVisitor):
                 continue
             children.append(cstChild)
 
-        return AddressNode(line_nr=ctx.start.line, children=children)
+        return AddressNode(
+            line_nr=ctx.start.line, column=ctx.start.column, children=children
+        )
 
     def visitAssignment(self, ctx: CParser.AssignmentContext) -> AssignNode:
         children = []
@@ -637,7 +794,9 @@ class ASTVisitor(CVisitor):
                 continue
             children.append(cstChild)
 
-        return AssignNode(line_nr=ctx.start.line, children=children)
+        return AssignNode(
+            line_nr=ctx.start.line, column=ctx.start.column, children=children
+        )
 
     def visitLiteral(self, ctx: CParser.LiteralContext) -> LiteralNode:
         children = []
@@ -647,88 +806,31 @@ class ASTVisitor(CVisitor):
                 continue
             children.append(cstChild)
 
-        return LiteralNode(line_nr=ctx.start.line, children=children)
+        return LiteralNode(
+            line_nr=ctx.start.line, column=ctx.start.column, children=children
+        )
 
     def visitTerminal(self, node: TerminalNode) -> TreeNode:
-        text = node.getText()
-
-        if text in operator_signs:
-            match text:
-                case "+":
-                    return PlusNode(line_nr=node.symbol.line)
-                case "-":
-                    return MinusNode(line_nr=node.symbol.line)
-                case "*":
-                    return MultNode(line_nr=node.symbol.line)
-                case "/":
-                    return DivNode(line_nr=node.symbol.line)
-                case "%":
-                    return ModNode(line_nr=node.symbol.line)
-                case ">>":
-                    return RShiftNode(line_nr=node.symbol.line)
-                case "<<":
-                    return LShiftNode(line_nr=node.symbol.line)
-                case "==":
-                    return EqualNode(line_nr=node.symbol.line)
-                case "!=":
-                    return NeqNode(line_nr=node.symbol.line)
-                case "<":
-                    return LtNode(line_nr=node.symbol.line)
-                case ">":
-                    return GtNode(line_nr=node.symbol.line)
-                case "<=":
-                    return LeqNode(line_nr=node.symbol.line)
-                case ">=":
-                    return GeqNode(line_nr=node.symbol.line)
-                case "&&":
-                    return AndNode(line_nr=node.symbol.line)
-                case "||":
-                    return OrNode(line_nr=node.symbol.line)
-                case "!":
-                    return NotNode(line_nr=node.symbol.line)
-                case "&":
-                    return AddressNode(line_nr=node.symbol.line)
-                case _:
-                    raise Exception(f"Unknown operator: {text}")
-                # TODO: Add more cases
-        match node.symbol.type:
-            case CParser.INT:
-                return IntNode(text, line_nr=node.symbol.line)
-            case CParser.POINTER:
-                return PointerNode(text, line_nr=node.symbol.line)
-            case CParser.FLOAT:
-                return FloatNode(text, line_nr=node.symbol.line)
-            case CParser.STRING:
-                return StringNode(text, line_nr=node.symbol.line)
-            case CParser.ID:
-                if text in ("true", "false"):
-                    return BoolNode(text, line_nr=node.symbol.line)
-                return IdNode(text, line_nr=node.symbol.line)
-            case CParser.POINTER:
-                return PointerNode(text, line_nr=node.symbol.line)
-            case CParser.AMPERSAND:
-                return AddressNode(text, line_nr=node.symbol.line)
-            case CParser.BITOR:
-                return BitOrNode(text, line_nr=node.symbol.line)
-            case CParser.BITXOR:
-                return BitXorNode(text, line_nr=node.symbol.line)
-            case CParser.BITNOT:
-                return BitNotNode(text, line_nr=node.symbol.line)
-            case CParser.RETURN:
-                return ReturnNode(text, line_nr=node.symbol.line)
-            case CParser.CONST:
-                return ConstNode(line_nr=node.symbol.line)
-            case CParser.CHAR:
-                return CharNode(text, line_nr=node.symbol.line)
-            case CParser.TYPE:
-                return TypeNode(text, line_nr=node.symbol.line)
-            case CParser.BOOL:
-                return BoolNode(text, line_nr=node.symbol.line)
-            case CParser.LINE_COMMENT:
-                return CommentNode(text, line_nr=node.symbol.line)
-            case CParser.COMMENT:
-                return CommentNode(text, line_nr=node.symbol.line)
-            case CParser.PLUSPLUS:
-                return UnaryPlusNode(text, line_nr=node.symbol.line)
-            case CParser.MINUSMINUS:
-                return UnaryMinusNode(text, line_nr=node.symbol.line)
+        return ASTVisitor.terminal_node(node.symbol)
+
+    @staticmethod
+    def terminal_node(token: Token) -> TreeNode | None:
+        """
+        Build the node of a token
+        :param token: The token
+        :return: TreeNode | None : The node, None for tokens without a node like parentheses and semicolons
+        """
+        text = token.text
+
+        operator_node = OPERATOR_NODES.get(text)
+        if operator_node is not None:
+            return operator_node(line_nr=token.line, column=token.column)
+
+        token_type = token.type
+        if token_type == CParser.ID and text in ("true", "false"):
+            return BoolNode(text, line_nr=token.line, column=token.column)
+        if token_type == CParser.CONST:
+            return ConstNode(line_nr=token.line, column=token.column)
+        token_node = TOKEN_NODES.get(token_type)
+        if token_node is not None:
+            return token_node(text, line_nr=token.line, column=token.column)
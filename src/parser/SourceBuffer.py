@@ -0,0 +1,99 @@
+import mmap
+import re
+from array import array
+
+NON_ASCII = re.compile(rb"[\x80-\xff]")
+
+
+class SourceBuffer:
+    """
+    The bytes of one source file, read once and shared by the lexer input and the line comments of the converter
+    A file is memory-mapped instead of read, lines are sliced from the buffer with an index of the line offsets
+    instead of splitting the source in a list of lines.
+    """
+
+    def __init__(self, data: bytes | mmap.mmap, name: str = "<string>") -> None:
+        self.data: bytes | mmap.mmap = data
+        self.name: str = name
+        self._text: str | None = None
+        # Offset of the first character of every line, built on the first line lookup
+        self._line_offsets: array | None = None
+
+    @staticmethod
+    def open(path: str) -> "SourceBuffer":
+        """
+        Memory-map a source file, close the buffer when it isn't used anymore
+        :param path: The path of the source file
+        :return: SourceBuffer : The buffer of the file
+        """
+        with open(path, "rb") as f:
+            try:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # An empty file can't be mapped
+                data = b""
+        return SourceBuffer(data, path)
+
+    @staticmethod
+    def from_string(source: str) -> "SourceBuffer":
+        return SourceBuffer(source.encode("utf-8"))
+
+    def __enter__(self) -> "SourceBuffer":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    @property
+    def text(self) -> str:
+        """
+        The decoded source, decoded once when it is first needed
+        :return: str : The source code
+        """
+        if self._text is None:
+            self._text = str(self.data, "utf-8")
+        return self._text
+
+    @property
+    def is_ascii(self) -> bool:
+        # Every byte is a character, the buffer can be indexed like the text. Searched in the buffer, so checking
+        # doesn't decode the source.
+        if self._text is not None:
+            return len(self._text) == len(self.data)
+        return NON_ASCII.search(self.data) is None
+
+    @property
+    def line_offsets(self) -> array:
+        if self._line_offsets is None:
+            offsets = array("q", [0])
+            find = self.data.find
+            newline = find(b"\n")
+            while newline != -1:
+                offsets.append(newline + 1)
+                newline = find(b"\n", newline + 1)
+            self._line_offsets = offsets
+        return self._line_offsets
+
+    @property
+    def line_count(self) -> int:
+        return len(self.line_offsets)
+
+    def line(self, line_nr: int) -> str:
+        """
+        Returns one line of the source without the line ending, lines are counted from 1 like the lexer does
+        :param line_nr: The line number
+        :return: str : The line, an empty string if the source has no such line
+        """
+        offsets = self.line_offsets
+        if line_nr < 1 or line_nr > len(offsets):
+            return ""
+        start = offsets[line_nr - 1]
+        end = offsets[line_nr] - 1 if line_nr < len(offsets) else len(self.data)
+        return str(self.data[start:end], "utf-8").rstrip("\r")
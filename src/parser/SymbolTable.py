@@ -1,6 +1,12 @@
 from enum import Enum
+from typing import TYPE_CHECKING
+
 from src.parser.TreeNode import *
-from llvmlite import ir
+from src.parser.Walker import walk
+
+if TYPE_CHECKING:
+    # llvmlite is only imported when the LLVM target is compiled
+    from llvmlite import ir
 
 
 class SymbolTableEntryType(Enum):
@@ -18,37 +24,77 @@ class SymbolTableEntry:
         type: SymbolTableEntryType,
         const: bool = False,
         declaration_line: int = -1,
-        llvm_var: ir.Value = None,
+        llvm_var: "ir.Value" = None,
     ) -> None:
         self.name: str = name
         self.type: SymbolTableEntryType = type
         self.const: bool = const
         self.declaration_line: int = declaration_line
-        self.llvm_var: ir.Value = llvm_var
+        self.llvm_var: "ir.Value" = llvm_var
 
 
 class Table:
     def __init__(self, parent_id: int = -1):
-        self.table: list[SymbolTableEntry] = []
+        # Entries by name, dicts keep insertion order so the table is still printed in declaration order
+        self.table: dict[str, SymbolTableEntry] = {}
         self.parent_id: int = parent_id
         self.type: SymbolTableEntryType = type  # TreeNode type
 
     def __repr__(self) -> str:
         string: str = ""
-        for entry in self.table:
+        for entry in self.table.values():
             string += (
                 f"id: {entry.name}, type: {entry.type.name}, constant: {entry.const}\n"
             )
         return string
 
     def add_entry(self, entry: SymbolTableEntry):
-        self.table.append(entry)
+        self.table[entry.name] = entry
 
 
 class SymbolTable:
     pass
 
 
+# Kinds of nodes that always have the same type
+KIND_TYPES: dict[NodeKind, SymbolTableEntryType] = {
+    NodeKind.Int: SymbolTableEntryType.Int,
+    NodeKind.Float: SymbolTableEntryType.Float,
+    NodeKind.String: SymbolTableEntryType.String,
+    NodeKind.Char: SymbolTableEntryType.Char,
+    NodeKind.Bool: SymbolTableEntryType.Bool,
+    NodeKind.Equal: SymbolTableEntryType.Bool,
+    NodeKind.Neq: SymbolTableEntryType.Bool,
+    NodeKind.Lt: SymbolTableEntryType.Bool,
+    NodeKind.Gt: SymbolTableEntryType.Bool,
+    NodeKind.Leq: SymbolTableEntryType.Bool,
+    NodeKind.Geq: SymbolTableEntryType.Bool,
+    NodeKind.Mod: SymbolTableEntryType.Int,
+    NodeKind.And: SymbolTableEntryType.Bool,
+    NodeKind.Or: SymbolTableEntryType.Bool,
+    NodeKind.Not: SymbolTableEntryType.Bool,
+}
+
+# Kinds of nodes that have the type of their first child
+FIRST_CHILD_TYPE_KINDS: set[NodeKind] = {
+    NodeKind.Plus,
+    NodeKind.Mult,
+    NodeKind.Div,
+    NodeKind.Minus,
+    NodeKind.Address,
+    NodeKind.Pointer,
+    NodeKind.Assign,  # e.g. int a = number++;
+    NodeKind.Convert,
+}
+
+TYPE_NAMES: dict[str, SymbolTableEntryType] = {
+    "int": SymbolTableEntryType.Int,
+    "float": SymbolTableEntryType.Float,
+    "char": SymbolTableEntryType.Char,
+    "bool": SymbolTableEntryType.Bool,
+}
+
+
 def node_to_symbolTableEntryType(
     node: TreeNode, symbol_table: SymbolTable
 ) -> SymbolTableEntryType:
@@ -58,63 +104,20 @@ def node_to_symbolTableEntryType(
     :param symbol_table: The symboltable to look up the type of an id
     :return:
     """
-    if isinstance(node, IntNode):
-        return SymbolTableEntryType.Int
-    if isinstance(node, FloatNode):
-        return SymbolTableEntryType.Float
-    if isinstance(node, StringNode):
-        return SymbolTableEntryType.String
-    if isinstance(node, CharNode):
-        return SymbolTableEntryType.Char
-    if isinstance(node, (PlusNode, MultNode, DivNode, MinusNode)):
-        return node_to_symbolTableEntryType(node.children[0], symbol_table)
-    if isinstance(node, IdNode):
-        return symbol_table.find_entry(node.value).type
-    if isinstance(node, EqualNode):
-        return SymbolTableEntryType.Bool
-    if isinstance(node, NeqNode):
-        return SymbolTableEntryType.Bool
-    if isinstance(node, LtNode):
-        return SymbolTableEntryType.Bool
-    if isinstance(node, GtNode):
-        return SymbolTableEntryType.Bool
-    if isinstance(node, LeqNode):
-        return SymbolTableEntryType.Bool
-    if isinstance(node, GeqNode):
-        return SymbolTableEntryType.Bool
-    if isinstance(node, ModNode):
-        return SymbolTableEntryType.Int
-    if isinstance(node, AndNode):
-        return SymbolTableEntryType.Bool
-    if isinstance(node, OrNode):
-        return SymbolTableEntryType.Bool
-    if isinstance(node, NotNode):
-        return SymbolTableEntryType.Bool
-    if isinstance(node, CharNode):
-        return SymbolTableEntryType.Char
-    if isinstance(node, BoolNode):
-        return SymbolTableEntryType.Bool
-    if isinstance(node, AddressNode):
-        return node_to_symbolTableEntryType(node.children[0], symbol_table)
-    if isinstance(node, PointerNode):
-        return node_to_symbolTableEntryType(node.children[0], symbol_table)
-    if isinstance(node, AssignNode):
-        # e.g. int a = number++;
-        return node_to_symbolTableEntryType(node.children[0], symbol_table)
-    if isinstance(node, ConvertNode):
-        return node_to_symbolTableEntryType(node.children[0], symbol_table)
-    if isinstance(node, TypeNode):
-        match node.value:
-            case "int":
-                return SymbolTableEntryType.Int
-            case "float":
-                return SymbolTableEntryType.Float
-            case "char":
-                return SymbolTableEntryType.Char
-            case "bool":
-                return SymbolTableEntryType.Bool
-            case _:
-                raise ValueError(f"Invalid type: {node.value}")
+    # Follow the first children with a loop instead of recursion, a long chain of additions nests as deep as it is long
+    while node.kind in FIRST_CHILD_TYPE_KINDS:
+        node = node.children[0]
+
+    entry_type = KIND_TYPES.get(node.kind)
+    if entry_type is not None:
+        return entry_type
+    if node.kind == NodeKind.Id:
+        return symbol_table.lookup(node).type
+    if node.kind == NodeKind.Type:
+        entry_type = TYPE_NAMES.get(node.value)
+        if entry_type is None:
+            raise ValueError(f"Invalid type: {node.value}")
+        return entry_type
 
     raise ValueError(f"Invalid node type: {node.__class__.__name__}")
 
@@ -141,58 +144,135 @@ class SymbolTable:
         return string
 
     def build_symbol_table(self, tree: TreeNode) -> None:
-        if isinstance(tree, MainNode):
-            self.tables.append(Table(parent_id=self.current_idx))
-            self.current_idx = len(self.tables) - 1
-
-        if isinstance(tree, NewVariableNode):
-            # Check for constant
-            type_node_idx = 0
-            explicit_convert = False
-            if isinstance(tree.children[0], ConstNode):
-                type_node_idx = 1
-            if isinstance(tree.children[2], TypeNode):
-                explicit_convert = True
-
-            # Check for pointer
-            id_node = tree.children[type_node_idx + 1]
-            if isinstance(
-                tree.children[type_node_idx + 1],
-                (IntPointerNode, FloatPointerNode, CharPointerNode, BoolPointerNode),
-            ):
-                id_node = id_node.children[0]
-
-            # Check for existing entry
-            if self.find_entry_in_current_scope(id_node.value):
-                raise ValueError(f"error: redefinition of '{id_node.value}'")
-            # Create new entry
-            self.tables[self.current_idx].add_entry(
-                SymbolTableEntry(
-                    id_node.value,
-                    node_to_symbolTableEntryType(
-                        tree.children[type_node_idx + 2 + explicit_convert], self
+        walk(
+            tree,
+            enter={
+                MainNode: self.enter_main,
+                NewVariableNode: self.add_new_variable,
+            },
+        )
+
+    def enter_main(self, node: MainNode) -> None:
+        self.tables.append(Table(parent_id=self.current_idx))
+        self.current_idx = len(self.tables) - 1
+        node.scope_idx = self.current_idx
+
+    def add_new_variable(self, node: NewVariableNode) -> None:
+        # Check for constant
+        type_node_idx = 0
+        explicit_convert = False
+        if isinstance(node.children[0], ConstNode):
+            type_node_idx = 1
+        if isinstance(node.children[2], TypeNode):
+            explicit_convert = True
+
+        # Check for pointer
+        id_node = node.children[type_node_idx + 1]
+        if isinstance(
+            node.children[type_node_idx + 1],
+            (IntPointerNode, FloatPointerNode, CharPointerNode, BoolPointerNode),
+        ):
+            id_node = id_node.children[0]
+
+        # Check for existing entry
+        if self.find_entry_in_current_scope(id_node.value):
+            raise ValueError(f"error: redefinition of '{id_node.value}'")
+        # Create new entry
+        self.tables[self.current_idx].add_entry(
+            SymbolTableEntry(
+                id_node.value,
+                node_to_symbolTableEntryType(
+                    node.children[type_node_idx + 2 + explicit_convert], self
+                ),
+                len(node.children) == 4,
+                id_node.line_nr,
+            )
+        )
+
+    def resolve(
+        self,
+        tree: TreeNode,
+        scopes: list[dict[str, SymbolTableEntry]] | None = None,
+        scope_idx: int = 0,
+    ) -> None:
+        """
+        Bind every IdNode to the SymbolTableEntry it refers to, run once after build_symbol_table
+        Later passes read the entry from the node with lookup instead of searching the scopes for its name.
+        Like in C, a declaration is only visible after the statement that declares it.
+        :param tree: The root of the AST, or a statement that is resolved after the statements before it
+        :param scopes: Visible entries per scope of the statements before tree, innermost scope last, the
+        declarations of tree are added to the innermost scope
+        :param scope_idx: Index of the table of the innermost scope
+        :return: None
+        """
+        # Visible entries per scope, innermost scope last
+        if scopes is None:
+            scopes = [{}]
+        # None ends the innermost scope, a (declaration, entry) tuple makes its entry visible
+        stack: list = [tree]
+        while stack:
+            node = stack.pop()
+            if node is None:
+                scopes.pop()
+                continue
+            if isinstance(node, tuple):
+                id_node, entry = node
+                id_node.entry = entry
+                scopes[-1][entry.name] = entry
+                continue
+
+            if isinstance(node, MainNode):
+                scope_idx = node.scope_idx
+                scopes.append({})
+                stack.append(None)
+            elif isinstance(node, NewVariableNode):
+                type_node_idx = 1 if isinstance(node.children[0], ConstNode) else 0
+                id_node = node.children[type_node_idx + 1]
+                if isinstance(
+                    id_node,
+                    (
+                        IntPointerNode,
+                        FloatPointerNode,
+                        CharPointerNode,
+                        BoolPointerNode,
                     ),
-                    len(tree.children) == 4,
-                    id_node.line_nr,
+                ):
+                    id_node = id_node.children[0]
+                # The declared id becomes visible after the value is resolved, e.g. int a = a; uses an outer a
+                stack.append((id_node, self.tables[scope_idx].table[id_node.value]))
+                stack.extend(
+                    child for child in reversed(node.children) if child is not id_node
                 )
-            )
+                continue
+            elif isinstance(node, IdNode):
+                for scope in reversed(scopes):
+                    entry = scope.get(node.value)
+                    if entry is not None:
+                        node.entry = entry
+                        break
+
+            stack.extend(reversed(node.children))
 
-        for child in tree.children:
-            self.build_symbol_table(child)
+    def lookup(self, node: TreeNode) -> SymbolTableEntry | None:
+        """
+        Returns the entry of the variable a node refers to
+        Uses the entry bound by resolve, nodes that were not resolved are looked up by name in the current scope
+        :param node: The node of the variable, usually an IdNode
+        :return: SymbolTableEntry | None : The entry, None if the variable is not declared
+        """
+        entry = getattr(node, "entry", None)
+        if entry is not None:
+            return entry
+        return self.find_entry(node.value)
 
     def find_entry(self, name: str) -> SymbolTableEntry | None:
         table_idx = self.current_idx
         while table_idx != -1:
-            table = self.tables[table_idx].table
-            for entry in table:
-                if entry.name == name:
-                    return entry
+            entry = self.tables[table_idx].table.get(name)
+            if entry is not None:
+                return entry
             table_idx = self.tables[table_idx].parent_id
         return None
 
     def find_entry_in_current_scope(self, name: str) -> SymbolTableEntry | None:
-        table = self.tables[self.current_idx].table
-        for entry in table:
-            if entry.name == name:
-                return entry
-        return None
+        return self.tables[self.current_idx].table.get(name)
@@ -1,260 +1,513 @@
+from enum import IntEnum, auto
+
+
+class NodeKind(IntEnum):
+    """
+    Kind of a node, every node class has its own kind so passes can dispatch on it with a dict lookup
+    """
+
+    Prog = auto()
+    Convert = auto()
+    Equal = auto()
+    Return = auto()
+    Main = auto()
+    Stat = auto()
+    Expr = auto()
+    Literal = auto()
+    Variable = auto()
+    Assign = auto()
+    NewVariable = auto()
+    Plus = auto()
+    UnaryPlus = auto()
+    Gt = auto()
+    Neq = auto()
+    Lt = auto()
+    Eq = auto()
+    Geq = auto()
+    Leq = auto()
+    And = auto()
+    Or = auto()
+    Mod = auto()
+    LShift = auto()
+    Not = auto()
+    RShift = auto()
+    BitAnd = auto()
+    BitOr = auto()
+    BitXor = auto()
+    BitNot = auto()
+    Minus = auto()
+    UnaryMinus = auto()
+    Mult = auto()
+    Div = auto()
+    Int = auto()
+    Float = auto()
+    String = auto()
+    Comment = auto()
+    Id = auto()
+    Address = auto()
+    Const = auto()
+    Printf = auto()
+    Char = auto()
+    Type = auto()
+    Bool = auto()
+    Pointer = auto()
+    IntPointer = auto()
+    FloatPointer = auto()
+    CharPointer = auto()
+    BoolPointer = auto()
+
+
 class TreeNode:
-    def __init__(self, value: str, line_nr: int = -1, children=None) -> None:
+    # No per-instance __dict__, every node only stores its slots
+    __slots__ = ("value", "children", "line_nr", "column")
+    kind: NodeKind = None
+
+    def __init__(
+        self, value: str, line_nr: int = -1, children=None, column: int = -1
+    ) -> None:
         self.value = value
         self.children = children if children is not None else []
         self.line_nr = line_nr
+        self.column = column
 
 
 class ProgNode(TreeNode):
-    def __init__(self, children=None, line_nr: int = -1) -> None:
-        super().__init__("Prog", children=children, line_nr=line_nr)
+    __slots__ = ()
+    kind = NodeKind.Prog
+
+    def __init__(self, children=None, line_nr: int = -1, column: int = -1) -> None:
+        super().__init__("Prog", children=children, line_nr=line_nr, column=column)
+
 
 class ConvertNode(TreeNode):
-    def __init__(self, children=None, line_nr: int = -1):
-        super().__init__("Convert", children=children, line_nr=line_nr)
+    __slots__ = ()
+    kind = NodeKind.Convert
+
+    def __init__(self, children=None, line_nr: int = -1, column: int = -1):
+        super().__init__("Convert", children=children, line_nr=line_nr, column=column)
 
 
 class EqualNode(TreeNode):
-    def __init__(self, children=None, line_nr: int = -1):
-        super().__init__("Equal", children=children, line_nr=line_nr)
+    __slots__ = ()
+    kind = NodeKind.Equal
 
+    def __init__(self, children=None, line_nr: int = -1, column: int = -1):
+        super().__init__("Equal", children=children, line_nr=line_nr, column=column)
 
-class ReturnNode(TreeNode):
-    def __init__(self, children=None, line_nr: int = -1):
-        super().__init__("Return", children=children, line_nr=line_nr)
 
+class ReturnNode(TreeNode):
+    __slots__ = ()
+    kind = NodeKind.Return
 
-class MainNode(TreeNode):
-    def __init__(self, children=None, line_nr: int = None):
-        super().__init__("Main", children=children, line_nr=line_nr)
+    def __init__(self, children=None, line_nr: int = -1, column: int = -1):
+        super().__init__("Return", children=children, line_nr=line_nr, column=column)
 
 
 class MainNode(TreeNode):
-    def __init__(self, children=None, line_nr: int = -1) -> None:
-        super().__init__("Main", children=children, line_nr=line_nr)
+    __slots__ = ("scope_idx",)
+    kind = NodeKind.Main
+
+    def __init__(self, children=None, line_nr: int = -1, column: int = -1) -> None:
+        super().__init__("Main", children=children, line_nr=line_nr, column=column)
+        self.scope_idx = -1  # index of the scope of main in the symbol table
 
 
 class StatNode(TreeNode):
-    def __init__(self, children=None, line_nr: int = -1) -> None:
-        super().__init__("Stat", children=children, line_nr=line_nr)
+    __slots__ = ()
+    kind = NodeKind.Stat
+
+    def __init__(self, children=None, line_nr: int = -1, column: int = -1) -> None:
+        super().__init__("Stat", children=children, line_nr=line_nr, column=column)
 
 
 class ExprNode(TreeNode):
-    def __init__(self, children=None, line_nr: int = -1) -> None:
-        super().__init__("Expr", children=children, line_nr=line_nr)
+    __slots__ = ()
+    kind = NodeKind.Expr
+
+    def __init__(self, children=None, line_nr: int = -1, column: int = -1) -> None:
+        super().__init__("Expr", children=children, line_nr=line_nr, column=column)
 
 
 class LiteralNode(TreeNode):
-    def __init__(self, children=None, line_nr: int = -1) -> None:
-        super().__init__("Literal", children=children, line_nr=line_nr)
+    __slots__ = ()
+    kind = NodeKind.Literal
+
+    def __init__(self, children=None, line_nr: int = -1, column: int = -1) -> None:
+        super().__init__("Literal", children=children, line_nr=line_nr, column=column)
 
 
 class VariableNode(TreeNode):
-    def __init__(self, children=None, line_nr: int = -1) -> None:
-        super().__init__("Var", children=children, line_nr=line_nr)
+    __slots__ = ()
+    kind = NodeKind.Variable
+
+    def __init__(self, children=None, line_nr: int = -1, column: int = -1) -> None:
+        super().__init__("Var", children=children, line_nr=line_nr, column=column)
 
 
 class AssignNode(TreeNode):
-    def __init__(self, children=None, line_nr: int = -1) -> None:
-        super().__init__("Assignment", children=children, line_nr=line_nr)
+    __slots__ = ("converted",)
+    kind = NodeKind.Assign
+
+    def __init__(self, children=None, line_nr: int = -1, column: int = -1) -> None:
+        super().__init__(
+            "Assignment", children=children, line_nr=line_nr, column=column
+        )
         self.converted = False
 
 
 class NewVariableNode(TreeNode):
-    def __init__(self, children=None, line_nr: int = -1) -> None:
-        super().__init__("NewVar", children=children, line_nr=line_nr)
+    __slots__ = ()
+    kind = NodeKind.NewVariable
+
+    def __init__(self, children=None, line_nr: int = -1, column: int = -1) -> None:
+        super().__init__("NewVar", children=children, line_nr=line_nr, column=column)
 
 
 class PlusNode(TreeNode):
-    def __init__(self, children=None, line_nr: int = -1) -> None:
-        super().__init__("+", children=children, line_nr=line_nr)
+    __slots__ = ()
+    kind = NodeKind.Plus
+
+    def __init__(self, children=None, line_nr: int = -1, column: int = -1) -> None:
+        super().__init__("+", children=children, line_nr=line_nr, column=column)
 
 
 class UnaryPlusNode(TreeNode):
-    def __init__(self, children=None, line_nr: int = -1) -> None:
-        super().__init__("UnaryPlus", children=children, line_nr=line_nr)
+    __slots__ = ()
+    kind = NodeKind.UnaryPlus
+
+    def __init__(self, children=None, line_nr: int = -1, column: int = -1) -> None:
+        super().__init__("UnaryPlus", children=children, line_nr=line_nr, column=column)
 
 
 class GtNode(TreeNode):
-    def __init__(self, children=None, line_nr: int = -1) -> None:
-        super().__init__(">", children=children, line_nr=line_nr)
+    __slots__ = ()
+    kind = NodeKind.Gt
+
+    def __init__(self, children=None, line_nr: int = -1, column: int = -1) -> None:
+        super().__init__(">", children=children, line_nr=line_nr, column=column)
 
 
 class NeqNode(TreeNode):
-    def __init__(self, children=None, line_nr: int = -1) -> None:
-        super().__init__("!=", children=children, line_nr=line_nr)
+    __slots__ = ()
+    kind = NodeKind.Neq
+
+    def __init__(self, children=None, line_nr: int = -1, column: int = -1) -> None:
+        super().__init__("!=", children=children, line_nr=line_nr, column=column)
 
 
 class LtNode(TreeNode):
-    def __init__(self, children=None, line_nr: int = -1) -> None:
-        super().__init__("<", children=children, line_nr=line_nr)
+    __slots__ = ()
+    kind = NodeKind.Lt
+
+    def __init__(self, children=None, line_nr: int = -1, column: int = -1) -> None:
+        super().__init__("<", children=children, line_nr=line_nr, column=column)
 
 
 class EqNode(TreeNode):
-    def __init__(self, children=None, line_nr: int = -1) -> None:
-        super().__init__("=", children=children, line_nr=line_nr)
+    __slots__ = ()
+    kind = NodeKind.Eq
+
+    def __init__(self, children=None, line_nr: int = -1, column: int = -1) -> None:
+        super().__init__("=", children=children, line_nr=line_nr, column=column)
 
 
 class GeqNode(TreeNode):
-    def __init__(self, children=None, line_nr: int = -1) -> None:
-        super().__init__(">=", children=children, line_nr=line_nr)
+    __slots__ = ()
+    kind = NodeKind.Geq
+
+    def __init__(self, children=None, line_nr: int = -1, column: int = -1) -> None:
+        super().__init__(">=", children=children, line_nr=line_nr, column=column)
 
 
 class LeqNode(TreeNode):
-    def __init__(self, children=None, line_nr: int = -1) -> None:
-        super().__init__("<=", children=children, line_nr=line_nr)
+    __slots__ = ()
+    kind = NodeKind.Leq
+
+    def __init__(self, children=None, line_nr: int = -1, column: int = -1) -> None:
+        super().__init__("<=", children=children, line_nr=line_nr, column=column)
 
 
 class AndNode(TreeNode):
-    def __init__(self, children=None, line_nr: int = -1) -> None:
-        super().__init__("&&", children=children, line_nr=line_nr)
+    __slots__ = ()
+    kind = NodeKind.And
+
+    def __init__(self, children=None, line_nr: int = -1, column: int = -1) -> None:
+        super().__init__("&&", children=children, line_nr=line_nr, column=column)
 
 
 class OrNode(TreeNode):
-    def __init__(self, children=None, line_nr: int = -1) -> None:
-        super().__init__("||", children=children, line_nr=line_nr)
+    __slots__ = ()
+    kind = NodeKind.Or
+
+    def __init__(self, children=None, line_nr: int = -1, column: int = -1) -> None:
+        super().__init__("||", children=children, line_nr=line_nr, column=column)
 
 
 class ModNode(TreeNode):
-    def __init__(self, children=None, line_nr: int = -1) -> None:
-        super().__init__("%", children=children, line_nr=line_nr)
+    __slots__ = ()
+    kind = NodeKind.Mod
+
+    def __init__(self, children=None, line_nr: int = -1, column: int = -1) -> None:
+        super().__init__("%", children=children, line_nr=line_nr, column=column)
 
 
 class LShiftNode(TreeNode):
-    def __init__(self, children=None, line_nr: int = -1) -> None:
-        super().__init__("<<", children=children, line_nr=line_nr)
+    __slots__ = ()
+    kind = NodeKind.LShift
+
+    def __init__(self, children=None, line_nr: int = -1, column: int = -1) -> None:
+        super().__init__("<<", children=children, line_nr=line_nr, column=column)
 
 
 class NotNode(TreeNode):
-    def __init__(self, children=None, line_nr: int = -1):
-        super().__init__("!", children=children, line_nr=line_nr)
+    __slots__ = ()
+    kind = NodeKind.Not
+
+    def __init__(self, children=None, line_nr: int = -1, column: int = -1):
+        super().__init__("!", children=children, line_nr=line_nr, column=column)
 
 
 class RShiftNode(TreeNode):
-    def __init__(self, children=None, line_nr: int = -1) -> None:
-        super().__init__(">>", children=children, line_nr=line_nr)
+    __slots__ = ()
+    kind = NodeKind.RShift
+
+    def __init__(self, children=None, line_nr: int = -1, column: int = -1) -> None:
+        super().__init__(">>", children=children, line_nr=line_nr, column=column)
 
 
 class BitAndNode(TreeNode):
-    def __init__(self, children=None, line_nr: int = -1) -> None:
-        super().__init__("&", children=children, line_nr=line_nr)
+    __slots__ = ()
+    kind = NodeKind.BitAnd
+
+    def __init__(self, children=None, line_nr: int = -1, column: int = -1) -> None:
+        super().__init__("&", children=children, line_nr=line_nr, column=column)
 
 
 class BitOrNode(TreeNode):
-    def __init__(self, children=None, line_nr: int = -1) -> None:
-        super().__init__("|", children=children, line_nr=line_nr)
+    __slots__ = ()
+    kind = NodeKind.BitOr
+
+    def __init__(self, children=None, line_nr: int = -1, column: int = -1) -> None:
+        super().__init__("|", children=children, line_nr=line_nr, column=column)
 
 
 class BitXorNode(TreeNode):
-    def __init__(self, children=None, line_nr: int = -1) -> None:
-        super().__init__("^", children=children, line_nr=line_nr)
+    __slots__ = ()
+    kind = NodeKind.BitXor
+
+    def __init__(self, children=None, line_nr: int = -1, column: int = -1) -> None:
+        super().__init__("^", children=children, line_nr=line_nr, column=column)
 
 
 class BitNotNode(TreeNode):
-    def __init__(self, children=None, line_nr: int = -1) -> None:
-        super().__init__("~", children=children, line_nr=line_nr)
+    __slots__ = ()
+    kind = NodeKind.BitNot
+
+    def __init__(self, children=None, line_nr: int = -1, column: int = -1) -> None:
+        super().__init__("~", children=children, line_nr=line_nr, column=column)
 
 
 class MinusNode(TreeNode):
-    def __init__(self, children=None, line_nr: int = -1) -> None:
-        super().__init__("-", children=children, line_nr=line_nr)
+    __slots__ = ()
+    kind = NodeKind.Minus
+
+    def __init__(self, children=None, line_nr: int = -1, column: int = -1) -> None:
+        super().__init__("-", children=children, line_nr=line_nr, column=column)
 
 
 class UnaryMinusNode(TreeNode):
-    def __init__(self, children=None, line_nr: int = -1) -> None:
-        super().__init__("UnaryMinus", children=children, line_nr=line_nr)
+    __slots__ = ()
+    kind = NodeKind.UnaryMinus
+
+    def __init__(self, children=None, line_nr: int = -1, column: int = -1) -> None:
+        super().__init__(
+            "UnaryMinus", children=children, line_nr=line_nr, column=column
+        )
 
 
 class MultNode(TreeNode):
-    def __init__(self, children=None, line_nr: int = -1) -> None:
-        super().__init__("*", children=children, line_nr=line_nr)
+    __slots__ = ()
+    kind = NodeKind.Mult
+
+    def __init__(self, children=None, line_nr: int = -1, column: int = -1) -> None:
+        super().__init__("*", children=children, line_nr=line_nr, column=column)
 
 
 class DivNode(TreeNode):
-    def __init__(self, children=None, line_nr: int = -1) -> None:
-        super().__init__("/", children=children, line_nr=line_nr)
+    __slots__ = ()
+    kind = NodeKind.Div
+
+    def __init__(self, children=None, line_nr: int = -1, column: int = -1) -> None:
+        super().__init__("/", children=children, line_nr=line_nr, column=column)
 
 
 class IntNode(TreeNode):
-    def __init__(self, value: str, children=None, line_nr: int = -1) -> None:
-        super().__init__(value, children=children, line_nr=line_nr)
+    __slots__ = ()
+    kind = NodeKind.Int
+
+    def __init__(
+        self, value: str, children=None, line_nr: int = -1, column: int = -1
+    ) -> None:
+        super().__init__(value, children=children, line_nr=line_nr, column=column)
 
 
 class FloatNode(TreeNode):
-    def __init__(self, value: str, children=None, line_nr: int = -1) -> None:
-        super().__init__(value, children=children, line_nr=line_nr)
+    __slots__ = ()
+    kind = NodeKind.Float
+
+    def __init__(
+        self, value: str, children=None, line_nr: int = -1, column: int = -1
+    ) -> None:
+        super().__init__(value, children=children, line_nr=line_nr, column=column)
 
 
 class StringNode(TreeNode):
-    def __init__(self, value: str, children=None, line_nr: int = -1) -> None:
-        super().__init__(value, children=children, line_nr=line_nr)
+    __slots__ = ()
+    kind = NodeKind.String
+
+    def __init__(
+        self, value: str, children=None, line_nr: int = -1, column: int = -1
+    ) -> None:
+        super().__init__(value, children=children, line_nr=line_nr, column=column)
 
 
 class CommentNode(TreeNode):
-    def __init__(self, value: str, children=None, line_nr: int = -1) -> None:
-        super().__init__(value, children=children, line_nr=line_nr)
+    __slots__ = ()
+    kind = NodeKind.Comment
+
+    def __init__(
+        self, value: str, children=None, line_nr: int = -1, column: int = -1
+    ) -> None:
+        super().__init__(value, children=children, line_nr=line_nr, column=column)
 
 
 class IdNode(TreeNode):
-    def __init__(self, value: str, children=None, line_nr: int = -1) -> None:
-        super().__init__(value, children=children, line_nr=line_nr)
+    __slots__ = ("entry",)
+    kind = NodeKind.Id
+
+    def __init__(
+        self, value: str, children=None, line_nr: int = -1, column: int = -1
+    ) -> None:
+        super().__init__(value, children=children, line_nr=line_nr, column=column)
+        self.entry = (
+            None  # SymbolTableEntry the id refers to, bound by SymbolTable.resolve
+        )
 
 
 class AddressNode(TreeNode):
-    def __init__(self, children=None, line_nr: int = -1) -> None:
-        super().__init__("Address", children=children, line_nr=line_nr)
+    __slots__ = ()
+    kind = NodeKind.Address
+
+    def __init__(self, children=None, line_nr: int = -1, column: int = -1) -> None:
+        super().__init__("Address", children=children, line_nr=line_nr, column=column)
 
 
 class ConstNode(TreeNode):
-    def __init__(self, children=None, line_nr: int = -1) -> None:
-        super().__init__("Const", children=children, line_nr=line_nr)
+    __slots__ = ()
+    kind = NodeKind.Const
+
+    def __init__(self, children=None, line_nr: int = -1, column: int = -1) -> None:
+        super().__init__("Const", children=children, line_nr=line_nr, column=column)
 
 
 class PrintfNode(TreeNode):
-    def __init__(self, children=None, line_nr: int = -1) -> None:
-        super().__init__("Printf", children=children, line_nr=line_nr)
+    __slots__ = ()
+    kind = NodeKind.Printf
+
+    def __init__(self, children=None, line_nr: int = -1, column: int = -1) -> None:
+        super().__init__("Printf", children=children, line_nr=line_nr, column=column)
 
 
 class CharNode(TreeNode):
-    def __init__(self, value: str, children=None, line_nr: int = -1) -> None:
-        super().__init__(value, children=children, line_nr=line_nr)
+    __slots__ = ()
+    kind = NodeKind.Char
+
+    def __init__(
+        self, value: str, children=None, line_nr: int = -1, column: int = -1
+    ) -> None:
+        super().__init__(value, children=children, line_nr=line_nr, column=column)
 
 
 class TypeNode(TreeNode):
-    def __init__(self, value: str, children=None, line_nr: int = -1) -> None:
-        super().__init__(value, children=children, line_nr=line_nr)
+    __slots__ = ()
+    kind = NodeKind.Type
+
+    def __init__(
+        self, value: str, children=None, line_nr: int = -1, column: int = -1
+    ) -> None:
+        super().__init__(value, children=children, line_nr=line_nr, column=column)
 
 
 class BoolNode(TreeNode):
-    def __init__(self, value: str, children=None, line_nr: int = -1) -> None:
-        super().__init__(value, children=children, line_nr=line_nr)
+    __slots__ = ()
+    kind = NodeKind.Bool
+
+    def __init__(
+        self, value: str, children=None, line_nr: int = -1, column: int = -1
+    ) -> None:
+        super().__init__(value, children=children, line_nr=line_nr, column=column)
 
 
 class PointerNode(TreeNode):
-    def __init__(self, depth: int, children=None, line_nr: int = -1) -> None:
+    __slots__ = ("depth",)
+    kind = NodeKind.Pointer
+
+    def __init__(
+        self, depth: int, children=None, line_nr: int = -1, column: int = -1
+    ) -> None:
         self.depth = depth
-        super().__init__("Int pointer", children=children, line_nr=line_nr)
+        super().__init__(
+            "Int pointer", children=children, line_nr=line_nr, column=column
+        )
 
 
 class IntPointerNode(TreeNode):
-    def __init__(self, depth: int, children=None, line_nr: int = -1) -> None:
+    __slots__ = ("depth",)
+    kind = NodeKind.IntPointer
+
+    def __init__(
+        self, depth: int, children=None, line_nr: int = -1, column: int = -1
+    ) -> None:
         self.depth = depth
-        super().__init__("Int pointer", children=children, line_nr=line_nr)
+        super().__init__(
+            "Int pointer", children=children, line_nr=line_nr, column=column
+        )
 
 
 class FloatPointerNode(TreeNode):
-    def __init__(self, depth: int, children=None, line_nr: int = -1) -> None:
+    __slots__ = ("depth",)
+    kind = NodeKind.FloatPointer
+
+    def __init__(
+        self, depth: int, children=None, line_nr: int = -1, column: int = -1
+    ) -> None:
         self.depth = depth
-        super().__init__("Float pointer", children=children, line_nr=line_nr)
+        super().__init__(
+            "Float pointer", children=children, line_nr=line_nr, column=column
+        )
 
 
 class CharPointerNode(TreeNode):
-    def __init__(self, depth: int, children=None, line_nr: int = -1) -> None:
+    __slots__ = ("depth",)
+    kind = NodeKind.CharPointer
+
+    def __init__(
+        self, depth: int, children=None, line_nr: int = -1, column: int = -1
+    ) -> None:
         self.depth = depth
-        super().__init__("Char pointer", children=children, line_nr=line_nr)
+        super().__init__(
+            "Char pointer", children=children, line_nr=line_nr, column=column
+        )
 
 
 class BoolPointerNode(TreeNode):
-    def __init__(self, depth: int, children=None, line_nr: int = -1) -> None:
+    __slots__ = ("depth",)
+    kind = NodeKind.BoolPointer
+
+    def __init__(
+        self, depth: int, children=None, line_nr: int = -1, column: int = -1
+    ) -> None:
         self.depth = depth
-        super().__init__("Bool pointer", children=children, line_nr=line_nr)
+        super().__init__(
+            "Bool pointer", children=children, line_nr=line_nr, column=column
+        )
@@ -0,0 +1,74 @@
+from typing import Callable, Iterator
+
+from src.parser.TreeNode import TreeNode
+
+# Returned by a pre-order handler to skip the children of the node
+SKIP_CHILDREN = object()
+
+Handlers = dict[type, Callable[[TreeNode], object]]
+
+
+def preorder(tree: TreeNode) -> Iterator[TreeNode]:
+    """
+    Iterate over the nodes of an AST in pre-order with an explicit stack, so the depth of the AST doesn't matter
+    The children of a node are read when the next node is requested, so the node can still be rewritten by the
+    caller before its children are visited.
+    :param tree: The root of the AST
+    :return: Iterator[TreeNode] : The nodes, every node before its children
+    """
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(reversed(node.children))
+
+
+def postorder(tree: TreeNode) -> Iterator[TreeNode]:
+    """
+    Iterate over the nodes of an AST in post-order with an explicit stack, so the depth of the AST doesn't matter
+    :param tree: The root of the AST
+    :return: Iterator[TreeNode] : The nodes, every node after its children
+    """
+    stack: list[tuple[TreeNode, bool]] = [(tree, False)]
+    while stack:
+        node, finished = stack.pop()
+        if finished:
+            yield node
+            continue
+        stack.append((node, True))
+        stack.extend((child, False) for child in reversed(node.children))
+
+
+def walk(
+    tree: TreeNode, enter: Handlers | None = None, leave: Handlers | None = None
+) -> None:
+    """
+    Walk an AST with an explicit stack and call the handlers registered for the class of every node
+    Handlers are found with a dict lookup on the exact class of the node, the handler registered for TreeNode is
+    called for nodes without a handler of their own.
+    :param tree: The root of the AST
+    :param enter: Handlers called before the children of a node, a handler can return SKIP_CHILDREN to skip the
+    children and the leave handler of the node
+    :param leave: Handlers called after the children of a node
+    :return: None
+    """
+    enter = enter or {}
+    leave = leave or {}
+    enter_default = enter.get(TreeNode)
+    leave_default = leave.get(TreeNode)
+
+    stack: list[tuple[TreeNode, bool]] = [(tree, False)]
+    while stack:
+        node, finished = stack.pop()
+        if finished:
+            handler = leave.get(node.__class__, leave_default)
+            if handler is not None:
+                handler(node)
+            continue
+
+        handler = enter.get(node.__class__, enter_default)
+        if handler is not None and handler(node) is SKIP_CHILDREN:
+            continue
+        if leave:
+            stack.append((node, True))
+        stack.extend((child, False) for child in reversed(node.children))
@@ -1,8 +1,13 @@
 
 
-# run src.main for every file in input
+# compile every file in input in one batch, the summary lists every file that failed as "<file>: <error>"
 mkdir -p errors
-for file in input/*.c; do
-    echo "Running src.main on $file"
-    python -m src.main --input $file --target_llvm output.ll 2> errors/$(basename $file).err || cp $file errors/$(basename $file).c
-done
\ No newline at end of file
+python -m src.main --input input --target_llvm output 2> errors/batch.err
+cat errors/batch.err
+grep -o '^input/[^:]*\.c' errors/batch.err | sort -u | xargs -r cp -t errors
+
+# the fast lexer has to produce the same tokens as the ANTLR lexer for every file in input
+python -m checks.lexer_diff input
+
+# the fast front end has to build the same AST as the ANTLR front end for every file in input
+python -m checks.ast_diff input